@@ -0,0 +1,172 @@
+import asyncio
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit
+
+import aiohttp
+
+from http_cache import USER_AGENT, HttpCache
+from instrumentation import RunStats, network_timings
+from throttle import RETRY_STATUS, AdaptiveController, parse_retry_after
+
+DEFAULT_HEADERS = {'User-Agent': USER_AGENT}
+
+
+@dataclass
+class FetchResult:
+    """Resultado de uma requisição: status HTTP, corpo e erro (se houver).
+
+    `fresh` indica página nova da rede (200); acertos de cache e
+    revalidações (304) não são.
+    """
+    url: str
+    status: int = 0
+    text: str = ""
+    error: str = ""
+    fresh: bool = False
+
+    @property
+    def ok(self):
+        return not self.error and 200 <= self.status < 300
+
+
+def is_transient(error):
+    """Timeout ou falha de conexão (versão aiohttp de throttle.is_transient)."""
+    return (isinstance(error, (aiohttp.ClientConnectionError, asyncio.TimeoutError))
+            and not isinstance(error, aiohttp.ClientSSLError))
+
+
+class HostRateLimiter:
+    """Limita a quantidade de requisições por segundo para cada host."""
+
+    def __init__(self, rate_per_host):
+        self.interval = 1.0 / rate_per_host if rate_per_host else 0.0
+        self._next_slot = {}
+        self._lock = asyncio.Lock()
+
+    async def wait(self, url):
+        """Aguarda até o próximo horário livre do host da URL."""
+        if not self.interval:
+            return
+        host = urlsplit(url).netloc
+        async with self._lock:
+            now = time.monotonic()
+            slot = max(now, self._next_slot.get(host, now))
+            self._next_slot[host] = slot + self.interval
+        if slot > now:
+            await asyncio.sleep(slot - now)
+
+
+class AsyncFetcher:
+    """Cliente HTTP assíncrono com conexões keep-alive reaproveitadas.
+
+    Uso:
+        async with AsyncFetcher(concurrency=20, rate_per_host=5) as fetcher:
+            result = await fetcher.fetch(url)
+    """
+
+    def __init__(self, concurrency=20, rate_per_host=5.0, timeout=10, headers=None, controller=None, cache=None,
+                 stats=None):
+        self.concurrency = concurrency
+        self.timeout = timeout
+        self.headers = headers or DEFAULT_HEADERS
+        self.rate_limiter = HostRateLimiter(rate_per_host)
+        # A janela adaptativa nunca passa de `concurrency` (tamanho do pool de conexões)
+        self.controller = controller or AdaptiveController(max_limit=concurrency)
+        # Cache em disco opcional (http_cache.HttpCache)
+        self.cache = cache
+        # Medidas por URL opcionais (instrumentation.RunStats)
+        self.stats = stats
+        self.session = None
+
+    async def __aenter__(self):
+        connector = aiohttp.TCPConnector(
+            limit=self.concurrency,
+            keepalive_timeout=30,
+            ttl_dns_cache=300,
+        )
+        self.session = aiohttp.ClientSession(
+            connector=connector,
+            headers=self.headers,
+            timeout=aiohttp.ClientTimeout(total=self.timeout),
+            trace_configs=[RunStats.trace_config()] if self.stats is not None else None,
+        )
+        return self
+
+    async def __aexit__(self, *exc):
+        await self.session.close()
+        self.session = None
+
+    async def fetch(self, url):
+        """Baixa uma URL respeitando a janela adaptativa e a taxa por host, com retentativas."""
+        fetch_start = time.perf_counter()
+        entry = self.cache.lookup(url) if self.cache else None
+        if entry is not None and entry.fresh:
+            if self.stats is not None:
+                self.stats.record_fetch(url, 200, source="cache", fetch=time.perf_counter() - fetch_start)
+            return FetchResult(url, 200, entry.text)
+        request_headers = HttpCache.request_headers(entry)
+
+        controller = self.controller
+        for attempt in range(controller.max_retries + 1):
+            await controller.wait_cooldown()
+            retry_after = None
+            transient = True
+            # Preenchido pelos eventos do trace_config (instrumentation.RunStats)
+            timings = {}
+            async with controller.async_slot():
+                await self.rate_limiter.wait(url)
+                controller.count("requests")
+                start = time.monotonic()
+                try:
+                    async with self.session.get(url, headers=request_headers, trace_request_ctx=timings) as response:
+                        text = await response.text()
+                        if "_headers" in timings:
+                            timings["download"] = time.perf_counter() - timings["_headers"]
+                        result = FetchResult(url, response.status, text)
+                        response_headers = response.headers
+                        retry_after = parse_retry_after(response_headers.get("Retry-After"))
+                except (aiohttp.ClientError, asyncio.TimeoutError) as e:
+                    result = FetchResult(url, error=str(e) or type(e).__name__)
+                    transient = is_transient(e)
+
+            if not result.error and result.status not in RETRY_STATUS:
+                controller.on_response(result.status, time.monotonic() - start)
+                if attempt:
+                    controller.count("recovered")
+                result.fresh = result.status == 200
+                if self.cache is not None:
+                    result.status, result.text = self.cache.resolve(
+                        url, entry, result.status, result.text, response_headers)
+                if result.status >= 400:
+                    result.error = f"HTTP {result.status}"
+                self._record(url, result.status, attempt, timings, fetch_start,
+                             "revalidated" if response.status == 304 else "network")
+                return result
+            if not transient:
+                # Erro definitivo (URL inválida, SSL, redirecionamentos): sem retentativa nem redução da janela
+                controller.count("failed")
+                self._record(url, result.status, attempt, timings, fetch_start)
+                return result
+
+            controller.on_congestion(retry_after)
+            if attempt == controller.max_retries:
+                break
+            controller.count("retries")
+            await asyncio.sleep(controller.backoff(attempt, retry_after))
+
+        controller.count("failed")
+        if not result.error:
+            result.error = f"HTTP {result.status}"
+        self._record(url, result.status, controller.max_retries, timings, fetch_start)
+        return result
+
+    def _record(self, url, status, retries, timings, fetch_start, source="network"):
+        if self.stats is not None:
+            self.stats.record_fetch(url, status, retries, timings.get("bytes", 0), source,
+                                    download=timings.get("download"), fetch=time.perf_counter() - fetch_start,
+                                    **network_timings(timings))
+
+    async def fetch_all(self, urls):
+        """Baixa todas as URLs em paralelo e devolve os resultados na mesma ordem."""
+        return await asyncio.gather(*(self.fetch(url) for url in urls))
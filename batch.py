@@ -0,0 +1,247 @@
+import argparse
+import os
+from collections import deque
+from concurrent.futures import FIRST_COMPLETED, ThreadPoolExecutor, wait
+from functools import partial
+from canonical import Deduplicator
+from checkpoint import CheckpointJournal
+from cli import add_format_arguments, add_parsing_arguments, add_resource_arguments, close_resources, open_resources
+from instrumentation import print_reports
+from new_main import COUNTRIES, SEARCH_FIELDS, Scraper, clean_name
+from pagination import MAX_FAILURES, page_count, page_urls
+from pipeline import ParserPool
+
+
+class _Query:
+    """Estado de uma busca dentro do lote."""
+
+    def __init__(self, name, base_url):
+        self.name = name
+        self.cleaned_name = clean_name(name)
+        self.urls = page_urls(base_url, self.cleaned_name)
+        self.queue = deque([0])  # índices de páginas ainda não agendadas
+        self.pages = {}  # índice -> linhas das páginas concluídas
+        self.outstanding = 0  # páginas em andamento
+        self.scheduled = True  # está no rodízio
+        self.counted = None  # total de resultados informado pela primeira página
+        self.failed = []  # índices das páginas que não puderam ser baixadas
+        self.failures = 0  # falhas seguidas (encerram a busca sem contagem ao chegar a MAX_FAILURES)
+
+
+class BatchScraper:
+    """Roda muitas buscas num só processo, sem interação.
+
+    Todas as buscas compartilham a sessão HTTP, o controlador adaptativo, o
+    cache e os processos de parsing do `scraper`. As páginas entram num único
+    escalonador que as distribui em rodízio entre as buscas (uma página de
+    cada busca por vez), com no máximo `window` páginas em andamento, então
+    nenhuma busca longa monopoliza a conexão. A primeira página de cada busca
+    informa o total de resultados e libera as demais.
+
+    A saída é um CSV por busca em `output_dir` ou, com `combined`, um único
+    CSV com a coluna "query". Com `journal`, buscas concluídas são
+    registradas e puladas ao retomar. Uma busca com alguma página que falhou
+    fica incompleta: não é dada como concluída no diário (será refeita) e não
+    substitui o CSV dela de uma execução anterior.
+    """
+
+    def __init__(self, scraper, output_dir="data", combined=None, window=None, journal=None):
+        self.scraper = scraper
+        self.output_dir = output_dir
+        self.combined = combined
+        self.window = window or scraper.controller.max_limit
+        self.journal = journal
+        self.writer = None
+        self.results = {}
+        # Buscas com páginas que falharam: {busca: páginas com falha}
+        self.incomplete = {}
+
+    def output_path(self, query):
+        """CSV de uma busca (nome completo, para buscas parecidas não colidirem)."""
+        return os.path.join(self.output_dir, f"ml_{query.cleaned_name}.csv")
+
+    def run(self, queries, base_url=COUNTRIES[1]):
+        """Executa as buscas; devolve {busca: quantidade de anúncios}."""
+        states, seen = [], set()
+        for name in queries:
+            query = _Query(name, base_url)
+            if query.cleaned_name in seen:
+                continue
+            seen.add(query.cleaned_name)
+            if self.journal is not None and self.key(query) in self.journal:
+                print(f"Busca '{name}' já concluída, pulando.")
+                continue
+            states.append(query)
+
+        if self.combined:
+            self.writer = self.scraper.open_writer(self.combined, ["query"] + SEARCH_FIELDS)
+            if self.journal is not None:
+                # A saída é reescrita do zero: começa pelas buscas já concluídas no diário
+                self.writer.write_many(self.journal.rows(done_only=True))
+
+        pool = None
+        parse = self.scraper.parse_search_page
+        if self.scraper.parse_workers:
+            scraper = self.scraper
+            pool = ParserPool(Scraper, scraper.parse_workers, scraper.selector_stats, scraper.stats,
+                              parser=scraper.parser, extraction=scraper.extraction,
+                              numeric_prices=scraper.numeric_prices)
+            parse = partial(pool.call, "parse_search_page")
+
+        try:
+            self._schedule(states, parse)
+        finally:
+            if pool is not None:
+                pool.close()
+            if self.writer is not None:
+                self.writer.close()
+        self.print_report()
+        return self.results
+
+    def _schedule(self, states, parse):
+        rotation = deque(states)
+        total = len(states)
+        with ThreadPoolExecutor(max_workers=self.window) as executor:
+            in_flight = {}
+            while rotation or in_flight:
+                while len(in_flight) < self.window:
+                    task = self._next_page(rotation)
+                    if task is None:
+                        break
+                    query, index = task
+                    future = executor.submit(self._load, query.urls[index], parse)
+                    in_flight[future] = task
+
+                done, _ = wait(in_flight, return_when=FIRST_COMPLETED)
+                for future in done:
+                    query, index = in_flight.pop(future)
+                    query.outstanding -= 1
+                    self._page_done(query, index, future.result())
+                    if query.queue and not query.scheduled:
+                        query.scheduled = True
+                        rotation.append(query)
+                    elif not query.queue and not query.outstanding:
+                        self._finish(query)
+                        if query.failed:
+                            print(f"Busca '{query.name}' incompleta: {len(query.failed)} páginas falharam, "
+                                  f"{self.results[query.name]} anúncios ({len(self.results)}/{total})")
+                        else:
+                            print(f"Busca '{query.name}' concluída: {self.results[query.name]} anúncios "
+                                  f"({len(self.results)}/{total})")
+
+    def _next_page(self, rotation):
+        """Próxima página no rodízio: uma página de cada busca por vez."""
+        while rotation:
+            query = rotation.popleft()
+            if not query.queue:
+                query.scheduled = False
+                continue
+            index = query.queue.popleft()
+            query.outstanding += 1
+            if query.queue:
+                rotation.append(query)
+            else:
+                query.scheduled = False
+            return query, index
+        return None
+
+    def _load(self, url, parse):
+        html = self.scraper.fetch_page(url)
+        return None if html is None else parse(html)
+
+    def _page_done(self, query, index, result):
+        if result is None:
+            # Página que falhou é pulada, como em iter_search_pages, mas a busca fica incompleta
+            query.failed.append(index)
+            query.failures += 1
+            if (index and not query.counted and query.failures < MAX_FAILURES
+                    and index + 1 < len(query.urls)):
+                query.queue.append(index + 1)
+            return
+        query.failures = 0
+        total, rows = result
+        query.pages[index] = rows
+        if index == 0 and total:
+            query.counted = total
+            query.queue.extend(range(1, page_count(total)))
+        elif not rows:
+            # Fim da busca: não agenda mais páginas
+            query.queue.clear()
+        elif not query.counted and index + 1 < len(query.urls):
+            # Sem a contagem, segue página a página até uma página vazia
+            query.queue.append(index + 1)
+
+    def _finish(self, query):
+        rows = []
+        for index in sorted(query.pages):
+            if not query.pages[index]:
+                break
+            rows.extend(query.pages[index])
+        query.pages = {}
+        # O mesmo anúncio pode aparecer em mais de uma página da busca
+        dedup = Deduplicator()
+        rows = [row for row in rows if dedup.admit(row["post link"])]
+
+        # Com páginas faltando, a busca é registrada como falha e refeita na próxima execução
+        ok = not query.failed
+        if not ok:
+            self.incomplete[query.name] = len(query.failed)
+        if self.scraper.store is not None:
+            self.scraper.store.add_many(rows)
+        if self.writer is not None:
+            rows = [{"query": query.name, **row} for row in rows]
+            if self.journal is not None:
+                self.journal.append(self.key(query), rows, ok=ok)
+            self.writer.write_many(rows)
+        else:
+            if self.journal is not None:
+                self.journal.append(self.key(query), [], ok=ok)
+            if ok:
+                with self.scraper.open_writer(self.output_path(query)) as writer:
+                    writer.write_many(rows)
+        self.results[query.name] = len(rows)
+
+    @staticmethod
+    def key(query):
+        """Chave da busca no diário."""
+        return f"query:{query.cleaned_name}"
+
+    def print_report(self):
+        scraper = self.scraper
+        print(f"{len(self.results)} buscas | {sum(self.results.values())} anúncios | "
+              f"{len(self.incomplete)} incompletas")
+        print_reports(scraper.controller, stats=scraper.stats, selector_stats=scraper.selector_stats,
+                      cache=scraper.cache, store=scraper.store, archive=scraper.archive)
+
+
+def read_queries(path):
+    """Termos de busca do arquivo: um por linha, ignorando linhas vazias e comentários (#)."""
+    with open(path, encoding="utf-8") as f:
+        return [line.strip() for line in f if line.strip() and not line.lstrip().startswith("#")]
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Executa várias buscas do Mercado Livre em lote, sem interação.")
+    parser.add_argument("--queries", required=True, help="Arquivo com um termo de busca por linha")
+    parser.add_argument("--country", type=int, choices=sorted(COUNTRIES), default=1, help="País (número do menu)")
+    parser.add_argument("--output-dir", default="data", help="Diretório dos CSVs (um por busca)")
+    parser.add_argument("--combined", help="Grava todas as buscas num único CSV (com a coluna 'query')")
+    parser.add_argument("--window", type=int, help="Máximo de páginas em andamento (padrão: teto do controlador)")
+    parser.add_argument("--parse-workers", type=int, default=0, help="Processos de parsing (0: no próprio processo)")
+    parser.add_argument("--journal", help="Diário das buscas concluídas; permite retomar o lote")
+    add_parsing_arguments(parser)
+    add_resource_arguments(parser)
+    add_format_arguments(parser)
+    args = parser.parse_args()
+
+    resources = open_resources(args)
+    journal = CheckpointJournal(args.journal) if args.journal else None
+    scraper = Scraper(parser=args.parser, extraction=args.extraction, parquet=args.parquet,
+                      numeric_prices=args.numeric_prices, parse_workers=args.parse_workers, **resources)
+
+    batch = BatchScraper(scraper, args.output_dir, args.combined, args.window, journal)
+    batch.run(read_queries(args.queries), COUNTRIES[args.country])
+
+    if journal is not None:
+        journal.close()
+    close_resources(resources, args, scraper.selector_stats)
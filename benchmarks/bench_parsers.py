@@ -0,0 +1,92 @@
+"""Benchmark offline dos backends de parsing sobre páginas salvas.
+
+Uso:
+    python benchmarks/bench_parsers.py [--fixtures benchmarks/fixtures] [--repeat 5]
+
+Arquivos "product_*.html" são extraídos com LinkScraper.parse_link e
+"search_*.html" com Scraper.parse_search_page. Para cada backend mostra o
+tempo de parsing e o tempo de parsing + extração por página (mediana), e
+confere se todos extraem exatamente os mesmos dados, com os preços em texto e
+em centavos. A linha "state" mede a extração pelo JSON embutido
+(__PRELOADED_STATE__), sem árvore do HTML.
+"""
+import argparse
+import os
+import statistics
+import sys
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from link_scraper import LinkScraper  # noqa: E402
+from new_main import Scraper  # noqa: E402
+from embedded_state import load_state  # noqa: E402
+from parsers import DEFAULT_PARSER, available_parsers, make_soup  # noqa: E402
+from prices import format_prices, normalize_prices  # noqa: E402
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+TIMESTAMP_FIELDS = ("scraped_at", "date")
+
+
+def extract(path, html, parser, numeric_prices=False):
+    """Extrai as linhas de uma página salva com o backend indicado."""
+    name = os.path.basename(path)
+    extraction = "state" if parser == "state" else "dom"
+    parser = DEFAULT_PARSER if parser == "state" else parser
+    if name.startswith("product_"):
+        scraper = LinkScraper(None, None, parser=parser, extraction=extraction, numeric_prices=numeric_prices)
+        rows = [scraper.parse_link(html, name)]
+    else:
+        rows = Scraper(parser=parser, extraction=extraction, numeric_prices=numeric_prices).parse_search_page(html)[1]
+    # Mesma formatação da gravação (RowWriter)
+    rows = normalize_prices(rows) if numeric_prices else format_prices(rows)
+    return [{k: v for k, v in row.items() if k not in TIMESTAMP_FIELDS} for row in rows]
+
+
+def median_ms(func, repeat):
+    timings = []
+    for _ in range(repeat):
+        start = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - start)
+    return statistics.median(timings) * 1000
+
+
+def main():
+    arg_parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    arg_parser.add_argument("--fixtures", default=FIXTURES_DIR, help="Diretório com as páginas salvas")
+    arg_parser.add_argument("--repeat", type=int, default=5, help="Repetições por página e backend")
+    args = arg_parser.parse_args()
+
+    pages = sorted(os.path.join(args.fixtures, f) for f in os.listdir(args.fixtures) if f.endswith(".html"))
+    parsers = available_parsers() + ["state"]
+
+    print(f"{'página':<32} {'backend':<12} {'KB':>6} {'parse ms':>10} {'parse+extração ms':>18}")
+    mismatches = 0
+    for path in pages:
+        with open(path, encoding="utf-8") as f:
+            html = f.read()
+        reference = None
+        for parser in parsers:
+            if parser == "state":
+                parse_ms = median_ms(lambda: load_state(html), args.repeat)
+            else:
+                parse_ms = median_ms(lambda: make_soup(html, parser), args.repeat)
+            total_ms = median_ms(lambda: extract(path, html, parser), args.repeat)
+            print(f"{os.path.basename(path):<32} {parser:<12} {len(html) / 1024:>6.0f} {parse_ms:>10.2f} {total_ms:>18.2f}")
+
+            # Com preços em texto e em centavos: o HTML e o JSON precisam chegar aos mesmos valores
+            rows = (extract(path, html, parser), extract(path, html, parser, numeric_prices=True))
+            if reference is None:
+                reference = rows
+            elif rows != reference:
+                mismatches += 1
+                print(f"  ATENÇÃO: {parser} extraiu dados diferentes de {parsers[0]} em {os.path.basename(path)}")
+
+    if mismatches:
+        sys.exit(1)
+    print("\nTodos os backends extraíram os mesmos dados.")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,191 @@
+"""Benchmark dos scrapers completos contra o servidor local (stand_in_server.py).
+
+Uso:
+    python benchmarks/bench_scrapers.py [--links 200] [--scenarios search links-threads ...]
+                                        [--json resultado.json] [--baseline anterior.json]
+
+Sobe o servidor com as páginas de benchmarks/fixtures (latência e falhas
+configuráveis) e roda cada cenário num processo separado, para que o pico
+de memória de um não contamine o outro:
+
+    search             Scraper.scraping (todas as páginas da busca)
+    search-batch       BatchScraper.run com --queries buscas no mesmo processo
+    links-threads      LinkScraper.scrape_links
+    links-parallel     LinkScraper.scrape_link_parallel
+    links-async        LinkScraper.scrape_links_async
+    links-pipeline     LinkScraper.scrape_links_pipeline
+
+Para cada um mostra páginas/s, latência de download e de parsing (p50/p95,
+em ms; o download inclui retentativas e esperas do controlador) e o pico de
+RSS. Com --json o resultado é salvo; com --baseline ele é comparado com uma
+execução anterior.
+"""
+import argparse
+import contextlib
+import functools
+import json
+import os
+import random
+import resource
+import statistics
+import subprocess
+import sys
+import tempfile
+import time
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+import link_scraper  # noqa: E402
+import new_main  # noqa: E402
+from async_fetcher import AsyncFetcher  # noqa: E402
+from batch import BatchScraper  # noqa: E402
+from pipeline import ParserPool  # noqa: E402
+from stand_in_server import SEARCH_PREFIX, add_server_arguments, server_from_args  # noqa: E402
+
+SCENARIOS = ["search", "search-batch", "links-threads", "links-parallel", "links-async", "links-pipeline"]
+
+
+def timed(samples, func):
+    """Envolve `func` guardando a duração de cada chamada em `samples`."""
+    @functools.wraps(func)
+    def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return func(*args, **kwargs)
+        finally:
+            samples.append(time.perf_counter() - start)
+    return wrapper
+
+
+def timed_async(samples, func):
+    @functools.wraps(func)
+    async def wrapper(*args, **kwargs):
+        start = time.perf_counter()
+        try:
+            return await func(*args, **kwargs)
+        finally:
+            samples.append(time.perf_counter() - start)
+    return wrapper
+
+
+def percentiles_ms(samples):
+    if not samples:
+        return {"p50": None, "p95": None}
+    ordered = sorted(samples)
+    return {"p50": round(statistics.median(ordered) * 1000, 2),
+            "p95": round(ordered[min(len(ordered) - 1, int(len(ordered) * 0.95))] * 1000, 2)}
+
+
+def run_scenario(scenario, base_url, links, queries, seed):
+    """Executa um cenário neste processo e devolve as medidas."""
+    random.seed(seed)  # jitter do backoff
+    fetches, parses = [], []
+    if scenario.startswith("search"):
+        new_main.fetch_cached = timed(fetches, new_main.fetch_cached)
+        new_main.Scraper.parse_search_page = timed(parses, new_main.Scraper.parse_search_page)
+        scraper = new_main.Scraper()
+        scraper.base_url = base_url + SEARCH_PREFIX
+        run = functools.partial(scraper.scraping, "rtx 3050")
+        if scenario == "search-batch":
+            batch = BatchScraper(scraper, output_dir=tempfile.mkdtemp())
+            run = functools.partial(batch.run, [f"rtx 3050 {i}" for i in range(queries)], scraper.base_url)
+    else:
+        link_scraper.fetch_cached = timed(fetches, link_scraper.fetch_cached)
+        AsyncFetcher.fetch = timed_async(fetches, AsyncFetcher.fetch)
+        link_scraper.LinkScraper.parse_link = timed(parses, link_scraper.LinkScraper.parse_link)
+        # No modo pipeline o parsing roda em outro processo: mede a chamada inteira
+        ParserPool.call = timed(parses, ParserPool.call)
+        scraper = link_scraper.LinkScraper(None, None)
+        scraper.links = links
+        run = {
+            "links-threads": scraper.scrape_links,
+            "links-parallel": functools.partial(scraper.scrape_link_parallel, links),
+            "links-async": scraper.scrape_links_async,
+            "links-pipeline": scraper.scrape_links_pipeline,
+        }[scenario]
+
+    start = time.perf_counter()
+    with open(os.devnull, "w") as devnull, contextlib.redirect_stdout(devnull):
+        run()
+    seconds = time.perf_counter() - start
+
+    controller = scraper.controller
+    rss_kb = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    children_kb = resource.getrusage(resource.RUSAGE_CHILDREN).ru_maxrss
+    return {
+        "scenario": scenario,
+        "pages": len(fetches),
+        "seconds": round(seconds, 3),
+        "pages_per_sec": round(len(fetches) / seconds, 2) if seconds else None,
+        "fetch_ms": percentiles_ms(fetches),
+        "parse_ms": percentiles_ms(parses),
+        "peak_rss_mb": round(rss_kb / 1024, 1),
+        "peak_child_rss_mb": round(children_kb / 1024, 1),
+        "requests": controller.requests,
+        "retries": controller.retries,
+        "failed": controller.failed,
+    }
+
+
+def print_table(results, baseline):
+    print(f"{'cenário':<18} {'páginas':>7} {'s':>7} {'pág/s':>8} {'down p50/p95 ms':>17} "
+          f"{'parse p50/p95 ms':>17} {'RSS MB':>7} {'retent.':>7} {'falhas':>6}")
+    for r in results:
+        fetch = f"{r['fetch_ms']['p50']}/{r['fetch_ms']['p95']}"
+        parse = f"{r['parse_ms']['p50']}/{r['parse_ms']['p95']}"
+        rss = max(r["peak_rss_mb"], r["peak_child_rss_mb"])
+        line = (f"{r['scenario']:<18} {r['pages']:>7} {r['seconds']:>7.2f} {r['pages_per_sec']:>8.2f} {fetch:>17} "
+                f"{parse:>17} {rss:>7.1f} {r['retries']:>7} {r['failed']:>6}")
+        previous = baseline.get(r["scenario"])
+        if previous and previous.get("pages_per_sec"):
+            change = (r["pages_per_sec"] / previous["pages_per_sec"] - 1) * 100
+            line += f"   {change:+.1f}% pág/s vs. base"
+        print(line)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--scenarios", nargs="+", choices=SCENARIOS, default=SCENARIOS, help="Cenários a executar")
+    parser.add_argument("--links", type=int, default=200, help="Quantidade de links de produto")
+    parser.add_argument("--queries", type=int, default=5, help="Quantidade de buscas do cenário search-batch")
+    parser.add_argument("--json", help="Salva os resultados neste arquivo")
+    parser.add_argument("--baseline", help="Resultados de uma execução anterior (--json) para comparar")
+    parser.add_argument("--child", choices=SCENARIOS, help=argparse.SUPPRESS)
+    parser.add_argument("--base-url", help=argparse.SUPPRESS)
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    if args.child:
+        # Processo de um cenário: o servidor roda no processo principal
+        links = [f"{args.base_url}/MLB-{4000000000 + i}-produto-_JM" for i in range(args.links)]
+        print(json.dumps(run_scenario(args.child, args.base_url, links, args.queries, args.seed)))
+        return
+
+    server = server_from_args(args).start()
+    baseline = {}
+    if args.baseline:
+        with open(args.baseline, encoding="utf-8") as f:
+            baseline = {r["scenario"]: r for r in json.load(f)["results"]}
+
+    results = []
+    for scenario in args.scenarios:
+        server.reset()
+        command = [sys.executable, os.path.abspath(__file__), "--child", scenario, "--base-url", server.base_url,
+                   "--links", str(args.links), "--queries", str(args.queries), "--seed", str(args.seed)]
+        output = subprocess.run(command, check=True, capture_output=True, text=True).stdout
+        result = json.loads(output.strip().splitlines()[-1])
+        result["server"] = dict(server.stats)
+        results.append(result)
+    server.shutdown()
+
+    print_table(results, baseline)
+    if args.json:
+        settings = {name: getattr(args, name) for name in ("links", "queries", "latency", "jitter", "rate_429",
+                                                           "rate_timeout", "hang", "retry_after", "seed")}
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"settings": settings, "results": results}, f, indent=2)
+        print(f"\nResultados salvos em {args.json}")
+
+
+if __name__ == "__main__":
+    main()
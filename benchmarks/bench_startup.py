@@ -0,0 +1,76 @@
+"""Tempo de inicialização e memória dos módulos de entrada dos scrapers.
+
+Uso:
+    python benchmarks/bench_startup.py [--runs 7] [--json resultado.json]
+
+Cada medida roda num processo novo (sem cache de import entre uma e
+outra): o tempo do import do módulo e o pico de RSS do processo logo depois
+dele. As linhas "+ pandas" e "+ aiohttp" importam também essas bibliotecas,
+como acontecia antes de os scrapers passarem a ler e gravar CSV com o módulo
+csv da biblioteca padrão e a importar o aiohttp só no modo async; a
+diferença é o que cada execução curta (worker, cron) deixa de pagar.
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+TARGETS = [
+    ("link_scraper", ["link_scraper"]),
+    ("link_scraper + pandas + aiohttp", ["link_scraper", "pandas", "aiohttp"]),
+    ("new_main", ["new_main"]),
+    ("new_main + pandas", ["new_main", "pandas"]),
+    ("sharded", ["sharded"]),
+    ("pandas", ["pandas"]),
+]
+
+_CHILD = """
+import importlib, json, resource, sys, time
+start = time.perf_counter()
+for name in sys.argv[1:]:
+    importlib.import_module(name)
+seconds = time.perf_counter() - start
+print(json.dumps({"seconds": seconds, "rss_kb": resource.getrusage(resource.RUSAGE_SELF).ru_maxrss,
+                  "pandas": "pandas" in sys.modules, "aiohttp": "aiohttp" in sys.modules}))
+"""
+
+
+def measure(modules, runs):
+    samples = []
+    for _ in range(runs):
+        output = subprocess.run([sys.executable, "-c", _CHILD, *modules], cwd=ROOT, check=True,
+                                capture_output=True, text=True).stdout
+        samples.append(json.loads(output.strip().splitlines()[-1]))
+    return {
+        "import_ms": round(statistics.median(s["seconds"] for s in samples) * 1000, 1),
+        "peak_rss_mb": round(statistics.median(s["rss_kb"] for s in samples) / 1024, 1),
+        "pandas_loaded": samples[0]["pandas"],
+        "aiohttp_loaded": samples[0]["aiohttp"],
+    }
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--runs", type=int, default=7, help="Processos por medida (vale a mediana)")
+    parser.add_argument("--json", help="Salva os resultados neste arquivo")
+    args = parser.parse_args()
+
+    results = []
+    print(f"{'módulos':<34} {'import ms':>10} {'RSS MB':>8} {'pandas':>7} {'aiohttp':>8}")
+    for label, modules in TARGETS:
+        result = {"target": label, **measure(modules, args.runs)}
+        results.append(result)
+        print(f"{label:<34} {result['import_ms']:>10.1f} {result['peak_rss_mb']:>8.1f} "
+              f"{'sim' if result['pandas_loaded'] else 'não':>7} {'sim' if result['aiohttp_loaded'] else 'não':>8}")
+    if args.json:
+        with open(args.json, "w", encoding="utf-8") as f:
+            json.dump({"runs": args.runs, "results": results}, f, indent=2)
+        print(f"\nResultados salvos em {args.json}")
+
+
+if __name__ == "__main__":
+    main()
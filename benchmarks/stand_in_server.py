@@ -0,0 +1,154 @@
+"""Servidor HTTP local que substitui o Mercado Livre nos benchmarks.
+
+Uso:
+    python benchmarks/stand_in_server.py [--port 8800] [--latency 0.05] [--rate-429 0.02]
+
+Responde com as páginas salvas em benchmarks/fixtures: caminhos em /lista/
+recebem uma página "search_*.html" (todas as páginas da busca, inclusive as
+_Desde_) e os demais uma página "product_*.html", escolhida pelo caminho.
+Pode injetar latência, respostas 429 (com Retry-After) e timeouts (a
+resposta demora `--hang` segundos). A decisão de falhar depende só da
+semente, do caminho e de quantas vezes ele já foi pedido, então a mesma
+lista de URLs produz as mesmas falhas a cada execução.
+"""
+import argparse
+import hashlib
+import os
+import random
+import threading
+import time
+from collections import Counter
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+
+FIXTURES_DIR = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fixtures")
+SEARCH_PREFIX = "/lista/"
+
+
+class StandInServer(ThreadingHTTPServer):
+    daemon_threads = True
+
+    def __init__(self, port=0, fixtures=FIXTURES_DIR, latency=0.0, jitter=0.0, rate_429=0.0,
+                 rate_timeout=0.0, hang=11.0, retry_after=1, seed=0):
+        super().__init__(("127.0.0.1", port), _Handler)
+        self.latency = latency
+        self.jitter = jitter
+        self.rate_429 = rate_429
+        self.rate_timeout = rate_timeout
+        self.hang = hang
+        self.retry_after = retry_after
+        self.seed = seed
+        self.search_pages, self.product_pages = [], []
+        for name in sorted(os.listdir(fixtures)):
+            with open(os.path.join(fixtures, name), "rb") as f:
+                if name.startswith("search_"):
+                    self.search_pages.append(f.read())
+                elif name.startswith("product_"):
+                    self.product_pages.append(f.read())
+        self._lock = threading.Lock()
+        self._attempts = Counter()
+        self.stats = Counter()
+
+    @property
+    def base_url(self):
+        return f"http://127.0.0.1:{self.server_address[1]}"
+
+    def product_urls(self, count, start=4000000000):
+        """Links de produto distintos (um código MLB por link) servidos por este servidor."""
+        return [f"{self.base_url}/MLB-{start + i}-produto-_JM" for i in range(count)]
+
+    def reset(self):
+        """Zera as contagens, para que cada cenário veja a mesma sequência de falhas."""
+        with self._lock:
+            self._attempts.clear()
+            self.stats.clear()
+
+    def start(self):
+        """Atende em uma thread em segundo plano; devolve o próprio servidor."""
+        threading.Thread(target=self.serve_forever, daemon=True).start()
+        return self
+
+    def plan(self, path):
+        """(atraso em segundos, falha) da próxima resposta para o caminho."""
+        with self._lock:
+            attempt = self._attempts[path]
+            self._attempts[path] += 1
+        digest = hashlib.sha256(f"{self.seed}:{path}:{attempt}".encode()).digest()
+        rng = random.Random(digest)
+        delay = max(0.0, self.latency + rng.uniform(-self.jitter, self.jitter))
+        draw = rng.random()
+        if draw < self.rate_429:
+            return delay, "429"
+        if draw < self.rate_429 + self.rate_timeout:
+            return self.hang, "timeout"
+        return delay, None
+
+    def page(self, path):
+        pages = self.search_pages if path.startswith(SEARCH_PREFIX) else self.product_pages
+        index = int(hashlib.sha256(path.encode()).hexdigest(), 16) % len(pages)
+        return pages[index]
+
+
+class _Handler(BaseHTTPRequestHandler):
+    protocol_version = "HTTP/1.1"
+
+    def do_GET(self):
+        server = self.server
+        delay, fault = server.plan(self.path)
+        time.sleep(delay)
+        with server._lock:
+            server.stats[fault or "200"] += 1
+        if fault == "429":
+            self.send_response(429)
+            self.send_header("Retry-After", str(server.retry_after))
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+            return
+        if fault == "timeout":
+            # O cliente já desistiu; fecha sem resposta
+            self.close_connection = True
+            return
+        body = server.page(self.path)
+        self.send_response(200)
+        self.send_header("Content-Type", "text/html; charset=utf-8")
+        self.send_header("Content-Length", str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, *args):
+        pass
+
+
+def add_server_arguments(parser):
+    """Opções do servidor, compartilhadas com bench_scrapers.py."""
+    parser.add_argument("--latency", type=float, default=0.05, help="Latência de cada resposta (segundos)")
+    parser.add_argument("--jitter", type=float, default=0.02, help="Variação da latência (+/- segundos)")
+    parser.add_argument("--rate-429", type=float, default=0.02, help="Fração das respostas com 429")
+    parser.add_argument("--rate-timeout", type=float, default=0.0, help="Fração das respostas que não chegam")
+    parser.add_argument("--hang", type=float, default=11.0,
+                        help="Quanto uma resposta com timeout demora (acima do timeout de 10 s dos scrapers)")
+    parser.add_argument("--retry-after", type=int, default=1, help="Retry-After das respostas 429 (segundos)")
+    parser.add_argument("--seed", type=int, default=0, help="Semente das falhas injetadas")
+
+
+def server_from_args(args, port=0):
+    return StandInServer(port, latency=args.latency, jitter=args.jitter, rate_429=args.rate_429,
+                         rate_timeout=args.rate_timeout, hang=args.hang, retry_after=args.retry_after,
+                         seed=args.seed)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__, formatter_class=argparse.RawDescriptionHelpFormatter)
+    parser.add_argument("--port", type=int, default=8800, help="Porta local")
+    add_server_arguments(parser)
+    args = parser.parse_args()
+
+    server = server_from_args(args, args.port)
+    print(f"Servindo em {server.base_url} (busca em {server.base_url}{SEARCH_PREFIX}, produtos nos demais caminhos)")
+    try:
+        server.serve_forever()
+    except KeyboardInterrupt:
+        print(dict(server.stats))
+
+
+if __name__ == "__main__":
+    main()
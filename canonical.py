@@ -0,0 +1,131 @@
+import os
+import re
+import threading
+from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+
+# Parâmetros de rastreamento que mudam a cada busca sem mudar a página
+TRACKING_PARAMS = {
+    "polycard_client", "tracking_id", "position", "search_layout", "type", "sid", "searchVariation",
+    "reco_backend", "reco_backend_type", "reco_client", "reco_id", "reco_item_pos",
+    "c_id", "c_uid", "c_element_order", "c_campaign", "c_label", "source", "is_advertising",
+    "ad_domain", "ad_position", "ad_click_id", "matt_tool", "matt_word", "deal_print_id",
+}
+_ITEM_ID = re.compile(r"/MLB-?(\d+)", re.IGNORECASE)
+_CATALOG_ID = re.compile(r"/p/MLB(\d+)", re.IGNORECASE)
+_WID = re.compile(r"^MLB-?(\d+)$", re.IGNORECASE)
+
+
+def _params(text):
+    return parse_qsl(text, keep_blank_values=True)
+
+
+def _is_tracking(name):
+    return name in TRACKING_PARAMS or name.startswith("utm_")
+
+
+def listing_id(url):
+    """Código MLB normalizado ("MLB4631052614") do anúncio apontado pelo link, ou None.
+
+    Links de catálogo (/p/MLB...) identificam o produto, não o anúncio; quando
+    trazem o anúncio da busca (`wid`, no fragmento ou na query) é ele que vale,
+    para coincidir com o link direto do mesmo anúncio.
+    """
+    parts = urlsplit(url)
+    for name, value in _params(parts.fragment) + _params(parts.query):
+        match = _WID.match(value) if name == "wid" else None
+        if match:
+            return "MLB" + match.group(1)
+    if _CATALOG_ID.search(parts.path):
+        return None
+    match = _ITEM_ID.search(parts.path)
+    return "MLB" + match.group(1) if match else None
+
+
+def canonicalize_url(url):
+    """Link sem o estado de rastreamento: esquema/host em minúsculas, query sem
+    parâmetros de rastreamento (ordenada) e fragmento reduzido ao `wid` dos
+    links de catálogo, que é o que identifica o anúncio."""
+    parts = urlsplit(url.strip())
+    query = urlencode(sorted((name, value) for name, value in _params(parts.query) if not _is_tracking(name)))
+    fragment = ""
+    if _CATALOG_ID.search(parts.path):
+        wid = [value for name, value in _params(parts.fragment) if name == "wid"]
+        fragment = f"wid={wid[0]}" if wid else ""
+    return urlunsplit((parts.scheme.lower(), parts.netloc.lower(), parts.path or "/", query, fragment))
+
+
+def dedup_key(url):
+    """Chave de deduplicação: o anúncio (MLB) quando conhecido, senão o link canônico."""
+    return listing_id(url) or canonicalize_url(url)
+
+
+class Deduplicator:
+    """Filtra links repetidos antes de baixá-los.
+
+    Os links são canonicalizados e comparados pela chave de `dedup_key`, de
+    modo que o mesmo anúncio vindo de várias páginas de busca, com
+    rastreamentos diferentes ou como link de catálogo e link direto, é
+    baixado uma vez só. Com `path`, os links concluídos com sucesso (ver
+    `remember`) são gravados num índice em disco (uma chave por linha) e
+    pulados nas execuções seguintes; links lidos mas não baixados, ou que
+    falharam, continuam pendentes.
+    """
+
+    def __init__(self, path=None):
+        self.path = path
+        self._lock = threading.Lock()
+        self._seen = set()
+        # Chaves já gravadas no índice em disco
+        self._stored = set()
+        self._file = None
+        if path:
+            if os.path.exists(path):
+                with open(path, encoding="utf-8") as f:
+                    self._stored.update(line.rstrip("\n") for line in f if line.endswith("\n"))
+                self._seen.update(self._stored)
+            directory = os.path.dirname(path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(path, "a", encoding="utf-8")
+        self.received = 0
+        self.duplicates = 0
+
+    def admit(self, url):
+        """Link canônico se ele ainda não foi visto, ou None se for repetido."""
+        key = dedup_key(url)
+        with self._lock:
+            self.received += 1
+            if key in self._seen:
+                self.duplicates += 1
+                return None
+            self._seen.add(key)
+        return canonicalize_url(url)
+
+    def remember(self, url):
+        """Grava o link no índice em disco, para as próximas execuções o pularem.
+
+        Chamado só depois de o link ser extraído com sucesso: um link admitido
+        que não chegou a ser baixado (interrupção, falha) volta na próxima vez.
+        """
+        if self._file is None:
+            return
+        key = dedup_key(url)
+        with self._lock:
+            if key in self._stored:
+                return
+            self._stored.add(key)
+            self._file.write(key + "\n")
+            self._file.flush()
+
+    def filter(self, urls):
+        """Links canônicos únicos, na ordem em que apareceram."""
+        return [url for url in map(self.admit, urls) if url is not None]
+
+    def report(self):
+        """Resumo da deduplicação nesta execução."""
+        return (f"Deduplicação: {self.received} links | {self.received - self.duplicates} únicos | "
+                f"{self.duplicates} requisições evitadas")
+
+    def close(self):
+        if self._file is not None:
+            self._file.close()
@@ -0,0 +1,78 @@
+import json
+import os
+import threading
+
+
+class CheckpointJournal:
+    """Diário append-only (JSON Lines) do trabalho concluído.
+
+    Cada linha guarda uma chave (URL do link ou da página de busca) e as
+    linhas extraídas dela. Ao reabrir o arquivo, as chaves já concluídas são
+    carregadas para que a execução pule esse trabalho; a exportação final é
+    montada a partir do diário. Registros com `ok=False` (falhas) entram na
+    exportação, mas a chave é tentada de novo na próxima execução.
+    """
+
+    def __init__(self, path):
+        self.path = path
+        self._lock = threading.Lock()
+        # chave -> (posição da última linha da chave no arquivo, concluída?)
+        self._index = {}
+        self._load()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(path, "ab")
+
+    def _load(self):
+        if not os.path.exists(self.path):
+            return
+        with open(self.path, "rb") as f:
+            offset = 0
+            for line in f:
+                try:
+                    if not line.endswith(b"\n"):
+                        raise ValueError
+                    record = json.loads(line)
+                except ValueError:
+                    # Última linha cortada por uma interrupção no meio da escrita
+                    break
+                self._index[record["key"]] = (offset, record.get("ok", True))
+                offset += len(line)
+        if offset < os.path.getsize(self.path):
+            with open(self.path, "r+b") as f:
+                f.truncate(offset)
+
+    def __contains__(self, key):
+        entry = self._index.get(key)
+        return entry is not None and entry[1]
+
+    def __len__(self):
+        return sum(1 for _, ok in self._index.values() if ok)
+
+    def append(self, key, rows, ok=True, **extra):
+        """Registra uma chave concluída e suas linhas (gravado imediatamente)."""
+        # default=dict serializa os registros de schema fixo (listing.Listing)
+        record = {"key": key, "ok": ok, "rows": rows, **extra}
+        line = (json.dumps(record, ensure_ascii=False, default=dict) + "\n").encode("utf-8")
+        with self._lock:
+            offset = self._file.tell()
+            self._file.write(line)
+            self._file.flush()
+            self._index[key] = (offset, ok)
+
+    def rows(self, done_only=False):
+        """Todas as linhas registradas, na ordem em que cada chave apareceu pela primeira vez.
+
+        Com `done_only`, só as das chaves concluídas (sem os registros de falha).
+        """
+        with self._lock:
+            self._file.flush()
+            offsets = [offset for offset, ok in self._index.values() if ok or not done_only]
+        with open(self.path, "rb") as f:
+            for offset in offsets:
+                f.seek(offset)
+                yield from json.loads(f.readline())["rows"]
+
+    def close(self):
+        self._file.close()
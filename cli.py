@@ -0,0 +1,65 @@
+"""Opções de linha de comando compartilhadas pelos scrapers.
+
+Cada `add_*_arguments` acrescenta um grupo de opções ao parser do script;
+`open_resources` abre o cache, o histórico, as medidas e o arquivo de HTML
+pedidos (no formato dos argumentos de Scraper e LinkScraper) e
+`close_resources` os fecha no fim, gravando as medidas.
+"""
+from html_archive import DEFAULT_ARCHIVE_PATH, HtmlArchive
+from http_cache import DEFAULT_CACHE_DIR, HttpCache
+from instrumentation import RunStats, urls_path
+from parsers import DEFAULT_PARSER, available_parsers
+from price_store import DEFAULT_STORE_PATH, PriceStore
+
+
+def add_parsing_arguments(parser):
+    """Backend de parsing e modo de extração."""
+    parser.add_argument("--parser", choices=available_parsers(), default=DEFAULT_PARSER,
+                        help="Backend de parsing do HTML")
+    parser.add_argument("--extraction", choices=["dom", "state"], default="dom",
+                        help="Extrair pelo HTML ou pelo JSON embutido na página (com fallback para o HTML)")
+
+
+def add_format_arguments(parser, parquet=True, numeric_prices=True):
+    """Formato da saída: arquivo .parquet e preços numéricos."""
+    if parquet:
+        parser.add_argument("--parquet", action="store_true", help="Grava também um arquivo .parquet (requer pyarrow)")
+    if numeric_prices:
+        parser.add_argument("--numeric-prices", action="store_true",
+                            help="Exporta preços em centavos e desconto em percentual (colunas numéricas)")
+
+
+def add_resource_arguments(parser):
+    """Cache em disco, histórico de preços, arquivo de HTML e medidas da execução."""
+    parser.add_argument("--cache", action="store_true", help="Guarda as páginas em cache no disco")
+    parser.add_argument("--cache-dir", default=DEFAULT_CACHE_DIR, help="Diretório do cache")
+    parser.add_argument("--cache-ttl", type=int, default=6 * 3600, help="Validade das páginas em cache (segundos)")
+    parser.add_argument("--store", nargs="?", const=DEFAULT_STORE_PATH,
+                        help=f"Grava o histórico de preços em SQLite (padrão: {DEFAULT_STORE_PATH})")
+    parser.add_argument("--archive", nargs="?", const=DEFAULT_ARCHIVE_PATH,
+                        help=f"Arquiva o HTML baixado para reextração offline (padrão: {DEFAULT_ARCHIVE_PATH})")
+    parser.add_argument("--stats-file",
+                        help="Grava as medidas da execução (JSON, ou texto do Prometheus se terminar em .prom); "
+                             "o detalhe por URL vai para <arquivo>.urls.jsonl")
+
+
+def open_resources(args):
+    """{"cache", "store", "stats", "archive"} pedidos em `args` (None quando desligados)."""
+    return {
+        "cache": HttpCache(args.cache_dir, ttl=args.cache_ttl) if args.cache else None,
+        "store": PriceStore(args.store) if args.store else None,
+        "stats": RunStats(urls_path(args.stats_file)) if args.stats_file else None,
+        "archive": HtmlArchive(args.archive) if args.archive else None,
+    }
+
+
+def close_resources(resources, args, selector_stats=None):
+    """Fecha o que `open_resources` abriu e grava as medidas em `args.stats_file`."""
+    for name in ("store", "cache", "archive"):
+        if resources[name] is not None:
+            resources[name].close()
+    stats = resources["stats"]
+    if stats is not None:
+        stats.write(args.stats_file, selector_stats)
+        stats.close()
+        print(f"Medidas gravadas em {args.stats_file} (detalhe por URL em {stats.urls_path})")
@@ -0,0 +1,141 @@
+"""Leitura do estado pré-carregado (JSON) embutido nas páginas do Mercado Livre.
+
+As páginas de busca e de produto trazem um blob `__PRELOADED_STATE__` com os
+mesmos dados exibidos no HTML. Aqui o blob é localizado por busca de texto e
+só o JSON é decodificado, sem montar a árvore do HTML. As funções devolvem
+os valores brutos de cada campo (os scrapers formatam como no caminho do
+DOM) ou None quando o blob não existe ou tem formato inesperado; nesse caso
+o chamador volta para a extração pelo HTML.
+"""
+import json
+import re
+
+_STATE_START = re.compile(
+    r'<script[^>]*\bid="__PRELOADED_STATE__"[^>]*>\s*|window\.__PRELOADED_STATE__\s*=\s*')
+_QUANTITY_RESULTS = re.compile(
+    r'class="ui-search-search-result__quantity-results"[^>]*>\s*([\d.,]+)')
+_decoder = json.JSONDecoder()
+
+# Campos da página de produto: caminhos alternativos dentro de initialState.components
+PRODUCT_PATHS = {
+    "title": [("header", "title")],
+    "seller": [("seller_data", "title_value"), ("seller", "title_value")],
+    "seller_sales": [("seller_data", "seller_info", "subtitle"), ("seller", "seller_info", "subtitle")],
+    "price_current": [("price", "price", "value")],
+    "price_previous": [("price", "price", "original_value")],
+    "discount": [("price", "discount_label", "value")],
+    "installments": [("price", "subtitles", 0)],
+    "qtd_available": [("available_quantity", "picker", "description"), ("available_quantity", "quantity_text")],
+}
+
+
+def load_state(html):
+    """Decodifica o blob __PRELOADED_STATE__ da página (ou None se não houver)."""
+    match = _STATE_START.search(html)
+    if not match:
+        return None
+    try:
+        # raw_decode para no fim do objeto JSON, ignorando o resto do HTML
+        state, _ = _decoder.raw_decode(html, match.end())
+    except ValueError:
+        return None
+    return state if isinstance(state, dict) else None
+
+
+def dig(obj, *path):
+    """Segue o caminho de chaves/índices; None se algum passo não existir."""
+    for key in path:
+        if isinstance(obj, dict):
+            obj = obj.get(key)
+        elif isinstance(obj, list) and isinstance(key, int) and -len(obj) <= key < len(obj):
+            obj = obj[key]
+        else:
+            return None
+    return obj
+
+
+def first(obj, paths):
+    """Primeiro valor não nulo entre os caminhos alternativos."""
+    for path in paths:
+        value = dig(obj, *path)
+        if value is not None:
+            return value
+    return None
+
+
+def render(component):
+    """Monta o texto de um componente com modelo, ex.: "Por {seller}" + values."""
+    if not isinstance(component, dict):
+        return component
+    text = component.get("text")
+    if text is None:
+        return None
+    values = component.get("values") or []
+    if isinstance(values, dict):
+        values = [dict(value, key=key) for key, value in values.items()]
+    for value in values:
+        label = dig(value, "label", "text") or value.get("text") or ""
+        text = text.replace("{" + str(value.get("key")) + "}", label)
+    return text
+
+
+def total_results(html):
+    """Total de resultados da busca lido direto do HTML, sem parsing."""
+    match = _QUANTITY_RESULTS.search(html)
+    if not match:
+        return None
+    digits = re.sub(r"\D", "", match.group(1))
+    return int(digits) if digits else None
+
+
+def search_items(state):
+    """Campos brutos de cada post da busca, ou None se o estado não tiver o formato esperado."""
+    results = first(state, [("pageState", "initialState", "results"), ("initialState", "results")])
+    if not isinstance(results, list):
+        return None
+
+    items = []
+    for result in results:
+        card = result.get("polycard") if isinstance(result, dict) else None
+        if not card:
+            continue  # banners e outros blocos que não são anúncios
+        components = {c.get("type"): c.get(c.get("type")) for c in card.get("components", [])
+                      if isinstance(c, dict)}
+        title = dig(components, "title", "text")
+        price_current = dig(components, "price", "current_price", "value")
+        url = dig(card, "metadata", "url")
+        if title is None or price_current is None or url is None:
+            return None
+
+        installments = components.get("installments")
+        picture = dig(card, "pictures", "pictures", 0, "id")
+        items.append({
+            "title": title,
+            "seller": render(components.get("seller")),
+            # Sem preço anterior o post mostra só o atual (mesmo fallback do DOM)
+            "price_previous": dig(components, "price", "previous_price", "value") or price_current,
+            "price_current": price_current,
+            "discount": dig(components, "price", "discount_label", "text"),
+            "installments": render(installments),
+            "premium": dig(installments, "color") == "POSITIVE",
+            "post_link": "https://" + url + (dig(card, "metadata", "url_fragments") or ""),
+            "image": f"https://http2.mlstatic.com/D_Q_NP_{picture}-O.webp" if picture else "N/A",
+        })
+    return items
+
+
+def product_fields(state):
+    """Campos brutos da página de produto, ou None se o estado não tiver o formato esperado."""
+    components = first(state, [("initialState", "components"), ("pageState", "initialState", "components")])
+    if not isinstance(components, dict):
+        return None
+
+    fields = {field: first(components, paths) for field, paths in PRODUCT_PATHS.items()}
+    if fields["title"] is None or fields["price_current"] is None:
+        return None
+
+    fields["installments"] = render(fields["installments"])
+    if fields["discount"] is not None:
+        fields["discount"] = f"{fields['discount']}% OFF"
+    fields["paused"] = first(state, [("initialState", "item_status")]) == "paused"
+    return fields
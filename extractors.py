@@ -0,0 +1,138 @@
+import re
+from collections import Counter, defaultdict, namedtuple
+
+from parsers import SelectolaxNode, class_matches
+
+MISS = "miss"
+
+
+class Selector(namedtuple("Selector", ["tag", "class_", "accept"])):
+    """Uma variante de seletor de um campo: tag, classe (regra do `class_=` do bs4)
+    e, opcionalmente, uma função que decide se o elemento encontrado serve."""
+
+    def __new__(cls, tag, class_=None, accept=None):
+        return super().__new__(cls, tag, class_, accept)
+
+    @property
+    def label(self):
+        return self.tag + ("." + ".".join(self.class_.split()) if self.class_ else "")
+
+
+def has_text(element):
+    """Aceita o elemento apenas se ele tiver texto além de espaços."""
+    return bool(element.get_text().strip())
+
+
+def money_amount(element):
+    """Valor de um preço do HTML ("andes-money-amount") como float, ou None sem a fração.
+
+    A fração e os centavos ficam em spans separados e o texto do elemento
+    inteiro junta os dois ("1.295" + "50" -> "1.29550"), então cada um é lido
+    à parte. Aceita também o próprio span da fração.
+    """
+    if element is None:
+        return None
+    fraction = element.find("span", class_="andes-money-amount__fraction") or element
+    digits = re.sub(r"\D", "", fraction.get_text())
+    if not digits:
+        return None
+    cents = element.find("span", class_="andes-money-amount__cents")
+    cents = re.sub(r"\D", "", cents.get_text()) if cents else ""
+    return int(digits) + int(cents.ljust(2, "0")[:2]) / 100 if cents else float(digits)
+
+
+class FieldExtractor:
+    """Extrai vários campos percorrendo a árvore uma única vez.
+
+    Cada campo tem uma lista de variantes de seletor em ordem de preferência
+    (como as cadeias de `find` com fallback). Vale o primeiro elemento, em
+    ordem de documento, de cada variante, e o campo fica com a primeira
+    variante aceita. Os seletores são indexados por tag uma vez, na criação.
+
+    Exemplo:
+        extractor = FieldExtractor({
+            "title": [Selector("h1", "ui-pdp-title")],
+            "qtd": [Selector("span", "qtd", has_text), Selector("div", "qtd")],
+        })
+        matches = extractor.extract(soup)  # {"title": (elemento, 0), "qtd": (None, None)}
+    """
+
+    def __init__(self, fields):
+        self.fields = fields
+        self._by_tag = defaultdict(list)
+        for field, variants in fields.items():
+            for index, selector in enumerate(variants):
+                self._by_tag[selector.tag].append((field, index, selector))
+        # Grupo CSS equivalente, usado pelo backend selectolax (uma única busca em C)
+        self._css = ", ".join(sorted({sel.label for variants in fields.values() for sel in variants}))
+
+    def _elements(self, root):
+        """Gera (tag, classe, elemento) para os descendentes que podem casar com algum seletor."""
+        if isinstance(root, SelectolaxNode):
+            node = root.node
+            # mem_id identifica o nó sem serializar o HTML (o `!=` do selectolax compara o HTML)
+            for child in node.css(self._css):
+                if child.mem_id != node.mem_id:
+                    yield child.tag, child.attributes.get("class"), SelectolaxNode(child)
+            return
+        by_tag = self._by_tag
+        for element in root.descendants:
+            name = element.name
+            if name in by_tag:
+                classes = element.get("class")
+                yield name, " ".join(classes) if classes else None, element
+
+    def _resolve(self, field, found):
+        """Variante vencedora do campo, -1 se todas falharam, ou None se ainda não dá para saber."""
+        for index in range(len(self.fields[field])):
+            if (field, index) not in found:
+                return None
+            if found[(field, index)] is not None:
+                return index
+        return -1
+
+    def extract(self, root):
+        """Devolve {campo: (elemento, índice da variante)}; (None, None) quando nada casou."""
+        found = {}
+        resolved = {}
+        total = len(self.fields)
+        by_tag = self._by_tag
+
+        for tag, class_attr, element in self._elements(root):
+            for field, index, selector in by_tag[tag]:
+                if field in resolved or (field, index) in found:
+                    continue
+                if not class_matches(class_attr, selector.class_):
+                    continue
+                accepted = selector.accept is None or selector.accept(element)
+                found[(field, index)] = element if accepted else None
+                winner = self._resolve(field, found)
+                if winner is not None:
+                    resolved[field] = winner
+            if len(resolved) == total:
+                break
+
+        matches = {}
+        for field, variants in self.fields.items():
+            index = resolved.get(field)
+            if index is None:
+                # Fim do documento: variantes não vistas simplesmente não existem
+                index = next((i for i in range(len(variants)) if found.get((field, i)) is not None), -1)
+            matches[field] = (found[(field, index)], index) if index >= 0 else (None, None)
+        return matches
+
+    def record(self, stats, matches):
+        """Soma em `stats` qual variante casou em cada campo (ou "miss")."""
+        for field, (_, index) in matches.items():
+            stats[(field, self.fields[field][index].label if index is not None else MISS)] += 1
+
+
+def selector_report(stats):
+    """Texto com a taxa de acerto de cada variante de seletor, por campo."""
+    totals = Counter()
+    for (field, _), count in stats.items():
+        totals[field] += count
+    lines = []
+    for (field, label), count in sorted(stats.items()):
+        lines.append(f"{field:<16} {label:<60} {count:>6} ({count / totals[field]:.0%})")
+    return "\n".join(lines)
@@ -0,0 +1,155 @@
+import argparse
+import os
+import threading
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+from cli import add_format_arguments, add_parsing_arguments, add_resource_arguments, close_resources, open_resources
+from instrumentation import print_reports
+from link_scraper import LINK_FIELDS, LinkScraper
+from new_main import COUNTRIES, SEARCH_FIELDS, Scraper, clean_name
+from pagination import SearchUnavailable, iter_search_pages
+from pipeline import ParserPool
+from prices import NUMERIC_COLUMNS, format_prices, normalize_prices, numeric_fieldnames
+from row_writer import RowWriter
+
+# Campos da página do produto entram no registro com este prefixo
+DETAIL_PREFIX = "detail_"
+
+
+def fused_fieldnames(numeric_prices=False):
+    """Colunas do registro combinado: as da busca seguidas das da página do produto."""
+    search_fields, link_fields = SEARCH_FIELDS, [field for field in LINK_FIELDS if field != "url"]
+    if numeric_prices:
+        search_fields, link_fields = numeric_fieldnames(search_fields), numeric_fieldnames(link_fields)
+    return search_fields + [DETAIL_PREFIX + field for field in link_fields]
+
+
+class FusedScraper:
+    """Busca e páginas de produto num só fluxo, sem o CSV intermediário.
+
+    Assim que uma página de busca é processada, cada link dela vai direto
+    para a fila de detalhes (LinkScraper.scrape_link), então os downloads da
+    busca e dos produtos se sobrepõem. Os dois scrapers compartilham a sessão
+    HTTP e o controlador adaptativo. Cada anúncio gera um registro com os
+    campos da busca e os da página do produto (prefixo "detail_"), gravado em
+    disco assim que o detalhe fica pronto. Com `max_pending` links esperando
+    detalhe, a leitura da busca aguarda.
+    """
+
+    def __init__(self, scraper, link_scraper=None, max_pending=None):
+        self.scraper = scraper
+        if link_scraper is None:
+            link_scraper = LinkScraper(None, None, controller=scraper.controller, parser=scraper.parser,
+                                       extraction=scraper.extraction, cache=scraper.cache,
+                                       numeric_prices=scraper.numeric_prices, stats=scraper.stats,
+                                       archive=scraper.archive)
+        # Uma sessão só: reaproveita as conexões keep-alive entre busca e detalhes
+        link_scraper.session = scraper.session
+        self.link_scraper = link_scraper
+        self.max_pending = max_pending or 4 * scraper.controller.max_limit
+        self.records = 0
+        # Anúncios perdidos por um erro inesperado ao extrair, combinar ou gravar o registro
+        self.errors = 0
+        self._lock = threading.Lock()
+
+    def run(self, product_name, output_file, base_url=COUNTRIES[1]):
+        """Executa a busca e os detalhes, gravando os registros em `output_file`."""
+        scraper = self.scraper
+        cleaned_name = clean_name(product_name)
+        parquet_path = os.path.splitext(output_file)[0] + ".parquet" if scraper.parquet else None
+        int_fields = [DETAIL_PREFIX + field for field in NUMERIC_COLUMNS.values()] + list(NUMERIC_COLUMNS.values())
+        writer = RowWriter(output_file, fused_fieldnames(scraper.numeric_prices), parquet_path=parquet_path,
+                           int_fields=int_fields if scraper.numeric_prices else ())
+
+        pool = None
+        parse = scraper.parse_search_page
+        if scraper.parse_workers:
+            pool = ParserPool(Scraper, scraper.parse_workers, scraper.selector_stats, scraper.stats,
+                              parser=scraper.parser, extraction=scraper.extraction,
+                              numeric_prices=scraper.numeric_prices)
+            parse = partial(pool.call, "parse_search_page")
+
+        pending = threading.BoundedSemaphore(self.max_pending)
+        try:
+            with ThreadPoolExecutor(max_workers=self.link_scraper.controller.max_limit) as details:
+                for i, url, rows in iter_search_pages(scraper.fetch_page, base_url, cleaned_name, scraper.page_window,
+                                                      parse=parse, parallel_parse=pool is not None):
+                    if not rows:
+                        print("\nTérmino da busca.")
+                        break
+                    rows = [row for row in rows if scraper.dedup.admit(row["post link"])]
+                    print(f"Página {i}: {len(rows)} anúncios enviados para detalhes ({url})")
+                    for row in rows:
+                        pending.acquire()
+                        future = details.submit(self._detail, row, writer)
+                        future.add_done_callback(partial(self._done, row, pending))
+        finally:
+            if pool is not None:
+                pool.close()
+            writer.close()
+
+        print(f"{self.records} registros exportados para {output_file} | {self.errors} com erro")
+        print_reports(scraper.controller, scraper.dedup, scraper.stats, self.selector_stats(), scraper.cache,
+                      self.link_scraper.store, scraper.archive)
+        return self.records
+
+    def _detail(self, search_row, writer):
+        detail_row = self.link_scraper.scrape_link(search_row["post link"])
+        record = self.join(search_row, detail_row)
+        writer.write(record)
+        with self._lock:
+            self.records += 1
+
+    def _done(self, search_row, pending, future):
+        pending.release()
+        error = future.exception()
+        if error is not None:
+            # Sem isto o erro ficaria guardado no future e o anúncio sumiria em silêncio
+            with self._lock:
+                self.errors += 1
+            print(f"Erro ao processar {search_row['post link']}: {error!r}")
+
+    def join(self, search_row, detail_row):
+        """Registro combinado de um anúncio (busca + página do produto)."""
+        # Formatação da saída: centavos ou texto "R$ 1.295,50"
+        format_rows = normalize_prices if self.scraper.numeric_prices else format_prices
+        search_row, detail_row = format_rows([search_row, detail_row])
+        record = dict(search_row)
+        for field, value in detail_row.items():
+            if field != "url":
+                record[DETAIL_PREFIX + field] = value
+        return record
+
+    def selector_stats(self):
+        """Estatísticas de seletor da busca e dos detalhes somadas."""
+        return self.scraper.selector_stats + self.link_scraper.selector_stats
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Busca no Mercado Livre e extrai a página de cada anúncio "
+                                                 "num só fluxo, gerando um registro combinado por anúncio.")
+    parser.add_argument("--query", required=True, help="Termo de busca")
+    parser.add_argument("--output", help="CSV de saída (padrão: data/ml_<busca>_detalhes.csv)")
+    parser.add_argument("--country", type=int, choices=sorted(COUNTRIES), default=1, help="País (número do menu)")
+    parser.add_argument("--parse-workers", type=int, default=0,
+                        help="Processos de parsing das páginas de busca (0: no próprio processo)")
+    add_parsing_arguments(parser)
+    add_resource_arguments(parser)
+    add_format_arguments(parser)
+    args = parser.parse_args()
+
+    resources = open_resources(args)
+    scraper = Scraper(parser=args.parser, extraction=args.extraction, parquet=args.parquet,
+                      numeric_prices=args.numeric_prices, parse_workers=args.parse_workers,
+                      cache=resources["cache"], stats=resources["stats"], archive=resources["archive"])
+    link_scraper = LinkScraper(None, None, controller=scraper.controller, parser=args.parser,
+                               extraction=args.extraction, numeric_prices=args.numeric_prices, **resources)
+    fused = FusedScraper(scraper, link_scraper)
+
+    output = args.output or f"data/ml_{clean_name(args.query)}_detalhes.csv"
+    try:
+        fused.run(args.query, output, COUNTRIES[args.country])
+    except SearchUnavailable as e:
+        raise SystemExit(f"\n{e}")
+    finally:
+        close_resources(resources, args, fused.selector_stats())
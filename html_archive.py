@@ -0,0 +1,170 @@
+import gzip
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+from canonical import canonicalize_url
+
+try:
+    import zstandard
+except ImportError:  # zstandard é opcional; sem ele o arquivo usa gzip
+    zstandard = None
+
+DEFAULT_ARCHIVE_PATH = "data/html_archive.sqlite"
+CODECS = ("zstd", "gzip")
+
+
+def compress(data, codec, level=None):
+    if codec == "zstd":
+        return zstandard.ZstdCompressor(level=level or 9).compress(data)
+    return gzip.compress(data, compresslevel=level or 6)
+
+
+def decompress(data, codec):
+    if codec == "zstd":
+        if zstandard is None:
+            raise RuntimeError("Conteúdo gravado com zstd: instale com 'pip install zstandard'")
+        return zstandard.ZstdDecompressor().decompress(data)
+    return gzip.decompress(data)
+
+
+class HtmlArchive:
+    """Arquivo das páginas baixadas, para reextrair os dados sem acessar a rede.
+
+    Tudo fica num único banco SQLite: cada conteúdo distinto é gravado uma
+    vez, comprimido (zstd se o pacote `zstandard` estiver instalado, senão
+    gzip) e identificado pelo SHA-256, e cada download vira uma linha do
+    índice com a URL canônica, o tipo da página ("search" ou "product") e a
+    data. As gravações são feitas em lotes de `batch_size` páginas.
+    """
+
+    def __init__(self, path=DEFAULT_ARCHIVE_PATH, codec=None, level=None, batch_size=50):
+        codec = codec or ("zstd" if zstandard is not None else "gzip")
+        if codec not in CODECS:
+            raise ValueError(f"Compressão desconhecida: {codec} (opções: {', '.join(CODECS)})")
+        if codec == "zstd" and zstandard is None:
+            raise ValueError("A compressão zstd requer o pacote zstandard: pip install zstandard")
+        self.path = path
+        self.codec = codec
+        self.level = level
+        self.batch_size = batch_size
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._pending = 0
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS contents (
+                hash TEXT PRIMARY KEY,
+                codec TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                stored_size INTEGER NOT NULL,
+                data BLOB NOT NULL
+            );
+            CREATE TABLE IF NOT EXISTS pages (
+                id INTEGER PRIMARY KEY,
+                url_key TEXT NOT NULL,
+                url TEXT NOT NULL,
+                kind TEXT NOT NULL,
+                fetched_at REAL NOT NULL,
+                content_hash TEXT NOT NULL
+            );
+            CREATE INDEX IF NOT EXISTS pages_url_key_fetched_at ON pages (url_key, fetched_at);
+            CREATE INDEX IF NOT EXISTS pages_kind_fetched_at ON pages (kind, fetched_at);
+        """)
+
+        self.pages_added = 0
+        self.contents_added = 0
+        self.bytes_in = 0
+        self.bytes_stored = 0
+
+    def add(self, url, text, kind="product", fetched_at=None):
+        """Arquiva uma página baixada; conteúdo já arquivado só ganha a linha no índice."""
+        data = text.encode("utf-8")
+        digest = hashlib.sha256(data).hexdigest()
+        with self._lock:
+            known = self._db.execute("SELECT 1 FROM contents WHERE hash = ?", (digest,)).fetchone()
+        # A compressão fica fora do lock: as threads de download comprimem em paralelo
+        stored = None if known else compress(data, self.codec, self.level)
+        with self._lock:
+            if stored is not None:
+                cursor = self._db.execute(
+                    "INSERT OR IGNORE INTO contents (hash, codec, size, stored_size, data) VALUES (?, ?, ?, ?, ?)",
+                    (digest, self.codec, len(data), len(stored), stored))
+                if cursor.rowcount:
+                    self.contents_added += 1
+                    self.bytes_stored += len(stored)
+            self._db.execute(
+                "INSERT INTO pages (url_key, url, kind, fetched_at, content_hash) VALUES (?, ?, ?, ?, ?)",
+                (canonicalize_url(url), url, kind, fetched_at or time.time(), digest))
+            self.pages_added += 1
+            self.bytes_in += len(data)
+            self._pending += 1
+            if self._pending >= self.batch_size:
+                self._commit()
+
+    def _commit(self):
+        self._db.commit()
+        self._pending = 0
+
+    def read(self, content_hash):
+        """Texto de um conteúdo arquivado."""
+        with self._lock:
+            codec, data = self._db.execute("SELECT codec, data FROM contents WHERE hash = ?",
+                                           (content_hash,)).fetchone()
+        return decompress(data, codec).decode("utf-8")
+
+    def select(self, kind, since=None, until=None, latest=True):
+        """Páginas arquivadas de um tipo como (url, fetched_at, content_hash), em ordem de data.
+
+        `since`/`until` são timestamps; com `latest`, só o download mais recente de cada URL.
+        """
+        where, params = ["kind = ?"], [kind]
+        if since is not None:
+            where.append("fetched_at >= ?")
+            params.append(since)
+        if until is not None:
+            where.append("fetched_at < ?")
+            params.append(until)
+        if latest:
+            # No SQLite, as colunas soltas de um GROUP BY com MAX() vêm da linha do máximo
+            query = (f"SELECT url, MAX(fetched_at), content_hash FROM pages WHERE {' AND '.join(where)} "
+                     f"GROUP BY url_key ORDER BY 2")
+        else:
+            query = f"SELECT url, fetched_at, content_hash FROM pages WHERE {' AND '.join(where)} ORDER BY fetched_at"
+        with self._lock:
+            self._commit()
+            return self._db.execute(query, params).fetchall()
+
+    def totals(self):
+        """(páginas no índice, conteúdos distintos, bytes originais, bytes comprimidos) do arquivo todo."""
+        with self._lock:
+            self._commit()
+            pages = self._db.execute("SELECT COUNT(*) FROM pages").fetchone()[0]
+            contents, size, stored = self._db.execute(
+                "SELECT COUNT(*), COALESCE(SUM(size), 0), COALESCE(SUM(stored_size), 0) FROM contents").fetchone()
+        return pages, contents, size, stored
+
+    def report(self):
+        if not self.pages_added:
+            return "Arquivo HTML: nenhuma página nova"
+        return (f"Arquivo HTML: {self.pages_added} páginas | {self.contents_added} conteúdos novos | "
+                f"{self.bytes_in / 1024 ** 2:.1f} MB -> {self.bytes_stored / 1024 ** 2:.1f} MB ({self.codec})")
+
+    def flush(self):
+        with self._lock:
+            self._commit()
+
+    def close(self):
+        with self._lock:
+            self._commit()
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
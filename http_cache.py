@@ -0,0 +1,274 @@
+import hashlib
+import os
+import re
+import sqlite3
+import threading
+import time
+from dataclasses import dataclass
+from urllib.parse import urlsplit, urlunsplit
+from canonical import canonicalize_url
+
+DEFAULT_CACHE_DIR = "data/.http_cache"
+# User-Agent de todas as requisições dos scrapers (sessões requests e aiohttp)
+USER_AGENT = ('Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) '
+              'Chrome/91.0.4472.124 Safari/537.36')
+_MAX_AGE = re.compile(r"max-age=(\d+)")
+# Acessos (last_access) guardados em memória até serem gravados junto com a próxima escrita
+ACCESS_BATCH = 500
+
+
+def cache_key(url):
+    """URL canônica usada como chave: sem rastreamento (canonical.canonicalize_url) e sem fragmento."""
+    return urlunsplit(urlsplit(canonicalize_url(url))._replace(fragment=""))
+
+
+@dataclass
+class CacheEntry:
+    url: str
+    content_hash: str
+    etag: str
+    last_modified: str
+    expires_at: float
+    text: str
+
+    @property
+    def fresh(self):
+        return time.time() < self.expires_at
+
+
+class HttpCache:
+    """Cache em disco das páginas baixadas.
+
+    Os corpos ficam em arquivos nomeados pelo SHA-256 do conteúdo (páginas
+    iguais ocupam um arquivo só) e um índice SQLite liga a URL canônica ao
+    conteúdo, ETag/Last-Modified e validade. Entradas vencidas são
+    revalidadas com requisição condicional (304 reaproveita o corpo) e, ao
+    passar de `max_bytes`, as menos usadas recentemente são removidas.
+
+    O tamanho total é mantido em memória (a conta no banco é feita só ao
+    abrir) e os horários de acesso das leituras são gravados em lote, na
+    mesma transação da próxima escrita; `close` grava o que faltar.
+
+    Fluxo de uso em uma requisição:
+        entry = cache.lookup(url)
+        if entry and entry.fresh: usar entry.text
+        else: fazer o GET com cache.request_headers(entry) e passar a resposta
+              por cache.resolve(url, entry, status, text, headers)
+    """
+
+    def __init__(self, directory=DEFAULT_CACHE_DIR, ttl=6 * 3600, max_bytes=1024 ** 3):
+        self.directory = directory
+        self.ttl = ttl
+        self.max_bytes = max_bytes
+        os.makedirs(os.path.join(directory, "blobs"), exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(os.path.join(directory, "index.sqlite"), check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS entries (
+                url_key TEXT PRIMARY KEY,
+                content_hash TEXT NOT NULL,
+                size INTEGER NOT NULL,
+                etag TEXT,
+                last_modified TEXT,
+                fetched_at REAL NOT NULL,
+                expires_at REAL NOT NULL,
+                last_access REAL NOT NULL
+            )""")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_last_access ON entries (last_access)")
+        self._db.execute("CREATE INDEX IF NOT EXISTS entries_content_hash ON entries (content_hash)")
+        self._db.commit()
+        # Bytes em disco: cada conteúdo conta uma vez, mesmo se várias URLs apontarem para ele
+        self._total = self._db.execute(
+            "SELECT COALESCE(SUM(size), 0) FROM (SELECT DISTINCT content_hash, size FROM entries)").fetchone()[0]
+        # url_key -> último acesso ainda não gravado
+        self._accessed = {}
+
+        self.hits = 0
+        self.revalidated = 0
+        self.misses = 0
+
+    def _blob_path(self, content_hash):
+        return os.path.join(self.directory, "blobs", content_hash[:2], content_hash + ".html")
+
+    def lookup(self, url):
+        """Entrada do cache para a URL (fresca ou vencida), ou None."""
+        key = cache_key(url)
+        with self._lock:
+            row = self._db.execute(
+                "SELECT content_hash, etag, last_modified, expires_at FROM entries WHERE url_key = ?",
+                (key,)).fetchone()
+            if row is None:
+                return None
+            self._accessed[key] = time.time()
+            if len(self._accessed) >= ACCESS_BATCH:
+                with self._db:
+                    self._write_accesses()
+        content_hash, etag, last_modified, expires_at = row
+        try:
+            with open(self._blob_path(content_hash), encoding="utf-8") as f:
+                text = f.read()
+        except FileNotFoundError:
+            return None
+        entry = CacheEntry(url, content_hash, etag, last_modified, expires_at, text)
+        if entry.fresh:
+            self.hits += 1
+        return entry
+
+    @staticmethod
+    def request_headers(entry):
+        """Cabeçalhos da requisição condicional para revalidar uma entrada vencida."""
+        headers = {}
+        if entry is not None:
+            if entry.etag:
+                headers["If-None-Match"] = entry.etag
+            if entry.last_modified:
+                headers["If-Modified-Since"] = entry.last_modified
+        return headers
+
+    def resolve(self, url, entry, status, text, headers, ttl=None):
+        """Trata a resposta da rede: 304 reaproveita a entrada, 2xx é gravado.
+
+        Devolve (status, texto) que o chamador deve usar.
+        """
+        ttl = self._entry_ttl(headers, ttl)
+        if status == 304 and entry is not None:
+            self.revalidated += 1
+            with self._lock, self._db:
+                self._write_accesses()
+                self._db.execute("UPDATE entries SET expires_at = ?, last_access = ? WHERE url_key = ?",
+                                 (time.time() + ttl, time.time(), cache_key(url)))
+            return 200, entry.text
+
+        self.misses += 1
+        if 200 <= status < 300:
+            self.store(url, text, headers.get("ETag"), headers.get("Last-Modified"), ttl)
+        return status, text
+
+    def _entry_ttl(self, headers, ttl):
+        if ttl is not None:
+            return ttl
+        match = _MAX_AGE.search(headers.get("Cache-Control", "") if headers else "")
+        return int(match.group(1)) if match else self.ttl
+
+    def store(self, url, text, etag=None, last_modified=None, ttl=None):
+        """Grava o corpo (uma vez por conteúdo) e aponta a URL para ele."""
+        data = text.encode("utf-8")
+        content_hash = hashlib.sha256(data).hexdigest()
+        path = self._blob_path(content_hash)
+        if not os.path.exists(path):
+            os.makedirs(os.path.dirname(path), exist_ok=True)
+            tmp_path = f"{path}.{threading.get_ident()}.tmp"
+            with open(tmp_path, "wb") as f:
+                f.write(data)
+            os.replace(tmp_path, path)
+
+        now = time.time()
+        key = cache_key(url)
+        with self._lock:
+            with self._db:
+                self._write_accesses()
+                previous = self._db.execute(
+                    "SELECT content_hash, size FROM entries WHERE url_key = ?", (key,)).fetchone()
+                if not self._in_use(content_hash):
+                    self._total += len(data)
+                self._db.execute(
+                    "INSERT OR REPLACE INTO entries VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                    (key, content_hash, len(data), etag, last_modified, now,
+                     now + (self.ttl if ttl is None else ttl), now))
+                if previous is not None and previous[0] != content_hash:
+                    # A URL mudou de conteúdo: o anterior pode ter ficado sem nenhuma URL
+                    self._release(*previous)
+            if self._total > self.max_bytes:
+                self._evict()
+
+    def _in_use(self, content_hash):
+        return self._db.execute("SELECT 1 FROM entries WHERE content_hash = ? LIMIT 1", (content_hash,)).fetchone()
+
+    def _release(self, content_hash, size):
+        """Apaga o corpo se nenhuma entrada aponta mais para ele."""
+        if self._in_use(content_hash):
+            return
+        self._total -= size
+        try:
+            os.remove(self._blob_path(content_hash))
+        except FileNotFoundError:
+            pass
+
+    def _write_accesses(self):
+        # Chamado com o lock e dentro de uma transação
+        if self._accessed:
+            self._db.executemany("UPDATE entries SET last_access = ? WHERE url_key = ?",
+                                 [(at, key) for key, at in self._accessed.items()])
+            self._accessed.clear()
+
+    def evict(self):
+        """Remove as entradas usadas há mais tempo até o cache caber em `max_bytes`."""
+        with self._lock:
+            self._evict()
+
+    def _evict(self):
+        if self._total <= self.max_bytes:
+            return
+        with self._db:
+            self._write_accesses()
+            rows = self._db.execute("SELECT url_key, content_hash, size FROM entries ORDER BY last_access")
+            for url_key, content_hash, size in rows.fetchall():
+                if self._total <= self.max_bytes:
+                    break
+                self._db.execute("DELETE FROM entries WHERE url_key = ?", (url_key,))
+                self._release(content_hash, size)
+
+    def close(self):
+        """Grava os acessos pendentes e fecha o índice."""
+        with self._lock:
+            with self._db:
+                self._write_accesses()
+            self._db.close()
+
+    @property
+    def size(self):
+        """Bytes ocupados pelos corpos em disco (cada conteúdo conta uma vez)."""
+        return self._total
+
+    def report(self):
+        """Resumo do uso do cache nesta execução."""
+        return (f"Cache: {self.hits} hits | {self.revalidated} revalidados (304) | "
+                f"{self.misses} misses | {self.size / 1024 ** 2:.1f} MB")
+
+
+def fetch_cached(cache, controller, session, url, stats=None, archive=None, kind=None, **kwargs):
+    """GET síncrono passando pelo cache (se houver) e pelo controlador adaptativo.
+
+    Devolve o HTML; lança RequestException quando a requisição falha. Com
+    `stats` (instrumentation.RunStats), registra status, retentativas, bytes
+    e tempos do download. Com `archive` (html_archive.HtmlArchive), guarda a
+    página como `kind` quando ela veio da rede com status 200; acertos de
+    cache e revalidações (304) não são arquivados de novo.
+    """
+    start = time.perf_counter()
+    entry = cache.lookup(url) if cache else None
+    if entry is not None and entry.fresh:
+        if stats is not None:
+            stats.record_fetch(url, 200, source="cache", fetch=time.perf_counter() - start)
+        return entry.text
+    kwargs["headers"] = {**kwargs.get("headers", {}), **HttpCache.request_headers(entry)}
+    try:
+        response = controller.get(session, url, **kwargs)
+    except Exception as e:
+        if stats is not None:
+            # Retentativas de fato feitas: um erro definitivo falha já na primeira tentativa
+            stats.record_fetch(url, retries=getattr(e, "retries", 0), fetch=time.perf_counter() - start)
+        raise
+    if stats is not None:
+        ttfb = response.elapsed.total_seconds()
+        stats.record_fetch(url, response.status_code, getattr(response, "retries", 0), len(response.content),
+                           "revalidated" if response.status_code == 304 else "network",
+                           ttfb=ttfb, download=max(0.0, getattr(response, "duration", ttfb) - ttfb),
+                           fetch=time.perf_counter() - start)
+    response.raise_for_status()
+    if archive is not None and response.status_code == 200:
+        archive.add(url, response.text, kind)
+    if cache is None:
+        return response.text
+    return cache.resolve(url, entry, response.status_code, response.text, response.headers)[1]
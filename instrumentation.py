@@ -0,0 +1,358 @@
+import json
+import os
+import threading
+import time
+from bisect import bisect_left
+from collections import Counter
+
+from extractors import MISS
+
+# Limites superiores (segundos) das faixas dos histogramas de latência
+LATENCY_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0, 30.0)
+# Etapas medidas por URL. dns/connect só existem no modo async (aiohttp expõe os eventos);
+# fetch inclui retentativas e esperas do controlador
+STAGES = ("dns", "connect", "ttfb", "download", "fetch", "parse", "extract")
+# Registros por URL que esperam o parsing em memória; acima disto o mais antigo sai sem ele
+MAX_PENDING = 1024
+
+
+def urls_path(stats_file):
+    """Arquivo JSON Lines com o detalhe por URL que acompanha o arquivo de medidas."""
+    return os.path.splitext(stats_file)[0] + ".urls.jsonl"
+
+
+class Histogram:
+    """Histograma cumulativo no formato do Prometheus (contagens por faixa, soma e total)."""
+
+    __slots__ = ("counts", "sum", "count")
+
+    def __init__(self):
+        self.counts = [0] * (len(LATENCY_BUCKETS) + 1)
+        self.sum = 0.0
+        self.count = 0
+
+    def observe(self, value):
+        self.counts[bisect_left(LATENCY_BUCKETS, value)] += 1
+        self.sum += value
+        self.count += 1
+
+    def merge(self, counts, total, count):
+        for i, value in enumerate(counts):
+            self.counts[i] += value
+        self.sum += total
+        self.count += count
+
+    def quantile(self, q):
+        """Quantil aproximado, interpolado dentro da faixa (como o histogram_quantile do Prometheus)."""
+        if not self.count:
+            return None
+        target = q * self.count
+        seen, lower = 0, 0.0
+        for bound, count in zip(LATENCY_BUCKETS, self.counts):
+            if count and seen + count >= target:
+                return round(lower + (bound - lower) * (target - seen) / count, 6)
+            seen += count
+            lower = bound
+        return LATENCY_BUCKETS[-1]
+
+    def cumulative(self):
+        running, cumulative = 0, []
+        for count in self.counts:
+            running += count
+            cumulative.append(running)
+        return cumulative
+
+
+class RunStats:
+    """Medidas de uma execução, por URL e agregadas.
+
+    Os scrapers chamam `record_fetch` (status, retentativas, bytes e tempos de
+    rede) e `record_parse` (parsing e extração); cada chamada custa um
+    dicionário e algumas buscas binárias sob um lock, então pode ficar ligado
+    sempre. Em memória ficam só os agregados: o registro de cada URL é
+    gravado em `urls_path` (JSON Lines) assim que fica completo, ou seja,
+    depois do parsing, ou logo após o download quando ele falha. No fim,
+    `write` grava os agregados em JSON ou, se o arquivo terminar em ".prom",
+    no formato texto do Prometheus.
+
+    Com `relay`, os registros por URL são guardados até o próximo `drain`
+    (processos de parsing, que os repassam ao processo principal).
+    """
+
+    def __init__(self, urls_path=None, relay=False):
+        self._lock = threading.Lock()
+        self.started = time.time()
+        self.histograms = {stage: Histogram() for stage in STAGES}
+        self.status = Counter()
+        self.sources = Counter()
+        self.bytes = 0
+        self.retries = 0
+        self.url_count = 0
+        self.urls_path = urls_path
+        # Registros com download feito e parsing ainda por vir, na ordem de chegada
+        self._pending = {}
+        self._relayed = [] if relay else None
+        self._file = None
+        if urls_path:
+            directory = os.path.dirname(urls_path)
+            if directory:
+                os.makedirs(directory, exist_ok=True)
+            self._file = open(urls_path, "w", encoding="utf-8")
+
+    def _emit(self, record):
+        if self._file is not None:
+            self._file.write(json.dumps(record, ensure_ascii=False) + "\n")
+        elif self._relayed is not None:
+            self._relayed.append(record)
+
+    def record_fetch(self, url, status=None, retries=0, size=0, source="network", **timings):
+        """Registra o download de uma URL; `timings` são etapas de STAGES em segundos."""
+        with self._lock:
+            record = {"url": url, "status": status, "retries": retries, "bytes": size, "source": source}
+            self.url_count += 1
+            self.status[str(status) if status else "error"] += 1
+            self.sources[source] += 1
+            self.bytes += size
+            self.retries += retries
+            self._observe(record, timings)
+            if not status or status >= 400:
+                # Sem página não há parsing: o registro já está completo
+                self._emit(record)
+                return
+            previous = self._pending.pop(url, None)
+            if previous is not None:
+                self._emit(previous)
+            self._pending[url] = record
+            if len(self._pending) > MAX_PENDING:
+                self._emit(self._pending.pop(next(iter(self._pending))))
+
+    def record_parse(self, url, parse, extract):
+        """Registra o tempo de parsing (HTML/JSON -> árvore) e de extração (árvore -> linha).
+
+        Sem `url` (ex.: páginas de busca) entra só nos agregados.
+        """
+        with self._lock:
+            record = {"url": url}
+            self._observe(record, {"parse": parse, "extract": extract})
+            if url:
+                self._complete(record)
+
+    def _complete(self, parsed):
+        record = self._pending.pop(parsed["url"], None) or {}
+        record.update(parsed)
+        self._emit(record)
+
+    def _observe(self, record, timings):
+        for stage, seconds in timings.items():
+            if seconds is not None:
+                record[stage] = round(seconds, 6)
+                self.histograms[stage].observe(seconds)
+
+    def drain(self):
+        """Retira o que foi medido até agora (para somar em outro processo com `merge`)."""
+        with self._lock:
+            snapshot = {
+                "histograms": {stage: (h.counts, h.sum, h.count) for stage, h in self.histograms.items()},
+                "urls": self._relayed or [],
+            }
+            self.histograms = {stage: Histogram() for stage in STAGES}
+            if self._relayed is not None:
+                self._relayed = []
+        return snapshot
+
+    def merge(self, snapshot):
+        with self._lock:
+            for stage, values in snapshot["histograms"].items():
+                self.histograms[stage].merge(*values)
+            for record in snapshot["urls"]:
+                self._complete(record)
+
+    def flush(self):
+        """Grava os registros que ainda esperavam o parsing (ex.: páginas de busca)."""
+        with self._lock:
+            for record in self._pending.values():
+                self._emit(record)
+            self._pending.clear()
+            if self._file is not None:
+                self._file.flush()
+
+    def close(self):
+        self.flush()
+        if self._file is not None:
+            self._file.close()
+            self._file = None
+
+    # --- Saída --------------------------------------------------------------
+
+    def summary(self, selector_stats=None):
+        """Dicionário com os agregados da execução (sem o detalhe por URL)."""
+        stages = {}
+        for stage, histogram in self.histograms.items():
+            if histogram.count:
+                stages[stage] = {
+                    "count": histogram.count,
+                    "sum_seconds": round(histogram.sum, 6),
+                    "p50_seconds": histogram.quantile(0.5),
+                    "p95_seconds": histogram.quantile(0.95),
+                    "buckets": dict(zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], histogram.cumulative())),
+                }
+        return {
+            "started_at": time.strftime("%Y-%m-%dT%H:%M:%S", time.localtime(self.started)),
+            "duration_seconds": round(time.time() - self.started, 3),
+            "urls": self.url_count,
+            "status": dict(self.status),
+            "sources": dict(self.sources),
+            "bytes": self.bytes,
+            "retries": self.retries,
+            "stages": stages,
+            "fields": field_rates(selector_stats or {}),
+        }
+
+    def report(self, selector_stats=None):
+        """Resumo legível: p50/p95 de cada etapa e os campos que mais caem em "miss"."""
+        summary = self.summary(selector_stats)
+        parts = []
+        for stage, values in summary["stages"].items():
+            parts.append(f"{stage} {_ms(values['p50_seconds'])}/{_ms(values['p95_seconds'])}")
+        lines = [f"Etapas (p50/p95 ms, aprox.): {' | '.join(parts)}",
+                 f"Respostas: {summary['status']} | {summary['bytes'] / 1024 ** 2:.1f} MB | "
+                 f"{summary['retries']} retentativas"]
+        misses = [f"{field} {values['hit_rate']:.0%}" for field, values in summary["fields"].items()
+                  if values["misses"]]
+        if misses:
+            lines.append(f"Campos com falhas (taxa de acerto): {', '.join(misses)}")
+        return "\n".join(lines)
+
+    def write(self, path, selector_stats=None):
+        """Grava as medidas em JSON ou, para arquivos ".prom", no formato texto do Prometheus.
+
+        O detalhe por URL fica no arquivo `urls_path`, completado aqui.
+        """
+        self.flush()
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        with self._lock:
+            if path.endswith(".prom"):
+                text = self.prometheus(selector_stats)
+            else:
+                data = self.summary(selector_stats)
+                data["per_url_file"] = self.urls_path
+                text = json.dumps(data, ensure_ascii=False, indent=1)
+        with open(path, "w", encoding="utf-8") as f:
+            f.write(text)
+
+    def prometheus(self, selector_stats=None):
+        lines = ["# HELP scraper_stage_seconds Duração de cada etapa por URL",
+                 "# TYPE scraper_stage_seconds histogram"]
+        for stage, histogram in self.histograms.items():
+            if not histogram.count:
+                continue
+            for bound, count in zip([str(b) for b in LATENCY_BUCKETS] + ["+Inf"], histogram.cumulative()):
+                lines.append(f'scraper_stage_seconds_bucket{{stage="{stage}",le="{bound}"}} {count}')
+            lines.append(f'scraper_stage_seconds_sum{{stage="{stage}"}} {histogram.sum:.6f}')
+            lines.append(f'scraper_stage_seconds_count{{stage="{stage}"}} {histogram.count}')
+        lines += ["# TYPE scraper_responses_total counter"]
+        lines += [f'scraper_responses_total{{status="{status}"}} {count}' for status, count in self.status.items()]
+        lines += ["# TYPE scraper_pages_total counter"]
+        lines += [f'scraper_pages_total{{source="{source}"}} {count}' for source, count in self.sources.items()]
+        lines += ["# TYPE scraper_response_bytes_total counter", f"scraper_response_bytes_total {self.bytes}",
+                  "# TYPE scraper_retries_total counter", f"scraper_retries_total {self.retries}"]
+        lines += ["# TYPE scraper_selector_matches_total counter"]
+        for (field, label), count in sorted((selector_stats or {}).items()):
+            lines.append(f'scraper_selector_matches_total{{field="{field}",selector="{label}"}} {count}')
+        lines += ["# TYPE scraper_field_hit_ratio gauge"]
+        for field, values in field_rates(selector_stats or {}).items():
+            lines.append(f'scraper_field_hit_ratio{{field="{field}"}} {values["hit_rate"]:.4f}')
+        return "\n".join(lines) + "\n"
+
+    # --- aiohttp ------------------------------------------------------------
+
+    @staticmethod
+    def trace_config():
+        """TraceConfig do aiohttp que anota os tempos de rede no dicionário passado em
+        `trace_request_ctx` de cada requisição (chaves de STAGES e "bytes")."""
+        import aiohttp  # só o modo async usa; os demais não pagam o import
+
+        def timings(ctx):
+            return ctx.trace_request_ctx
+
+        async def on_request_start(session, ctx, params):
+            timings(ctx)["_start"] = time.perf_counter()
+
+        async def on_dns_start(session, ctx, params):
+            timings(ctx)["_dns"] = time.perf_counter()
+
+        async def on_dns_end(session, ctx, params):
+            t = timings(ctx)
+            t["dns"] = time.perf_counter() - t.pop("_dns")
+
+        async def on_connect_start(session, ctx, params):
+            timings(ctx)["_connect"] = time.perf_counter()
+
+        async def on_connect_end(session, ctx, params):
+            # A criação da conexão inclui a resolução do nome; a parte do DNS é descontada
+            t = timings(ctx)
+            t["connect"] = time.perf_counter() - t.pop("_connect") - t.get("dns", 0.0)
+
+        async def on_request_end(session, ctx, params):
+            t = timings(ctx)
+            t["_headers"] = time.perf_counter()
+            t["ttfb"] = t["_headers"] - t["_start"]
+
+        async def on_chunk(session, ctx, params):
+            t = timings(ctx)
+            t["bytes"] = t.get("bytes", 0) + len(params.chunk)
+
+        trace = aiohttp.TraceConfig()
+        trace.on_request_start.append(on_request_start)
+        trace.on_dns_resolvehost_start.append(on_dns_start)
+        trace.on_dns_resolvehost_end.append(on_dns_end)
+        trace.on_connection_create_start.append(on_connect_start)
+        trace.on_connection_create_end.append(on_connect_end)
+        trace.on_request_end.append(on_request_end)
+        trace.on_response_chunk_received.append(on_chunk)
+        return trace
+
+
+def print_reports(controller, dedup=None, stats=None, selector_stats=None, cache=None, store=None, archive=None,
+                  watchlist=None):
+    """Relatório do fim da execução: requisições e, dos componentes ligados, seus resumos.
+
+    Histórico, arquivo de HTML e watchlist gravam em lotes; o que faltar é
+    gravado antes do resumo, para ele contar tudo.
+    """
+    print(controller.report())
+    if dedup is not None:
+        print(dedup.report())
+    if stats is not None:
+        print(stats.report(selector_stats))
+    if cache is not None:
+        print(cache.report())
+    for component in (store, archive, watchlist):
+        if component is not None:
+            component.flush()
+            print(component.report())
+
+
+def network_timings(timings):
+    """Etapas de rede (sem as marcas internas "_...") de um dicionário do trace_config."""
+    return {stage: timings[stage] for stage in ("dns", "connect", "ttfb") if stage in timings}
+
+
+def field_rates(selector_stats):
+    """Acertos e falhas ("miss") de cada campo a partir das estatísticas de seletor."""
+    fields = {}
+    for (field, label), count in selector_stats.items():
+        if field.startswith("_"):
+            continue
+        values = fields.setdefault(field, {"hits": 0, "misses": 0, "variants": {}})
+        values["misses" if label == MISS else "hits"] += count
+        values["variants"][label] = count
+    for values in fields.values():
+        values["hit_rate"] = round(values["hits"] / (values["hits"] + values["misses"]), 4)
+    return fields
+
+
+def _ms(seconds):
+    return "-" if seconds is None else f"{seconds * 1000:.0f}"
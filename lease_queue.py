@@ -0,0 +1,128 @@
+import os
+import sqlite3
+import threading
+import time
+
+DEFAULT_QUEUE_PATH = "data/link_queue.sqlite"
+
+
+class LeaseQueue:
+    """Fila de links em SQLite, compartilhada por vários processos.
+
+    Cada worker pega um lote com `lease`: os links ficam reservados em seu
+    nome até `lease_until`. Ao terminar, `complete` marca os concluídos e
+    devolve à fila os que falharam; se o worker morrer, a reserva vence e os
+    links voltam para a fila sozinhos. `renew` estende as reservas de um
+    worker ainda vivo. Um link que já foi reservado `max_attempts` vezes sem
+    sucesso é marcado como "failed".
+
+    As reservas são feitas numa transação BEGIN IMMEDIATE, então dois workers
+    nunca recebem o mesmo link enquanto a reserva vale. Processos em outras
+    máquinas podem usar o mesmo arquivo se o armazenamento compartilhado
+    suportar os locks do SQLite.
+    """
+
+    def __init__(self, path=DEFAULT_QUEUE_PATH, max_attempts=3, timeout=60.0):
+        self.path = path
+        self.max_attempts = max_attempts
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        # Transações controladas à mão (BEGIN IMMEDIATE)
+        self._db = sqlite3.connect(path, timeout=timeout, isolation_level=None, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS tasks (
+                id INTEGER PRIMARY KEY,
+                url TEXT NOT NULL UNIQUE,
+                status TEXT NOT NULL DEFAULT 'pending',
+                worker TEXT,
+                lease_until REAL,
+                attempts INTEGER NOT NULL DEFAULT 0,
+                finished_at REAL
+            );
+            CREATE INDEX IF NOT EXISTS tasks_status_lease ON tasks (status, lease_until);
+        """)
+
+    def _transaction(self, func, *args):
+        with self._lock:
+            self._db.execute("BEGIN IMMEDIATE")
+            try:
+                result = func(*args)
+            except BaseException:
+                self._db.execute("ROLLBACK")
+                raise
+            self._db.execute("COMMIT")
+            return result
+
+    def enqueue(self, urls):
+        """Adiciona links à fila (links já existentes são ignorados); devolve quantos entraram."""
+        def insert():
+            before = self._db.total_changes
+            self._db.executemany("INSERT OR IGNORE INTO tasks (url) VALUES (?)", ((url,) for url in urls))
+            return self._db.total_changes - before
+        return self._transaction(insert)
+
+    def lease(self, worker, size=50, lease_seconds=300.0):
+        """Reserva até `size` links pendentes (ou de reservas vencidas): [(id, url, tentativa)]."""
+        def take():
+            now = time.time()
+            # Reservas vencidas que já esgotaram as tentativas não voltam mais
+            self._db.execute("UPDATE tasks SET status = 'failed', worker = NULL, finished_at = ? "
+                             "WHERE status = 'leased' AND lease_until < ? AND attempts >= ?",
+                             (now, now, self.max_attempts))
+            tasks = self._db.execute(
+                "SELECT id, url, attempts FROM tasks WHERE status = 'pending' "
+                "OR (status = 'leased' AND lease_until < ?) ORDER BY id LIMIT ?", (now, size)).fetchall()
+            self._db.executemany(
+                "UPDATE tasks SET status = 'leased', worker = ?, lease_until = ?, attempts = attempts + 1 "
+                "WHERE id = ?", ((worker, now + lease_seconds, task_id) for task_id, _, _ in tasks))
+            return [(task_id, url, attempts + 1) for task_id, url, attempts in tasks]
+        return self._transaction(take)
+
+    def renew(self, worker, lease_seconds=300.0):
+        """Estende todas as reservas ainda válidas do worker; devolve quantas foram estendidas."""
+        def extend():
+            now = time.time()
+            return self._db.execute("UPDATE tasks SET lease_until = ? WHERE worker = ? AND status = 'leased' "
+                                    "AND lease_until >= ?", (now + lease_seconds, worker, now)).rowcount
+        return self._transaction(extend)
+
+    def complete(self, worker, done=(), failed=()):
+        """Marca links do worker como concluídos e devolve os que falharam à fila.
+
+        Só altera links ainda reservados pelo worker: se a reserva venceu e
+        outro worker pegou o link, o resultado dele prevalece.
+        """
+        def finish():
+            now = time.time()
+            self._db.executemany(
+                "UPDATE tasks SET status = 'done', finished_at = ? WHERE id = ? AND worker = ? AND status = 'leased'",
+                ((now, task_id, worker) for task_id in done))
+            self._db.executemany(
+                "UPDATE tasks SET status = CASE WHEN attempts >= ? THEN 'failed' ELSE 'pending' END, "
+                "worker = NULL, lease_until = NULL, finished_at = CASE WHEN attempts >= ? THEN ? END "
+                "WHERE id = ? AND worker = ? AND status = 'leased'",
+                ((self.max_attempts, self.max_attempts, now, task_id, worker) for task_id in failed))
+        self._transaction(finish)
+
+    def counts(self):
+        """Quantidade de links por situação (pending, leased, done, failed)."""
+        with self._lock:
+            rows = self._db.execute("SELECT status, COUNT(*) FROM tasks GROUP BY status").fetchall()
+        return {status: count for status, count in rows}
+
+    def report(self):
+        counts = self.counts()
+        return " | ".join(f"{status}: {counts.get(status, 0)}" for status in ("pending", "leased", "done", "failed"))
+
+    def close(self):
+        with self._lock:
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
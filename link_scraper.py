@@ -1,26 +1,98 @@
-import os
+import argparse
+import asyncio
+import csv
 import requests
-import pandas as pd
 import re
-from bs4 import BeautifulSoup
-from concurrent.futures import ThreadPoolExecutor
-from datetime import datetime
 import time
+from collections import Counter
+from itertools import count
+from concurrent.futures import ThreadPoolExecutor
+from canonical import Deduplicator
+from checkpoint import CheckpointJournal
+from embedded_state import load_state, product_fields
+from extractors import FieldExtractor, Selector, has_text, money_amount
+from cli import add_format_arguments, add_parsing_arguments, add_resource_arguments, close_resources, open_resources
+from http_cache import USER_AGENT, fetch_cached
+from listing import ProductListing, batch_timestamp
+from instrumentation import print_reports
+from parsers import DEFAULT_PARSER, make_soup
+from pipeline import ParserPool, run_pipeline
+from row_writer import open_row_writer
+from throttle import AdaptiveController
+from watchlist import DEFAULT_WATCHLIST_PATH, Watchlist
+
+# Campos da página de produto, com as variantes de seletor em ordem de preferência
+QTD_PAUSED = 2
+PRODUCT_EXTRACTOR = FieldExtractor({
+    "title": [Selector('h1', 'ui-pdp-title')],
+    # Antigo: Selector('button', 'ui-pdp-seller__link-trigger-button non-selectable')
+    "seller": [Selector('div', 'ui-seller-data-header__title-container')],
+    # Antigo: Selector('div', 'ui-pdp-seller__header__info-container__subtitle-one-line')
+    "seller_sales": [Selector('p', 'ui-pdp-color--BLACK ui-pdp-size--XSMALL ui-pdp-family--SEMIBOLD ui-seller-data-status__info-title')],
+    "price_previous": [Selector('s', 'andes-money-amount ui-pdp-price__part ui-pdp-price__original-value andes-money-amount--previous andes-money-amount--cents-superscript andes-money-amount--compact')],
+    "price_current": [Selector('span', 'andes-money-amount ui-pdp-price__part andes-money-amount--cents-superscript andes-money-amount--compact')],
+    "discount": [Selector('span', 'andes-money-amount__discount')],
+    "installments": [Selector('div', 'ui-pdp-price__subtitles')],
+    "qtd_available": [
+        Selector('span', 'ui-pdp-buybox__quantity__available', has_text),
+        Selector('div', 'ui-pdp-buybox__quantity', has_text),
+        Selector('div', 'ui-vip-shipping-message__text', lambda el: "Anúncio pausado" in el.get_text()),
+    ],
+})
+
+# Ordem das colunas do CSV de saída
+LINK_FIELDS = list(ProductListing.COLUMNS)
 
 class LinkScraper:
-    def __init__(self, input_file, output_file):
+    def __init__(self, input_file, output_file, controller=None, parser=DEFAULT_PARSER, extraction="dom",
+                 cache=None, journal=None, stream=False, parquet=False, numeric_prices=False, store=None, dedup=None, stats=None,
+                 archive=None, watchlist=None):
         self.input_file = input_file
         self.output_file = output_file
         self.data = []
-        self.headers = {
-            'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
+        self.headers = {'User-Agent': USER_AGENT}
+        # Sessão compartilhada: reaproveita conexões keep-alive entre as requisições
+        self.session = requests.Session()
+        self.session.headers.update(self.headers)
+        # Controle adaptativo de concorrência e retentativas (substitui a pausa fixa)
+        self.controller = controller or AdaptiveController()
+        # Backend de parsing do HTML (ver parsers.available_parsers())
+        self.parser = parser
+        # "dom" extrai pelo HTML; "state" lê o JSON embutido e só usa o HTML se ele faltar
+        self.extraction = extraction
+        # Cache em disco opcional (http_cache.HttpCache)
+        self.cache = cache
+        # Diário de checkpoint opcional (checkpoint.CheckpointJournal) para retomar execuções
+        self.journal = journal
+        # Preços e desconto como números (centavos e percentual) em vez de texto "R$ 1.295,00"
+        self.numeric_prices = numeric_prices
+        # Histórico de preços opcional (price_store.PriceStore)
+        self.store = store
+        # Canonicalização e deduplicação dos links antes de baixá-los (canonical.Deduplicator)
+        self.dedup = dedup or Deduplicator()
+        # Saída em streaming: as linhas vão para o disco em lotes, sem acumular em self.data
+        self.writer = self.open_writer(output_file, parquet) if stream or parquet else None
+        # Quantas vezes cada variante de seletor casou, por campo
+        self.selector_stats = Counter()
+        # Medidas por URL e por etapa opcionais (instrumentation.RunStats)
+        self.stats = stats
+        # Arquivo opcional do HTML baixado, para reextração offline (html_archive.HtmlArchive)
+        self.archive = archive
+        # Agenda de reconsulta opcional (watchlist.Watchlist), alimentada com cada linha extraída
+        self.watchlist = watchlist
+
+    def open_writer(self, file_name, parquet=False):
+        """Gravador de `file_name` com as colunas de LINK_FIELDS no formato de preços configurado."""
+        return open_row_writer(file_name, LINK_FIELDS, self.numeric_prices, parquet)
 
     def read_csv(self):
-        """Lê o arquivo CSV e obtém os links da coluna 'post link'."""
+        """Lê o arquivo CSV e obtém os links da coluna 'post link' (lido em streaming, sem pandas)."""
         try:
-            df = pd.read_csv(self.input_file, sep=";")
-            self.links = df['post link'].dropna().tolist()
-            print(f"Lidos {len(self.links)} links do arquivo {self.input_file}.")
+            with open(self.input_file, newline="", encoding="utf-8-sig") as f:
+                links = [row["post link"] for row in csv.DictReader(f, delimiter=";") if row.get("post link")]
+            self.links = self.dedup.filter(links)
+            print(f"Lidos {self.dedup.received} links do arquivo {self.input_file}.")
+            print(self.dedup.report())
         except FileNotFoundError:
             print(f"Arquivo {self.input_file} não encontrado.")
             self.links = []
@@ -28,20 +100,6 @@ class LinkScraper:
             print(f"Erro ao ler o arquivo CSV: {e}")
             self.links = []
 
-    def convert_to_float(self, price_str):
-        """Converte uma string de preço para float."""
-        if not price_str:
-            return 0.0
-        try:
-            price_cleaned = price_str.replace("R$", "").replace("$", "").replace(".", "").replace(",", ".").strip()
-            return float(price_cleaned)
-        except ValueError:
-            return 0.0
-
-    def format_to_currency(self, value):
-        """Formata um valor float para o formato de moeda brasileiro."""
-        return f"R$ {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-    
     def clean_seller(self, seller):
         """Remove prefixos como 'Vendido por' e 'Loja oficial'."""
         if seller and seller != "N/A":
@@ -58,160 +116,340 @@ class LinkScraper:
     def scrape_link(self, url):
         """Acessa a URL e extrai informações relevantes."""
         try:
-            # Definindo os headers com o User-Agent
-            headers = {'User-Agent': 'Mozilla/5.0 (Windows NT 10.0; Win64; x64) AppleWebKit/537.36 (KHTML, like Gecko) Chrome/91.0.4472.124 Safari/537.36'}
-            
-            # Fazendo a requisição com o header personalizado
-            response = requests.get(url, headers=headers, timeout=10)
-            response.raise_for_status()
-            soup = BeautifulSoup(response.text, 'html.parser')
-
-            #response = requests.get(url, timeout=10)
-            #response.raise_for_status()
-            #soup = BeautifulSoup(response.text, 'html.parser')
-
-            # Título
-            title = soup.find('h1', class_='ui-pdp-title')
-            title = title.get_text().strip().capitalize() if title else "N/A"
-
-            # Vendedor
-            #seller = soup.find('button', class_='ui-pdp-seller__link-trigger-button non-selectable')
-            seller  = soup.find('div', class_='ui-seller-data-header__title-container')
-            seller = seller.get_text().strip().capitalize() if seller else "N/A"
-            seller = self.clean_seller(seller)
-
-            # Vendedor - Vendas realizadas
-            #seller_sales = soup.find('div', class_='ui-pdp-seller__header__info-container__subtitle-one-line')
-            seller_sales = soup.find('p', class_='ui-pdp-color--BLACK ui-pdp-size--XSMALL ui-pdp-family--SEMIBOLD ui-seller-data-status__info-title')
-            seller_sales = seller_sales.get_text().strip().capitalize() if seller_sales else "N/A"
-            seller_sales = self.clean_seller_sales(seller_sales)
-
-            # Preço anterior
-            price_previous = soup.find('s', class_='andes-money-amount ui-pdp-price__part ui-pdp-price__original-value andes-money-amount--previous andes-money-amount--cents-superscript andes-money-amount--compact')
-            if price_previous:
-                price_previous = price_previous.get_text().strip()
-            else:
-                price_previous = soup.find('span', class_='andes-money-amount__fraction').get_text().strip() if price_previous else "N/A"
-            
-            price_previous = self.format_to_currency(self.convert_to_float(price_previous))
-
-            # Preco atual
-            price_current = soup.find('span', class_='andes-money-amount ui-pdp-price__part andes-money-amount--cents-superscript andes-money-amount--compact')
-            if price_current:
-                price_current = price_current.get_text().strip()
-                price_current = self.format_to_currency(self.convert_to_float(price_current))
-            else:
-                price_current = "NA"
+            html = self.fetch(url)
+        except requests.exceptions.RequestException as e:
+            print(f"Erro ao acessar {url}: {e}")
+            return self.checkpoint(url, self.failed_row(url), ok=False)
+        return self.checkpoint(url, self.parse_link(html, url))
 
-            # Desconto
-            discount = soup.find('span', class_='andes-money-amount__discount')
-            discount = discount.get_text().strip() if discount else "0%"
+    def fetch(self, url):
+        """Baixa a página de um produto pelo cache e pelo controlador; as novas vão para o arquivo de HTML."""
+        return fetch_cached(self.cache, self.controller, self.session, url, self.stats, self.archive, "product",
+                            timeout=10)
 
-            # Parcelamento e tipo de anúncio
-            # Inicializa as variáveis com valores padrão
-            installments = "N/A"
-            ad_type = "N/A"
+    def checkpoint(self, url, row, ok=True):
+        """Registra o link no diário, no histórico, na watchlist e no gravador de saída (se houver) e devolve a linha."""
+        if self.journal is not None:
+            self.journal.append(url, [row], ok=ok)
+        if ok:
+            # Só agora o link entra no índice de links vistos (--seen-index)
+            self.dedup.remember(url)
+        if self.store is not None and ok:
+            # Antes do gravador, que pode normalizar a linha ao fechar o lote
+            self.store.add(row)
+        if self.watchlist is not None and ok:
+            self.watchlist.record(row)
+        if self.writer is not None:
+            self.writer.write(row)
+        return row
 
-            # Verifica a presença do texto sem juros no parcelamento
-            installments_element = soup.find('div', class_='ui-pdp-price__subtitles')
-            if installments_element:
-                installments = installments_element.get_text().strip()
-                if installments and "sem juros" in installments.lower():
-                    installments = installments_element.get_text().strip()
-                    ad_type = 'Premium'
-                else:
-                    installments = installments_element.get_text().strip()
-                    ad_type = 'Classic'
+    def keep(self, rows):
+        """Guarda as linhas em memória, a menos que elas já estejam sendo gravadas em disco."""
+        for row in rows:
+            if self.writer is None:
+                self.data.append(row)
 
-            # Quantidade disponível
-            qtd_available = None
+    def pending_links(self, links):
+        """Links ainda não concluídos segundo o diário."""
+        if self.journal is None:
+            return links
+        pending = [link for link in links if link not in self.journal]
+        if len(pending) < len(links):
+            print(f"Retomando: {len(links) - len(pending)} links já concluídos serão pulados.")
+            if self.writer is not None and self.writer.rows_written == 0:
+                # A saída é reescrita do zero: começa pelo que já estava concluído no diário.
+                # As falhas ficam de fora, pois esses links serão tentados (e gravados) de novo.
+                self.writer.write_many(self.journal.rows(done_only=True))
+        return pending
 
-            # Verificar se há uma quantidade disponível explícita (>1)
-            qtd_available_element = soup.find('span', class_='ui-pdp-buybox__quantity__available')
-            if qtd_available_element:
-                qtd_available = qtd_available_element.get_text().strip()
+    def failed_row(self, url):
+        """Registro devolvido quando não foi possível acessar a URL (mesmas colunas, todas "N/A")."""
+        return ProductListing(
+            title="N/A",
+            seller="N/A",
+            seller_sales="N/A",
+            ad_type="N/A",
+            price_previous="N/A",
+            price_current="N/A",
+            discount="N/A",
+            installments="N/A",
+            qtd_available="N/A",
+            url=url,
+            scraped_at=batch_timestamp(),
+        )
 
-            # Verificar para quantidade = 1
-            if not qtd_available:
-                qtd_available_element = soup.find('div', class_='ui-pdp-buybox__quantity')
-                if qtd_available_element:
-                    qtd_available = qtd_available_element.get_text().strip()
+    def parse_link(self, html, url):
+        """Extrai as informações relevantes do HTML de uma página de produto."""
+        start = time.perf_counter()
+        if self.extraction == "state":
+            # Lê só o JSON embutido; sem ele, volta para a extração pelo HTML
+            state = load_state(html)
+            parsed = time.perf_counter()
+            fields = product_fields(state) if state else None
+            if fields is not None:
+                self.selector_stats[("_source", "state")] += 1
+                return self.timed_row(url, start, parsed, self.build_row(fields, url))
 
-            # Verificar se o anúncio está pausado (quantidade = 0)
-            if not qtd_available:
-                ad_paused_element = soup.find('div', class_='ui-vip-shipping-message__text')
-                if ad_paused_element and "Anúncio pausado" in ad_paused_element.get_text():
-                    qtd_available = "Anúncio pausado"
+        soup = make_soup(html, self.parser)
+        parsed = time.perf_counter()
+        matches = PRODUCT_EXTRACTOR.extract(soup)
+        PRODUCT_EXTRACTOR.record(self.selector_stats, matches)
+        self.selector_stats[("_source", "dom")] += 1
 
-            # Caso nenhuma das condições anteriores seja satisfeita
-            if not qtd_available:
-                qtd_available = "N/A"
+        fields = {}
+        for field, (element, _) in matches.items():
+            if field in ("price_previous", "price_current"):
+                # Fração e centavos ficam em spans separados
+                fields[field] = money_amount(element)
+            else:
+                fields[field] = element.get_text().strip() if element else None
+        # Quantidade disponível: explícita (>1), quantidade = 1 ou anúncio pausado (= 0)
+        fields["paused"] = matches["qtd_available"][1] == QTD_PAUSED
+        return self.timed_row(url, start, parsed, self.build_row(fields, url))
 
+    def timed_row(self, url, start, parsed, row):
+        """Registra os tempos de parsing e extração (se houver instrumentação) e devolve a linha."""
+        if self.stats is not None:
+            self.stats.record_parse(url, parsed - start, time.perf_counter() - parsed)
+        return row
+
+    def build_row(self, fields, url):
+        """Formata os campos brutos (do HTML ou do JSON) no registro exportado."""
+        # Título
+        title = fields["title"]
+        title = title.strip().capitalize() if title is not None else "N/A"
+
+        # Vendedor
+        seller = fields["seller"]
+        seller = seller.strip().capitalize() if seller is not None else "N/A"
+        seller = self.clean_seller(seller)
+
+        # Vendedor - Vendas realizadas
+        seller_sales = fields["seller_sales"]
+        seller_sales = seller_sales.strip().capitalize() if seller_sales is not None else "N/A"
+        seller_sales = self.clean_seller_sales(seller_sales)
+
+        # Preços ficam como valor; o RowWriter formata ao gravar (prices.format_prices ou normalize_prices)
+        price_previous = fields["price_previous"]
+        price_current = fields["price_current"]
+
+        # Desconto
+        discount = fields["discount"]
+        discount = discount.strip() if discount is not None else "0%"
+
+        # Parcelamento e tipo de anúncio (Premium quando é sem juros)
+        installments = fields["installments"]
+        if installments is not None:
+            installments = installments.strip()
+            ad_type = 'Premium' if "sem juros" in installments.lower() else 'Classic'
+        else:
+            installments = "N/A"
+            ad_type = "N/A"
+
+        # Quantidade disponível
+        if fields["paused"]:
+            qtd_available = "Anúncio pausado"
+        elif fields["qtd_available"] is None:
+            qtd_available = "N/A"
+        else:
             # Remover parênteses, se existirem
-            qtd_available = qtd_available.replace("(", "").replace(")", "").strip() if qtd_available != "N/A" else "N/A"
-
-            # Armazenar os dados extraídos
-            return {
-                "title": title,
-                "seller": seller,
-                "seller_sales": seller_sales,
-                "ad_type": ad_type,
-                "price_previous": price_previous,
-                "price_current": price_current,
-                "discount": discount,
-                "installments": installments,
-                "qtd_available": qtd_available,
-                "url": url,
-                "scraped_at": datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
-            }
-        except requests.exceptions.RequestException as e:
-            print(f"Erro ao acessar {url}: {e}")
-            return {
-                "url": url,
-                "title": "N/A",
-                "price_previous": "N/A",
-                "price_current": "N/A",
-                "seller": "N/A",
-                "seller_sales": "N/A",
-                "qtd_available": "N/A", 
-                "scraped_at": datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
-            }
+            qtd_available = fields["qtd_available"].strip().replace("(", "").replace(")", "").strip()
+
+        # Armazenar os dados extraídos
+        return ProductListing(
+            title=title,
+            seller=seller,
+            seller_sales=seller_sales,
+            ad_type=ad_type,
+            price_previous=price_previous,
+            price_current=price_current,
+            discount=discount,
+            installments=installments,
+            qtd_available=qtd_available,
+            url=url,
+            scraped_at=batch_timestamp(),
+        )
 
     def scrape_link_parallel(self, links):
         """Realiza o scraping de links em paralelo."""
+        links = self.pending_links(links)
         with ThreadPoolExecutor(max_workers=5) as executor:  # Ajuste max_workers conforme necessário
-            results = list(executor.map(self.scrape_link, links))
-            self.data.extend(results)
+            self.keep(executor.map(self.scrape_link, links))
 
     def scrape_links(self):
-        """Percorre todos os links e realiza o scraping com pausa entre as requisições."""
+        """Percorre todos os links; a concorrência e as pausas são ajustadas pelo controlador."""
         if not self.links:
             print("Nenhum link para processar.")
             return
 
-        for i, link in enumerate(self.links, start=1):
-            print(f"Processando link {i}/{len(self.links)}: {link}")
-            result = self.scrape_link(link)
-            self.data.append(result)
-            time.sleep(2)  # Pausa para evitar bloqueios
+        links = self.pending_links(self.links)
+        total = len(links)
+
+        def process(item):
+            i, link = item
+            print(f"Processando link {i}/{total}: {link}")
+            return self.scrape_link(link)
+
+        # O pool só define o teto; quantas requisições rodam de fato é decidido pelo controlador
+        with ThreadPoolExecutor(max_workers=self.controller.max_limit) as executor:
+            self.keep(executor.map(process, enumerate(links, start=1)))
+        self.print_report()
+
+    def scrape_links_pipeline(self, parse_workers=None, queue_size=32):
+        """Baixa os links em threads e faz o parsing em processos (pipeline.run_pipeline).
+
+        O parsing sai do GIL das threads de rede, então a vazão cresce com os
+        núcleos da máquina; a fila entre os estágios limita quantas páginas
+        baixadas esperam pelo parsing.
+        """
+        if not self.links:
+            print("Nenhum link para processar.")
+            return
+
+        links = self.pending_links(self.links)
+        total = len(links)
+        done = count(1)
+
+        def fetch(link):
+            try:
+                return self.fetch(link)
+            except requests.exceptions.RequestException as e:
+                print(f"Erro ao acessar {link}: {e}")
+                return None
+
+        with ParserPool(LinkScraper, parse_workers, self.selector_stats, self.stats, input_file=None, output_file=None,
+                        parser=self.parser, extraction=self.extraction,
+                        numeric_prices=self.numeric_prices) as pool:
+            def handle(link, html):
+                print(f"Processando link {next(done)}/{total}: {link}")
+                if html is None:
+                    row = self.checkpoint(link, self.failed_row(link), ok=False)
+                else:
+                    row = self.checkpoint(link, pool.call("parse_link", html, link))
+                self.keep([row])
+
+            # Uma thread por processo de parsing, para manter todos ocupados
+            run_pipeline(links, fetch, handle, self.controller.max_limit, pool.workers, queue_size)
+        self.print_report()
+
+    def scrape_links_async(self, concurrency=20, rate_per_host=5.0):
+        """Realiza o scraping dos links com asyncio, limitando a concorrência e a taxa por host."""
+        if not self.links:
+            print("Nenhum link para processar.")
+            return
+
+        self.keep(asyncio.run(self._scrape_links_async(concurrency, rate_per_host)))
+        self.print_report()
+
+    async def _scrape_links_async(self, concurrency, rate_per_host):
+        links = self.pending_links(self.links)
+        total = len(links)
+        done = 0
+
+        # Importado só aqui: quem não usa o modo async não paga o import do aiohttp
+        from async_fetcher import AsyncFetcher
+
+        self.controller.max_limit = concurrency
+        loop = asyncio.get_running_loop()
+
+        def parse(link, result):
+            if self.archive is not None and result.fresh:
+                self.archive.add(link, result.text, "product")
+            return self.parse_link(result.text, link)
+
+        async with AsyncFetcher(concurrency, rate_per_host, headers=self.headers,
+                                controller=self.controller, cache=self.cache, stats=self.stats) as fetcher:
+            async def process(link):
+                nonlocal done
+                result = await fetcher.fetch(link)
+                done += 1
+                print(f"Processando link {done}/{total}: {link}")
+                if not result.ok:
+                    print(f"Erro ao acessar {link}: {result.error}")
+                    row = self.checkpoint(link, self.failed_row(link), ok=False)
+                else:
+                    # O parsing segura o GIL; numa thread à parte o loop segue atendendo as respostas
+                    row = self.checkpoint(link, await loop.run_in_executor(None, parse, link, result))
+                # Gravando em disco, não há por que manter a linha até o fim
+                return row if self.writer is None else None
+
+            rows = await asyncio.gather(*(process(link) for link in links))
+            return rows if self.writer is None else []
+
+    def print_report(self):
+        """Mostra o resumo das requisições (e das medidas, do cache e do histórico, se houver)."""
+        print_reports(self.controller, stats=self.stats, selector_stats=self.selector_stats, cache=self.cache,
+                      store=self.store, archive=self.archive, watchlist=self.watchlist)
 
     def export_to_csv(self):
         """Exporta os dados extraídos para um novo arquivo CSV."""
-        os.makedirs(os.path.dirname(self.output_file), exist_ok=True)
-        df = pd.DataFrame(self.data)
-        df.to_csv(self.output_file, sep=";", encoding="utf-8-sig", index=False)
+        if self.writer is not None:
+            # Saída em streaming: as linhas já estão no disco, falta só o último lote
+            self.writer.close()
+            print(f"{self.writer.rows_written} linhas exportadas para {self.output_file} com sucesso!")
+            return
+        # Com diário, a exportação inclui também o que foi feito em execuções anteriores
+        rows = self.journal.rows() if self.journal is not None else self.data
+        with self.open_writer(self.output_file) as writer:
+            writer.write_many(rows)
         print(f"Dados exportados para {self.output_file} com sucesso!")
 
 if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Extrai dados dos links de produtos do Mercado Livre.")
+    parser.add_argument("--input", default="data/ml_links.csv", help="Arquivo CSV de entrada")
+    parser.add_argument("--output", default="data/extracted_data.csv", help="Arquivo CSV de saída")
+    parser.add_argument("--mode", choices=["threads", "parallel", "async", "pipeline"], default="threads",
+                        help="Modo de requisição dos links: threads (janela adaptativa do controlador), "
+                             "parallel (5 threads fixas), async (aiohttp) ou pipeline (parsing em processos)")
+    parser.add_argument("--concurrency", type=int, default=20, help="Requisições simultâneas no modo async")
+    parser.add_argument("--rate-per-host", type=float, default=5.0,
+                        help="Máximo de requisições por segundo por host no modo async")
+    parser.add_argument("--parse-workers", type=int,
+                        help="Processos de parsing no modo pipeline (padrão: número de núcleos)")
+    add_parsing_arguments(parser)
+    add_resource_arguments(parser)
+    add_format_arguments(parser)
+    parser.add_argument("--journal", help="Diário de checkpoint (JSON Lines); permite retomar uma execução interrompida")
+    parser.add_argument("--stream", action="store_true",
+                        help="Grava as linhas no CSV em lotes durante a execução (memória constante)")
+    parser.add_argument("--seen-index",
+                        help="Índice em disco dos links já extraídos; pula os concluídos em execuções anteriores")
+    parser.add_argument("--watchlist", nargs="?", const=DEFAULT_WATCHLIST_PATH,
+                        help="Consulta primeiro os itens com maior chance de ter mudado, pelo histórico de "
+                             f"mudanças de cada um (padrão: {DEFAULT_WATCHLIST_PATH})")
+    parser.add_argument("--budget", type=int, help="Com --watchlist: máximo de links consultados nesta execução")
+    parser.add_argument("--min-change-probability", type=float, default=0.0,
+                        help="Com --watchlist: adia os links com chance de mudança abaixo deste valor (0 a 1)")
+    args = parser.parse_args()
+
     # Configuração dos arquivos
-    input_csv = "data/ml_links.csv"  # Arquivo de entrada
-    output_csv = "data/extracted_data.csv"  # Arquivo de saída
+    input_csv = args.input  # Arquivo de entrada
+    output_csv = args.output  # Arquivo de saída
 
     # Inicialização do scraper
-    scraper = LinkScraper(input_csv, output_csv)
+    resources = open_resources(args)
+    journal = CheckpointJournal(args.journal) if args.journal else None
+    dedup = Deduplicator(args.seen_index)
+    watchlist = Watchlist(args.watchlist) if args.watchlist else None
+    scraper = LinkScraper(input_csv, output_csv, parser=args.parser, extraction=args.extraction,
+                          journal=journal, stream=args.stream, parquet=args.parquet,
+                          numeric_prices=args.numeric_prices, dedup=dedup, watchlist=watchlist, **resources)
 
     # Fluxo principal
     scraper.read_csv()
-    scraper.scrape_links()
-    #scraper.scrape_link_parallel(scraper.links)
+    if watchlist is not None:
+        scraper.links = watchlist.plan(scraper.links, args.budget, args.min_change_probability)
+        print(watchlist.report())
+    if args.mode == "async":
+        scraper.scrape_links_async(args.concurrency, args.rate_per_host)
+    elif args.mode == "pipeline":
+        scraper.scrape_links_pipeline(args.parse_workers)
+    elif args.mode == "parallel":
+        scraper.scrape_link_parallel(scraper.links)
+    else:
+        scraper.scrape_links()
     scraper.export_to_csv()
+    if watchlist is not None:
+        watchlist.close()
+    dedup.close()
+    close_resources(resources, args, scraper.selector_stats)
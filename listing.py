@@ -0,0 +1,119 @@
+import sys
+import time
+from collections.abc import Mapping
+from dataclasses import dataclass, fields
+
+# Formato da data/hora das linhas exportadas ("18/10/2026 04:41:44")
+ROW_DATE = "%d/%m/%Y %H:%M:%S"
+# Colunas do CSV cujo nome não é um identificador Python
+COLUMN_NAMES = {"post_link": "post link", "image_link": "image link"}
+# Último instante formatado por batch_timestamp: (segundo, texto)
+_stamp = (None, None)
+
+
+def batch_timestamp():
+    """Data/hora atual no formato das linhas ("18/10/2026 04:41:44").
+
+    O texto é formatado uma vez por segundo e o mesmo objeto é compartilhado
+    por todas as linhas extraídas nesse segundo.
+    """
+    global _stamp
+    second = int(time.time())
+    cached, text = _stamp
+    if cached != second:
+        text = time.strftime(ROW_DATE, time.localtime(second))
+        _stamp = (second, text)
+    return text
+
+
+class Listing(Mapping):
+    """Base dos registros extraídos: schema fixo, slots e acesso pelo nome da coluna.
+
+    As subclasses são dataclasses com slots (ver `_listing`), então cada linha
+    ocupa só os ponteiros dos campos, sem o dicionário por instância. Para o
+    resto do código elas se comportam como um dicionário somente leitura na
+    ordem de COLUMNS (row["post link"], row.get(...), dict(row)), com
+    `row[coluna] = valor` permitido para colunas existentes. Os textos de
+    INTERNED, que se repetem muito entre linhas, são internados.
+    """
+
+    __slots__ = ()
+    COLUMNS = ()
+    INTERNED = ()
+    _ATTRS = {}
+
+    def __post_init__(self):
+        for attr in self.INTERNED:
+            value = getattr(self, attr)
+            if type(value) is str:
+                setattr(self, attr, sys.intern(value))
+
+    def __getitem__(self, column):
+        try:
+            attr = self._ATTRS[column]
+        except KeyError:
+            raise KeyError(column) from None
+        return getattr(self, attr)
+
+    def __setitem__(self, column, value):
+        try:
+            attr = self._ATTRS[column]
+        except KeyError:
+            raise KeyError(column) from None
+        setattr(self, attr, value)
+
+    def __iter__(self):
+        return iter(self.COLUMNS)
+
+    def __len__(self):
+        return len(self.COLUMNS)
+
+    def __reduce__(self):
+        # Pickle compacto (uma tupla) e textos internados de novo ao chegar dos processos de parsing
+        return type(self), tuple(getattr(self, attr) for attr in self._ATTRS.values())
+
+
+def _listing(cls):
+    cls = dataclass(slots=True, eq=False)(cls)
+    cls._ATTRS = {COLUMN_NAMES.get(f.name, f.name): f.name for f in fields(cls)}
+    cls.COLUMNS = tuple(cls._ATTRS)
+    return cls
+
+
+@_listing
+class SearchListing(Listing):
+    """Post de uma página de busca (new_main.Scraper)."""
+
+    INTERNED = ("seller", "ad_type", "discount", "installments")
+
+    mlb: str
+    title: str
+    seller: str
+    ad_type: str
+    # Valor lido (número do HTML/JSON; texto "N/A" em falhas), formatado só na gravação (prices.format_prices)
+    price_previous: str | float | None
+    price_current: str | float | None
+    discount: str
+    installments: str
+    date: str
+    post_link: str
+    image_link: str
+
+
+@_listing
+class ProductListing(Listing):
+    """Página de produto (link_scraper.LinkScraper)."""
+
+    INTERNED = ("seller", "seller_sales", "ad_type", "discount", "installments", "qtd_available")
+
+    title: str
+    seller: str
+    seller_sales: str
+    ad_type: str
+    price_previous: str | float | None
+    price_current: str | float | None
+    discount: str
+    installments: str
+    qtd_available: str
+    url: str
+    scraped_at: str
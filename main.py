@@ -2,11 +2,19 @@ import os
 import requests
 import pandas as pd
 import re
-from bs4 import BeautifulSoup
 from datetime import datetime
+from http_cache import USER_AGENT, fetch_cached
+from pagination import SearchUnavailable, iter_search_pages
+from throttle import AdaptiveController
 
 class Scraper():
 
+    def __init__(self):
+        # Sessão com User-Agent e controlador adaptativo (janela de concorrência, timeout e retentativas)
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT})
+        self.controller = AdaptiveController()
+
     def menu(self):
         menu = ("""
     Ecolha o país:
@@ -42,31 +50,28 @@ class Scraper():
         """Formata um valor float para o formato de moeda brasileiro"""
         return f"R$ {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
     
+    def fetch_page(self, url):
+        """Baixa uma página de busca; devolve None se todas as tentativas falharem"""
+        try:
+            return fetch_cached(None, self.controller, self.session, url)
+        except requests.exceptions.RequestException as e:
+            print(f"\nErro ao acessar {url}: {e}")
+            return None
+
     def scraping(self):
         # User search
         product_name = input("\nDigite o produto: ")
         # Clean the user input
         cleaned_name = product_name.replace(" ", "-").lower()
-        # Create the urls to scrap
-        urls = [self.base_url + cleaned_name]
-
-        page_number = 50
-        for i in range(0, 10000, 50):
-            urls.append(f"{self.base_url}{cleaned_name}_Desde_{page_number + 1}_NoIndex_True")
-            page_number += 50
-
         # create a list to save the data
         self.data = []
         # create counter
         c = 1
-            
-        # Iterate over each url
-        for i, url in enumerate(urls, start=1):
 
-            # Get the html of the page
-            response = requests.get(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-                
+        # Iterate over each search page (the total of results defines how many pages
+        # exist, and the remaining pages are downloaded in parallel)
+        for i, url, soup in iter_search_pages(self.fetch_page, self.base_url, cleaned_name):
+
             # take all posts
             content = soup.find_all('li', class_='ui-search-layout__item')
             #print(content)
@@ -175,5 +180,8 @@ class Scraper():
 if __name__ == "__main__":
     s = Scraper()
     s.menu()
-    s.scraping()
+    try:
+        s.scraping()
+    except SearchUnavailable as e:
+        raise SystemExit(f"\n{e}")
     s.export_to_csv()
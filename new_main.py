@@ -1,17 +1,94 @@
-import os
 import requests
-import pandas as pd
 import re
-from bs4 import BeautifulSoup
-from datetime import datetime
+import time
+from collections import Counter
+from functools import partial
+from canonical import Deduplicator, canonicalize_url
+from embedded_state import load_state, search_items, total_results
+from extractors import FieldExtractor, Selector, money_amount
+from http_cache import USER_AGENT, fetch_cached
+from instrumentation import print_reports
+from listing import SearchListing, batch_timestamp
+from pagination import SearchUnavailable, is_first_page, iter_search_pages, parse_soup
+from parsers import DEFAULT_PARSER
+from pipeline import ParserPool
+from row_writer import open_row_writer
+from throttle import AdaptiveController
+
+# Campos de cada post da busca, com as variantes de seletor em ordem de preferência
+INSTALLMENTS_PREMIUM = 0
+SEARCH_EXTRACTOR = FieldExtractor({
+    "title": [Selector('h2', 'poly-box poly-component__title')],
+    "seller": [Selector('span', 'poly-component__seller')],
+    "price_previous": [
+        Selector('s', 'andes-money-amount andes-money-amount--previous andes-money-amount--cents-comma'),
+        # Sem preço anterior, vale o atual
+        Selector('span', 'andes-money-amount andes-money-amount--cents-superscript'),
+    ],
+    "price_current": [Selector('span', 'andes-money-amount andes-money-amount--cents-superscript')],
+    "discount": [Selector('span', 'andes-money-amount__discount')],
+    "installments": [
+        Selector('span', 'poly-price__installments poly-text-positive'),
+        Selector('span', 'poly-price__installments poly-text-primary'),
+    ],
+    "post_link": [Selector('a')],
+    "image": [Selector('img')],
+})
+
+# Ordem das colunas do CSV de saída
+SEARCH_FIELDS = list(SearchListing.COLUMNS)
+
+# URL base da busca de cada país do menu
+COUNTRIES = {1: 'https://lista.mercadolivre.com.br/'}
+
+
+def clean_name(product_name):
+    """Termo de busca no formato usado na URL e no nome do arquivo ("placa-de-video")."""
+    return product_name.replace(" ", "-").lower()
 
 class Scraper:
+    def __init__(self, controller=None, page_window=8, parser=DEFAULT_PARSER, extraction="dom", cache=None,
+                 journal=None, stream=False, parquet=False, numeric_prices=False, store=None, dedup=None, parse_workers=0, stats=None,
+                 archive=None):
+        self.session = requests.Session()
+        self.session.headers.update({'User-Agent': USER_AGENT})
+        # Mesmo controlador adaptativo usado pelo LinkScraper
+        self.controller = controller or AdaptiveController()
+        # Máximo de páginas de busca baixadas ao mesmo tempo
+        self.page_window = page_window
+        # Backend de parsing do HTML (ver parsers.available_parsers())
+        self.parser = parser
+        # "dom" extrai pelo HTML; "state" lê o JSON embutido e só usa o HTML se ele faltar
+        self.extraction = extraction
+        # Cache em disco opcional (http_cache.HttpCache)
+        self.cache = cache
+        # Diário de checkpoint opcional (checkpoint.CheckpointJournal) com as páginas concluídas
+        self.journal = journal
+        # Preços e desconto como números (centavos e percentual) em vez de texto "R$ 1.295,00"
+        self.numeric_prices = numeric_prices
+        # Histórico de preços opcional (price_store.PriceStore)
+        self.store = store
+        # Anúncios já vistos em páginas anteriores da busca (canonical.Deduplicator)
+        self.dedup = dedup or Deduplicator()
+        # Saída em streaming: as linhas vão para o disco em lotes, sem acumular em self.data
+        self.stream = stream or parquet
+        self.parquet = parquet
+        self.writer = None
+        # Processos de parsing (pipeline.ParserPool); 0 faz o parsing no próprio processo
+        self.parse_workers = parse_workers
+        # Quantas vezes cada variante de seletor casou, por campo
+        self.selector_stats = Counter()
+        # Medidas por URL e por etapa opcionais (instrumentation.RunStats)
+        self.stats = stats
+        # Arquivo opcional do HTML baixado, para reextração offline (html_archive.HtmlArchive)
+        self.archive = archive
+
     def menu(self):
         menu = """
 Escolha o país:
 1. Brasil
 """
-        valid_options = {1: 'https://lista.mercadolivre.com.br/'}
+        valid_options = COUNTRIES
 
         while True:
             print(menu)
@@ -25,20 +102,6 @@ Escolha o país:
             except ValueError:
                 print("Digite um número válido.")
 
-    def convert_to_float(self, price_str):
-        """Converte uma string de preço para float."""
-        if not price_str:
-            return 0.0
-        try:
-            price_cleaned = price_str.replace("R$", "").replace("$", "").replace(".", "").replace(",", ".").strip()
-            return float(price_cleaned)
-        except ValueError:
-            return 0.0
-
-    def format_to_currency(self, value):
-        """Formata um valor float para o formato de moeda brasileiro."""
-        return f"R$ {value:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
-
     def extract_mlb_code(self, post_link):
         """Extrai o código MLB da URL do post."""
         try:
@@ -51,109 +114,205 @@ Escolha o país:
         except Exception:
             return "N/A"
 
-    def scrape_product(self, post):
-        """Extrai as informações de um post."""
+    def scrape_product(self, post, stamp=None):
+        """Extrai as informações de um post (None se o post não puder ser lido)."""
         try:
-            # Título
-            title = post.find('h2', class_='poly-box poly-component__title')
-            title = title.get_text().strip().capitalize() if title else "N/A"
-
-            # Vendedor
-            seller = post.find('span', class_='poly-component__seller')
-            seller = seller.get_text().strip()[4:].capitalize() if seller else "N/A"
-
-            # Preço anterior
-            price_previous = post.find('s', class_='andes-money-amount andes-money-amount--previous andes-money-amount--cents-comma')
-            if price_previous:
-                price_previous = price_previous.text
-            else:
-                price_previous = post.find('span', class_='andes-money-amount__fraction').text
-            
-            price_previous = self.format_to_currency(self.convert_to_float(price_previous))
-            
-            # Preco atual
-            price_current = post.find('span', class_='andes-money-amount andes-money-amount--cents-superscript').text
-            price_current = self.format_to_currency(self.convert_to_float(price_current))
-
-            # Desconto
-            discount = post.find('span', class_='andes-money-amount__discount')
-            discount = discount.get_text().strip() if discount else "0%"
-
-            # Parcelamento e tipo de anúncio
-            installments = post.find('span', class_='poly-price__installments poly-text-positive')
-            ad_type = 'Premium' if installments else 'Classic'
-
-            if not installments:
-                installments = post.find('span', class_='poly-price__installments poly-text-primary')
-            
-            installments = installments.get_text().strip() if installments else "N/A"
-
-            # Link do post
-            post_link = post.find("a")["href"]
-            mlb_code = self.extract_mlb_code(post_link)
-
-            # Link da imagem
-            img_link = post.find("img").get("data-src", post.find("img").get("src", "N/A"))
-
-            # Retorna os dados extraídos
-            return {
-                "mlb": mlb_code,
-                "title": title,
-                "seller": seller,
-                "ad_type": ad_type,
-                "price_previous": price_previous,
+            matches = SEARCH_EXTRACTOR.extract(post)
+            SEARCH_EXTRACTOR.record(self.selector_stats, matches)
+            element = {field: match[0] for field, match in matches.items()}
+
+            title = element["title"]
+            seller = element["seller"]
+            discount = element["discount"]
+            installments = element["installments"]
+            img = element["image"]
+            price_current = money_amount(element["price_current"])
+            if price_current is None:
+                raise ValueError("preço atual não encontrado")
+            return self.build_row({
+                "title": title.get_text() if title else None,
+                "seller": seller.get_text() if seller else None,
+                # Preço anterior (ou o atual, se não houver), com fração e centavos lidos à parte
+                "price_previous": money_amount(element["price_previous"]),
                 "price_current": price_current,
-                "discount": discount,
-                "installments": installments,
-                "date": datetime.now().strftime("%d/%m/%Y %H:%M:%S"),
-                "post link": post_link,
-                "image link": img_link,
-            }
+                "discount": discount.get_text() if discount else None,
+                "installments": installments.get_text() if installments else None,
+                "premium": matches["installments"][1] == INSTALLMENTS_PREMIUM,
+                "post_link": element["post_link"]["href"],
+                "image": img.get("data-src", img.get("src", "N/A")),
+            }, stamp)
         except Exception as e:
             print(f"Erro ao processar o post: {e}")
-            return {}
+            return None
+
+    def build_row(self, fields, stamp=None):
+        """Formata os campos brutos de um post (do HTML ou do JSON) no registro exportado.
+
+        `stamp` é a data/hora da página inteira (listing.batch_timestamp).
+        """
+        # Título
+        title = fields["title"]
+        title = title.strip().capitalize() if title is not None else "N/A"
+
+        # Vendedor (sem o prefixo "Por ")
+        seller = fields["seller"]
+        seller = seller.strip()[4:].capitalize() if seller is not None else "N/A"
 
-    def scraping(self):
-        """Realiza o processo de scraping."""
-        product_name = input("\nDigite o produto: ")
-        cleaned_name = product_name.replace(" ", "-").lower()
-        urls = [self.base_url + cleaned_name]
+        # Preços ficam como valor; o RowWriter formata ao gravar (prices.format_prices ou normalize_prices)
+        price_previous = fields["price_previous"]
+        price_current = fields["price_current"]
 
-        page_number = 50
-        for i in range(0, 10000, 50):
-            urls.append(f"{self.base_url}{cleaned_name}_Desde_{page_number + 1}_NoIndex_True")
-            page_number += 50
+        # Desconto
+        discount = fields["discount"]
+        discount = discount.strip() if discount is not None else "0%"
 
+        # Parcelamento e tipo de anúncio (sem juros = Premium)
+        ad_type = 'Premium' if fields["premium"] else 'Classic'
+        installments = fields["installments"]
+        installments = installments.strip() if installments is not None else "N/A"
+
+        # Link do post (sem o rastreamento da busca)
+        post_link = fields["post_link"]
+        mlb_code = self.extract_mlb_code(post_link)
+        post_link = canonicalize_url(post_link)
+
+        # Retorna os dados extraídos
+        return SearchListing(
+            mlb=mlb_code,
+            title=title,
+            seller=seller,
+            ad_type=ad_type,
+            price_previous=price_previous,
+            price_current=price_current,
+            discount=discount,
+            installments=installments,
+            date=stamp or batch_timestamp(),
+            post_link=post_link,
+            image_link=fields["image"],
+        )
+
+    def parse_search_page(self, html):
+        """Extrai os posts de uma página de busca: (total de resultados, linhas)."""
+        start = time.perf_counter()
+        # Uma data/hora para a página toda
+        stamp = batch_timestamp()
+        if self.extraction == "state":
+            # Lê só o JSON embutido; sem ele, volta para a extração pelo HTML
+            state = load_state(html)
+            parsed = time.perf_counter()
+            items = search_items(state) if state else None
+            if items is not None:
+                self.selector_stats[("_source", "state")] += 1
+                rows = [self.build_row(item, stamp) for item in items]
+                self.record_parse(start, parsed)
+                return total_results(html), rows
+
+        total, soup = parse_soup(html, self.parser)
+        parsed = time.perf_counter()
+        self.selector_stats[("_source", "dom")] += 1
+        rows = []
+        for post in soup.find_all('li', class_='ui-search-layout__item'):
+            post_data = self.scrape_product(post, stamp)
+            if post_data:
+                rows.append(post_data)
+        self.record_parse(start, parsed)
+        return total, rows
+
+    def record_parse(self, start, parsed):
+        """Registra os tempos de parsing e extração da página (se houver instrumentação)."""
+        if self.stats is not None:
+            self.stats.record_parse(None, parsed - start, time.perf_counter() - parsed)
+
+    def fetch_page(self, url):
+        """Baixa uma página de busca; devolve None se todas as tentativas falharem."""
+        if self.journal is not None and url in self.journal and not is_first_page(url):
+            # Página já concluída em uma execução anterior (a primeira é sempre baixada,
+            # pois traz o total de resultados)
+            return None
+        try:
+            return fetch_cached(self.cache, self.controller, self.session, url, self.stats, self.archive, "search")
+        except requests.exceptions.RequestException as e:
+            print(f"\nErro ao acessar {url}: {e}")
+            return None
+
+    def scraping(self, product_name=None):
+        """Realiza o processo de scraping (pergunta o produto se ele não for informado).
+
+        Devolve o nome limpo da busca, usado no nome do arquivo de saída.
+        """
+        if product_name is None:
+            product_name = input("\nDigite o produto: ")
+        cleaned_name = clean_name(product_name)
         self.data = []
+        if self.stream:
+            self.writer = self.open_writer(self.output_path(cleaned_name))
+            if self.journal is not None:
+                # A saída é reescrita do zero: começa pelo que já estava no diário
+                self.writer.write_many(self.journal.rows())
 
-        for i, url in enumerate(urls, start=1):
-            response = requests.get(url)
-            soup = BeautifulSoup(response.text, 'html.parser')
-            content = soup.find_all('li', class_='ui-search-layout__item')
+        pool = None
+        parse = self.parse_search_page
+        if self.parse_workers:
+            # O parsing das páginas da janela roda em paralelo nos processos
+            pool = ParserPool(Scraper, self.parse_workers, self.selector_stats, self.stats, parser=self.parser,
+                              extraction=self.extraction, numeric_prices=self.numeric_prices)
+            parse = partial(pool.call, "parse_search_page")
+
+        try:
+            for i, url, rows in iter_search_pages(self.fetch_page, self.base_url, cleaned_name, self.page_window,
+                                                  parse=parse, parallel_parse=pool is not None):
+                if not rows:
+                    print("\nTérmino do scraping.")
+                    break
 
-            if not content:
-                print("\nTérmino do scraping.")
-                break
+                print(f"\nScrapeando página número {i}: {url}")
+                # O mesmo anúncio pode aparecer em mais de uma página
+                rows = [row for row in rows if self.dedup.admit(row["post link"])]
+                already_done = self.journal is not None and url in self.journal
+                if self.journal is not None and not already_done:
+                    self.journal.append(url, rows)
+                if self.store is not None and not already_done:
+                    # Antes do gravador, que pode normalizar as linhas ao fechar o lote
+                    self.store.add_many(rows)
+                if self.writer is None:
+                    self.data.extend(rows)
+                elif not already_done:
+                    self.writer.write_many(rows)
+        finally:
+            if pool is not None:
+                pool.close()
+        print_reports(self.controller, self.dedup, self.stats, self.selector_stats, self.cache, self.store,
+                      self.archive)
+        return cleaned_name
 
-            print(f"\nScrapeando página número {i}: {url}")
+    def open_writer(self, file_name, fields=SEARCH_FIELDS):
+        """Gravador de `file_name` no formato de preços e com o Parquet configurados neste scraper."""
+        return open_row_writer(file_name, fields, self.numeric_prices, self.parquet)
 
-            for post in content:
-                post_data = self.scrape_product(post)
-                if post_data:
-                    self.data.append(post_data)
+    def output_path(self, cleaned_name):
+        """Caminho do CSV de saída de uma busca."""
+        return f"data/ml_{cleaned_name[:10]}.csv"
 
     def export_to_csv(self, cleaned_name):
         """Exporta os dados para um arquivo CSV."""
-        os.makedirs("data", exist_ok=True)
-        file_name = f"data/ml_{cleaned_name[:10]}.csv"
-        df = pd.DataFrame(self.data)
-        df.to_csv(file_name, sep=";", encoding="utf-8-sig", index=False)
+        if self.writer is not None:
+            # Saída em streaming: as linhas já estão no disco, falta só o último lote
+            self.writer.close()
+            print(f"Arquivo CSV exportado com sucesso: {self.writer.csv_path} ({self.writer.rows_written} linhas)")
+            return
+        file_name = self.output_path(cleaned_name)
+        # Com diário, a exportação inclui também as páginas de execuções anteriores
+        rows = self.journal.rows() if self.journal is not None else self.data
+        with self.open_writer(file_name) as writer:
+            writer.write_many(rows)
         print(f"Arquivo CSV exportado com sucesso: {file_name}")
 
 if __name__ == "__main__":
     scraper = Scraper()
     scraper.menu()
-    scraper.scraping()
-    product_name = input("\nDigite novamente o produto para nome do arquivo CSV: ")
-    cleaned_name = product_name.replace(" ", "-").lower()
+    try:
+        cleaned_name = scraper.scraping()
+    except SearchUnavailable as e:
+        # Sem a primeira página não há o que exportar: sai com erro em vez de gerar um CSV vazio
+        raise SystemExit(f"\n{e}")
     scraper.export_to_csv(cleaned_name)
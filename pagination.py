@@ -0,0 +1,109 @@
+import math
+import re
+from concurrent.futures import ThreadPoolExecutor
+from functools import partial
+
+from parsers import DEFAULT_PARSER, make_soup
+
+PAGE_SIZE = 50  # Resultados por página de busca do Mercado Livre
+MAX_PAGES = 201  # Mesmo limite das URLs _Desde_ geradas antes (offset até 10.001)
+MAX_FAILURES = 3  # Falhas seguidas que encerram a busca quando não há contagem de resultados
+
+
+class SearchUnavailable(Exception):
+    """A primeira página da busca não pôde ser baixada: não há como saber o que existe."""
+
+    def __init__(self, url):
+        super().__init__(f"Não foi possível baixar a primeira página da busca: {url}")
+        self.url = url
+
+
+def page_urls(base_url, cleaned_name, pages=MAX_PAGES):
+    """Monta as URLs das páginas de busca (a primeira sem o sufixo _Desde_)."""
+    urls = [base_url + cleaned_name]
+    for page in range(1, pages):
+        urls.append(f"{base_url}{cleaned_name}_Desde_{page * PAGE_SIZE + 1}_NoIndex_True")
+    return urls
+
+
+def is_first_page(url):
+    """A primeira página é a única sem o sufixo _Desde_."""
+    return "_Desde_" not in url
+
+
+def parse_total_results(soup):
+    """Lê a quantidade total de resultados da busca (ex.: "1.234 resultados")."""
+    quantity = soup.find('span', class_='ui-search-search-result__quantity-results')
+    if not quantity:
+        return None
+    digits = re.sub(r"\D", "", quantity.get_text())
+    return int(digits) if digits else None
+
+
+def page_count(total_results):
+    """Quantidade de páginas necessárias para cobrir todos os resultados."""
+    return max(1, min(MAX_PAGES, math.ceil(total_results / PAGE_SIZE)))
+
+
+def parse_soup(html, parser=DEFAULT_PARSER):
+    """Parse padrão de uma página de busca: (total de resultados, soup)."""
+    soup = make_soup(html, parser)
+    return parse_total_results(soup), soup
+
+
+def iter_search_pages(fetch, base_url, cleaned_name, window=8, parser=DEFAULT_PARSER, parse=None,
+                      parallel_parse=False, max_failures=MAX_FAILURES):
+    """Gera (número da página, url, página) em ordem de página.
+
+    `fetch` recebe uma URL e devolve o HTML (ou None em caso de erro, e a
+    página é pulada). A primeira página informa o total de resultados; se ela
+    falhar, lança SearchUnavailable. Com a contagem, as páginas restantes são
+    baixadas em paralelo, no máximo `window` por vez, e devolvidas na ordem
+    original. Sem ela, segue página a página até o chamador encontrar uma
+    página vazia ou até `max_failures` páginas seguidas falharem.
+
+    `parse` recebe o HTML e devolve (total de resultados ou None, página);
+    por padrão a página é o soup montado com `parser`. Com `parallel_parse`,
+    cada página da janela é baixada e processada na mesma thread (útil quando
+    `parse` despacha para outro processo); senão o parsing é feito em ordem
+    por quem consome o gerador.
+    """
+    if parse is None:
+        parse = partial(parse_soup, parser=parser)
+
+    urls = page_urls(base_url, cleaned_name)
+    html = fetch(urls[0])
+    if html is None:
+        raise SearchUnavailable(urls[0])
+    total, page = parse(html)
+    yield 1, urls[0], page
+
+    if total is None:
+        failures = 0
+        for i, url in enumerate(urls[1:], start=2):
+            html = fetch(url)
+            if html is None:
+                failures += 1
+                if failures == max_failures:
+                    # Sem a contagem não há como distinguir o fim da busca de um bloqueio
+                    return
+                continue
+            failures = 0
+            yield i, url, parse(html)[1]
+        return
+
+    def load(url):
+        html = fetch(url)
+        return None if html is None else parse(html)[1]
+
+    task = load if parallel_parse else fetch
+    urls = urls[1:page_count(total)]
+    with ThreadPoolExecutor(max_workers=window) as executor:
+        # Janela deslizante: só há `window` páginas pendentes ou aguardando consumo
+        pending = [executor.submit(task, url) for url in urls[:window]]
+        for i, url in enumerate(urls):
+            result = pending.pop(0).result()
+            if i + window < len(urls):
+                pending.append(executor.submit(task, urls[i + window]))
+            if result is not None:
+                yield i + 2, url, result if parallel_parse else parse(result)[1]
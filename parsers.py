@@ -0,0 +1,95 @@
+from bs4 import BeautifulSoup
+
+try:
+    from selectolax.lexbor import LexborHTMLParser
+except ImportError:  # selectolax é opcional
+    LexborHTMLParser = None
+
+DEFAULT_PARSER = "html.parser"
+
+
+def class_matches(class_attr, wanted):
+    """Mesma regra do `class_=` do BeautifulSoup: a string completa ou uma das classes."""
+    if wanted is None:
+        return True
+    if not class_attr:
+        return False
+    classes = class_attr.split()
+    return wanted == " ".join(classes) or wanted in classes
+
+
+class SelectolaxNode:
+    """Adapta um nó do selectolax à parte da API do BeautifulSoup usada pelos scrapers.
+
+    Só implementa o necessário para a extração: find, find_all, get_text,
+    text, get e acesso a atributos com [].
+    """
+
+    __slots__ = ("node",)
+
+    def __init__(self, node):
+        self.node = node
+
+    def _candidates(self, name, class_):
+        # O seletor CSS com as classes pré-filtra no lado C; class_matches confirma a regra do bs4
+        selector = "*" if name is True else name
+        if class_:
+            selector += "".join("." + cls for cls in class_.split())
+        # O próprio nó pode casar com o seletor; compara por mem_id, pois `!=` serializa o HTML dos dois nós
+        node = self.node
+        return (child for child in node.css(selector)
+                if child.mem_id != node.mem_id and class_matches(child.attributes.get("class"), class_))
+
+    def find_all(self, name=True, class_=None):
+        return [SelectolaxNode(child) for child in self._candidates(name, class_)]
+
+    def find(self, name=True, class_=None):
+        child = next(self._candidates(name, class_), None)
+        return SelectolaxNode(child) if child is not None else None
+
+    def get_text(self):
+        return self.node.text(deep=True)
+
+    @property
+    def text(self):
+        return self.get_text()
+
+    @property
+    def name(self):
+        return self.node.tag
+
+    def get(self, key, default=None):
+        value = self.node.attributes.get(key)
+        return default if value is None else value
+
+    def __getitem__(self, key):
+        value = self.node.attributes.get(key)
+        if value is None:
+            raise KeyError(key)
+        return value
+
+
+def available_parsers():
+    """Backends de parsing instalados neste ambiente."""
+    parsers = ["html.parser"]
+    try:
+        import lxml  # noqa: F401
+        parsers.append("lxml")
+    except ImportError:
+        pass
+    if LexborHTMLParser is not None:
+        parsers.append("selectolax")
+    return parsers
+
+
+def make_soup(html, parser=DEFAULT_PARSER):
+    """Monta a árvore do HTML com o backend escolhido.
+
+    "html.parser" e "lxml" devolvem um BeautifulSoup; "selectolax" devolve um
+    SelectolaxNode com a mesma interface de busca, bem mais rápido.
+    """
+    if parser == "selectolax":
+        if LexborHTMLParser is None:
+            raise ImportError("O backend 'selectolax' requer o pacote selectolax (pip install selectolax).")
+        return SelectolaxNode(LexborHTMLParser(html).root)
+    return BeautifulSoup(html, parser)
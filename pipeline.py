@@ -0,0 +1,129 @@
+import multiprocessing
+import os
+import queue
+import threading
+from collections import Counter
+from concurrent.futures import ProcessPoolExecutor, ThreadPoolExecutor
+
+from instrumentation import RunStats
+
+_DONE = object()
+# Objeto de parsing de cada processo (um LinkScraper ou Scraper sem sessão em uso)
+_worker = None
+
+
+def _init_worker(factory, kwargs, instrumented):
+    global _worker
+    _worker = factory(**kwargs, stats=RunStats(relay=True) if instrumented else None)
+
+
+def _call(method, args):
+    _worker.selector_stats.clear()
+    result = getattr(_worker, method)(*args)
+    timings = _worker.stats.drain() if _worker.stats is not None else None
+    return result, Counter(_worker.selector_stats), timings
+
+
+class ParserPool:
+    """Processos dedicados ao parsing/extração, fora do GIL das threads de rede.
+
+    Cada processo cria seu próprio objeto com `factory(**kwargs)` (ex.:
+    LinkScraper com o mesmo backend e modo de extração) e executa nele o
+    método pedido. As estatísticas de seletor de cada chamada são somadas em
+    `stats` e, com `run_stats` (instrumentation.RunStats), os tempos de
+    parsing/extração medidos no processo são somados nele. Os processos são
+    iniciados com "spawn", pois o pool convive com threads de rede já em
+    execução.
+    """
+
+    def __init__(self, factory, workers=None, stats=None, run_stats=None, **kwargs):
+        self.workers = workers or os.cpu_count() or 1
+        self.stats = stats if stats is not None else Counter()
+        self.run_stats = run_stats
+        self._lock = threading.Lock()
+        self._pool = ProcessPoolExecutor(self.workers, mp_context=multiprocessing.get_context("spawn"),
+                                         initializer=_init_worker,
+                                         initargs=(factory, kwargs, run_stats is not None))
+
+    def call(self, method, *args):
+        """Executa `method(*args)` num processo e espera o resultado."""
+        result, stats, timings = self._pool.submit(_call, method, args).result()
+        with self._lock:
+            self.stats.update(stats)
+        if timings is not None:
+            self.run_stats.merge(timings)
+        return result
+
+    def close(self):
+        self._pool.shutdown()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def run_pipeline(items, fetch, handle, fetch_workers=8, handle_workers=4, queue_size=32):
+    """Pipeline em estágios: download -> fila limitada -> processamento.
+
+    `fetch_workers` threads chamam `fetch(item)` e colocam (item, resultado)
+    numa fila de no máximo `queue_size` entradas; `handle_workers` threads
+    retiram da fila e chamam `handle(item, resultado)`. Com a fila cheia os
+    downloads esperam, então a memória fica limitada mesmo quando o
+    processamento é mais lento que a rede.
+
+    Se `fetch` lançar uma exceção, os demais downloads param no próximo item,
+    o que já está na fila é processado e a primeira exceção é relançada
+    depois que todas as threads terminam.
+    """
+    items = iter(items)
+    items_lock = threading.Lock()
+    pages = queue.Queue(maxsize=queue_size)
+    cancel = threading.Event()
+    errors = []
+
+    def next_item():
+        with items_lock:
+            return next(items, _DONE)
+
+    def put(entry):
+        # Cancelado, o pipeline vai encerrar: não adianta esperar vaga na fila
+        while not cancel.is_set():
+            try:
+                pages.put(entry, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def fetch_loop():
+        try:
+            while not cancel.is_set() and (item := next_item()) is not _DONE:
+                put((item, fetch(item)))
+        except Exception as e:
+            errors.append(e)
+            cancel.set()
+
+    def handle_loop():
+        while (entry := pages.get()) is not _DONE:
+            try:
+                handle(*entry)
+            except Exception as e:
+                # Uma falha não pode parar o estágio, senão os downloads ficam presos na fila cheia
+                print(f"Erro ao processar {entry[0]}: {e}")
+
+    with ThreadPoolExecutor(max_workers=fetch_workers + handle_workers) as executor:
+        handlers = [executor.submit(handle_loop) for _ in range(handle_workers)]
+        fetchers = [executor.submit(fetch_loop) for _ in range(fetch_workers)]
+        try:
+            for future in fetchers:
+                future.result()
+        finally:
+            # Também numa interrupção do chamador: os downloads param e os handlers esvaziam a fila
+            cancel.set()
+            for _ in handlers:
+                pages.put(_DONE)
+        for future in handlers:
+            future.result()
+    if errors:
+        raise errors[0]
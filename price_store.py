@@ -0,0 +1,274 @@
+import argparse
+import os
+import re
+import sqlite3
+import threading
+import time
+from datetime import datetime, timedelta
+from canonical import listing_id
+from listing import ROW_DATE
+from prices import format_brl, parse_cents, parse_percent
+
+DEFAULT_STORE_PATH = "data/prices.sqlite"
+_MLB_ID = re.compile(r"MLB-?(\d+)", re.IGNORECASE)
+_DB_DATE = "%Y-%m-%d %H:%M:%S"
+# Campos cuja mudança gera uma nova observação
+TRACKED = ("price_cents", "price_previous_cents", "discount_pct", "qtd_available", "seller_sales")
+# Limite de parâmetros por consulta "IN (...)" do SQLite
+_IN_CHUNK = 500
+
+
+def item_key(row):
+    """Código MLB normalizado ("MLB1234567890") da linha, pelo link ou pelo campo mlb."""
+    for field in ("url", "post link"):
+        key = listing_id(row.get(field) or "")
+        if key:
+            return key
+    for field in ("mlb", "url", "post link"):
+        match = _MLB_ID.search(row.get(field) or "")
+        if match:
+            return "MLB" + match.group(1)
+    return None
+
+
+def _cents(row, field):
+    # Linhas já normalizadas (prices.normalize_prices) trazem a coluna em centavos
+    numeric_field = field + "_cents"
+    if numeric_field in row:
+        return row[numeric_field]
+    return parse_cents([row.get(field)])[0] or None
+
+
+def _discount(row):
+    if "discount_pct" in row:
+        return row["discount_pct"]
+    return parse_percent([row.get("discount")])[0]
+
+
+def _text(value):
+    return None if value in (None, "", "N/A", "NA") else value
+
+
+def _scraped_at(row):
+    value = row.get("scraped_at") or row.get("date")
+    try:
+        return datetime.strptime(value, ROW_DATE).strftime(_DB_DATE)
+    except (TypeError, ValueError):
+        return datetime.now().strftime(_DB_DATE)
+
+
+class PriceStore:
+    """Histórico de preços em SQLite, uma linha do tempo por código MLB.
+
+    As linhas dos scrapers são acumuladas em lotes e gravadas numa única
+    transação. Uma nova observação só é registrada quando preço, preço
+    anterior, desconto, estoque ou vendas do vendedor mudaram em relação à
+    última observação do item; caso contrário só `last_seen` é atualizado.
+    Campos ausentes numa linha (ex.: estoque nas linhas da busca) mantêm o
+    último valor conhecido.
+    """
+
+    def __init__(self, path=DEFAULT_STORE_PATH, batch_size=500):
+        self.path = path
+        self.batch_size = batch_size
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._batch = []
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.executescript("""
+            CREATE TABLE IF NOT EXISTS items (
+                mlb TEXT PRIMARY KEY,
+                title TEXT,
+                seller TEXT,
+                url TEXT,
+                first_seen TEXT NOT NULL,
+                last_seen TEXT NOT NULL,
+                price_cents INTEGER,
+                price_previous_cents INTEGER,
+                discount_pct INTEGER,
+                qtd_available TEXT,
+                seller_sales TEXT
+            );
+            CREATE TABLE IF NOT EXISTS observations (
+                id INTEGER PRIMARY KEY,
+                mlb TEXT NOT NULL,
+                scraped_at TEXT NOT NULL,
+                seller TEXT,
+                price_cents INTEGER,
+                price_previous_cents INTEGER,
+                discount_pct INTEGER,
+                qtd_available TEXT,
+                seller_sales TEXT,
+                -- preço da observação anterior do item, para achar quedas sem autojunção
+                last_price_cents INTEGER
+            );
+            CREATE INDEX IF NOT EXISTS observations_mlb_scraped_at ON observations (mlb, scraped_at);
+            CREATE INDEX IF NOT EXISTS observations_seller ON observations (seller);
+            CREATE INDEX IF NOT EXISTS observations_scraped_at ON observations (scraped_at);
+        """)
+
+        self.rows_seen = 0
+        self.observations = 0
+
+    def add(self, row):
+        """Adiciona uma linha extraída; o lote é gravado quando enche.
+
+        Os valores são copiados na hora, então a linha pode ser alterada depois
+        (ex.: pela normalização em lote do RowWriter).
+        """
+        key = item_key(row)
+        if key is None:
+            return
+        record = {
+            "mlb": key,
+            "scraped_at": _scraped_at(row),
+            "title": _text(row.get("title")),
+            "seller": _text(row.get("seller")),
+            "url": row.get("url") or row.get("post link"),
+            "price_cents": _cents(row, "price_current"),
+            "price_previous_cents": _cents(row, "price_previous"),
+            "discount_pct": _discount(row),
+            "qtd_available": _text(row.get("qtd_available")),
+            "seller_sales": _text(row.get("seller_sales")),
+        }
+        with self._lock:
+            self._batch.append(record)
+            if len(self._batch) >= self.batch_size:
+                self._flush()
+
+    def add_many(self, rows):
+        for row in rows:
+            self.add(row)
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        latest = self._latest({record["mlb"] for record in batch})
+
+        observations = []
+        for record in batch:
+            previous = latest.get(record["mlb"])
+            if previous is not None:
+                # Campo ausente nesta linha: mantém o último valor conhecido
+                for field in TRACKED + ("title", "seller", "url"):
+                    if record[field] is None:
+                        record[field] = previous[field]
+                record["first_seen"] = previous["first_seen"]
+            else:
+                record["first_seen"] = record["scraped_at"]
+            if previous is None or any(record[field] != previous[field] for field in TRACKED):
+                observations.append((record["mlb"], record["scraped_at"], record["seller"],
+                                     *(record[field] for field in TRACKED),
+                                     previous["price_cents"] if previous else None))
+            latest[record["mlb"]] = record
+
+        with self._db:
+            self._db.executemany(
+                "INSERT INTO observations (mlb, scraped_at, seller, price_cents, price_previous_cents, "
+                "discount_pct, qtd_available, seller_sales, last_price_cents) VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?)",
+                observations)
+            self._db.executemany(
+                "INSERT OR REPLACE INTO items (mlb, title, seller, url, first_seen, last_seen, price_cents, "
+                "price_previous_cents, discount_pct, qtd_available, seller_sales) "
+                "VALUES (:mlb, :title, :seller, :url, :first_seen, :scraped_at, :price_cents, "
+                ":price_previous_cents, :discount_pct, :qtd_available, :seller_sales)",
+                list({record["mlb"]: record for record in batch}.values()))
+        self.rows_seen += len(batch)
+        self.observations += len(observations)
+
+    def _latest(self, keys):
+        """Último estado conhecido de cada item do lote, com uma consulta por bloco de chaves."""
+        keys = list(keys)
+        columns = ("mlb", "title", "seller", "url", "first_seen") + TRACKED
+        latest = {}
+        for start in range(0, len(keys), _IN_CHUNK):
+            chunk = keys[start:start + _IN_CHUNK]
+            rows = self._db.execute(
+                f"SELECT {', '.join(columns)} FROM items WHERE mlb IN ({', '.join('?' * len(chunk))})", chunk)
+            for row in rows:
+                latest[row[0]] = dict(zip(columns, row))
+        return latest
+
+    def history(self, mlb):
+        """Observações de um item em ordem cronológica (usa o índice (mlb, scraped_at))."""
+        key = item_key({"mlb": mlb}) or mlb
+        with self._lock:
+            cursor = self._db.execute(
+                "SELECT scraped_at, price_cents, price_previous_cents, discount_pct, qtd_available, "
+                "seller_sales, seller FROM observations WHERE mlb = ? ORDER BY scraped_at, id", (key,))
+            columns = [description[0] for description in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor]
+
+    def price_drops(self, since=None):
+        """Itens cujo preço caiu desde `since` (padrão: início do dia de hoje)."""
+        if since is None:
+            since = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0)
+        with self._lock:
+            cursor = self._db.execute(
+                "SELECT o.mlb, i.title, o.last_price_cents AS old_price_cents, o.price_cents, o.scraped_at, i.url "
+                "FROM observations o JOIN items i ON i.mlb = o.mlb "
+                "WHERE o.scraped_at >= ? AND o.price_cents < o.last_price_cents "
+                "ORDER BY o.scraped_at", (since.strftime(_DB_DATE),))
+            columns = [description[0] for description in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor]
+
+    def seller_items(self, seller):
+        """Estado atual dos itens já vistos com um vendedor (usa o índice por vendedor)."""
+        with self._lock:
+            cursor = self._db.execute(
+                "SELECT * FROM items WHERE mlb IN (SELECT mlb FROM observations WHERE seller = ?) "
+                "ORDER BY title", (seller,))
+            columns = [description[0] for description in cursor.description]
+            return [dict(zip(columns, row)) for row in cursor]
+
+    def report(self):
+        """Resumo do que foi gravado nesta execução."""
+        return (f"Histórico de preços: {self.rows_seen} linhas | {self.observations} observações novas | "
+                f"{self.rows_seen - self.observations} sem mudança")
+
+    def close(self):
+        """Grava o lote pendente e fecha o banco."""
+        with self._lock:
+            self._flush()
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Consulta o histórico de preços gravado pelos scrapers.")
+    parser.add_argument("--store", default=DEFAULT_STORE_PATH, help="Banco SQLite do histórico")
+    commands = parser.add_subparsers(dest="command", required=True)
+    history_parser = commands.add_parser("history", help="Histórico de preços de um item")
+    history_parser.add_argument("mlb", help="Código MLB (ex.: MLB-1234567890)")
+    drops_parser = commands.add_parser("drops", help="Itens cujo preço caiu")
+    drops_parser.add_argument("--days", type=int, default=0, help="Dias para trás além de hoje")
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with PriceStore(args.store) as store:
+        if args.command == "history":
+            results = store.history(args.mlb)
+            for obs in results:
+                print(f"{obs['scraped_at']}  {format_brl(obs['price_cents']):>14}  "
+                      f"desconto {obs['discount_pct'] if obs['discount_pct'] is not None else '-'}%  "
+                      f"estoque {obs['qtd_available'] or '-'}")
+        else:
+            since = datetime.now().replace(hour=0, minute=0, second=0, microsecond=0) - timedelta(days=args.days)
+            results = store.price_drops(since)
+            for drop in results:
+                print(f"{drop['scraped_at']}  {drop['mlb']:<16} {format_brl(drop['old_price_cents']):>14} -> "
+                      f"{format_brl(drop['price_cents']):>14}  {drop['title'] or ''}")
+    print(f"{len(results)} resultados em {(time.perf_counter() - start) * 1000:.1f} ms")
@@ -0,0 +1,84 @@
+import re
+
+# Colunas de texto -> colunas numéricas do modo numeric_prices
+NUMERIC_COLUMNS = {
+    "price_previous": "price_previous_cents",
+    "price_current": "price_current_cents",
+    "discount": "discount_pct",
+}
+# Colunas de preço formatadas como texto na gravação (modo padrão, sem numeric_prices)
+PRICE_COLUMNS = ("price_previous", "price_current")
+_PRICE_CHARS = str.maketrans({".": None, "$": None, ",": "."})
+_PERCENT = re.compile(r"(\d+)\s*%")
+
+
+def parse_cents(values):
+    """Converte uma coluna de preços em centavos (int); None quando não há preço válido.
+
+    Aceita o texto do HTML ("R$1.295,50") ou o número do JSON embutido (1295.5).
+    """
+    cents = []
+    for value in values:
+        if isinstance(value, (int, float)):
+            cents.append(round(value * 100))
+            continue
+        try:
+            cents.append(round(float(value.replace("R$", "").translate(_PRICE_CHARS).strip()) * 100))
+        except (AttributeError, ValueError):
+            cents.append(None)
+    return cents
+
+
+def parse_percent(values):
+    """Converte uma coluna de descontos ("15% OFF", "0%") em percentual inteiro."""
+    percents = []
+    for value in values:
+        match = _PERCENT.search(value) if isinstance(value, str) else None
+        percents.append(int(match.group(1)) if match else None)
+    return percents
+
+
+def format_brl(cents):
+    """Formata centavos no padrão de moeda brasileiro (apenas apresentação)."""
+    if cents is None:
+        return ""
+    return f"R$ {cents / 100:,.2f}".replace(",", "X").replace(".", ",").replace("X", ".")
+
+
+def format_prices(rows, columns=PRICE_COLUMNS):
+    """Formata em lote as colunas de preço como texto "R$ 1.295,50" ("N/A" sem preço).
+
+    É a formatação de apresentação da saída padrão: os scrapers guardam o
+    valor lido (número ou texto) e o RowWriter formata ao gravar. As linhas
+    devolvidas são cópias em dicionário; as originais não mudam.
+    """
+    rows = [dict(row) for row in rows]
+    for field in columns:
+        for row, cents in zip(rows, parse_cents([row.get(field) for row in rows])):
+            if field in row:
+                row[field] = format_brl(cents) if cents is not None else "N/A"
+    return rows
+
+
+def numeric_fieldnames(fields):
+    """Ordem das colunas com os nomes numéricos no lugar dos de texto."""
+    return [NUMERIC_COLUMNS.get(field, field) for field in fields]
+
+
+def normalize_prices(rows):
+    """Normaliza em lote as colunas de preço e desconto das linhas.
+
+    Cada coluna é convertida de uma vez (uma lista por coluna) e as colunas
+    de texto são trocadas pelas numéricas de NUMERIC_COLUMNS. Registros de
+    schema fixo (listing.Listing) são convertidos em dicionários; a lista
+    devolvida é a que deve ser usada.
+    """
+    rows = [row if isinstance(row, dict) else dict(row) for row in rows]
+    columns = {}
+    for field, numeric_field in NUMERIC_COLUMNS.items():
+        values = [row.pop(field, None) for row in rows]
+        columns[numeric_field] = parse_percent(values) if field == "discount" else parse_cents(values)
+    for numeric_field, values in columns.items():
+        for row, value in zip(rows, values):
+            row[numeric_field] = value
+    return rows
@@ -0,0 +1,103 @@
+import argparse
+import time
+from collections import Counter
+from datetime import datetime
+from cli import add_format_arguments, add_parsing_arguments
+from html_archive import DEFAULT_ARCHIVE_PATH, HtmlArchive
+from instrumentation import field_rates
+from link_scraper import LINK_FIELDS, LinkScraper
+from listing import ROW_DATE
+from new_main import SEARCH_FIELDS, Scraper
+from parsers import DEFAULT_PARSER
+from pipeline import ParserPool, run_pipeline
+from row_writer import open_row_writer
+
+
+def reextract(archive, kind, output_file, since=None, until=None, latest=True, workers=None,
+              parser=DEFAULT_PARSER, extraction="dom", numeric_prices=False, parquet=False):
+    """Roda a extração atual sobre as páginas arquivadas de um tipo, sem acessar a rede.
+
+    As páginas de produto passam por LinkScraper.parse_link e as de busca por
+    Scraper.parse_search_page, em `workers` processos (pipeline.ParserPool;
+    0 faz o parsing no próprio processo). A data de cada linha é a do
+    download arquivado. Devolve (linhas gravadas, estatísticas de seletor).
+    """
+    entries = archive.select(kind, since, until, latest)
+    print(f"{len(entries)} páginas '{kind}' no arquivo {archive.path}")
+    selector_stats = Counter()
+    if kind == "product":
+        factory, method, fields, date_field = LinkScraper, "parse_link", LINK_FIELDS, "scraped_at"
+        kwargs = {"input_file": None, "output_file": None}
+    else:
+        factory, method, fields, date_field = Scraper, "parse_search_page", SEARCH_FIELDS, "date"
+        kwargs = {}
+    kwargs.update(parser=parser, extraction=extraction, numeric_prices=numeric_prices)
+
+    pool = None
+    if workers == 0:
+        local = factory(**kwargs)
+        local.selector_stats = selector_stats
+
+        def parse(*args):
+            return getattr(local, method)(*args)
+    else:
+        pool = ParserPool(factory, workers, selector_stats, **kwargs)
+
+        def parse(*args):
+            return pool.call(method, *args)
+
+    def load(entry):
+        return archive.read(entry[2])
+
+    def handle(entry, html):
+        url, fetched_at, _ = entry
+        rows = [parse(html, url)] if kind == "product" else parse(html)[1]
+        date = datetime.fromtimestamp(fetched_at).strftime(ROW_DATE)
+        for row in rows:
+            row[date_field] = date
+        writer.write_many(rows)
+
+    writer = open_row_writer(output_file, fields, numeric_prices, parquet)
+    try:
+        # Ler e descomprimir é rápido: poucas threads bastam para manter os processos ocupados
+        run_pipeline(entries, load, handle, fetch_workers=2, handle_workers=pool.workers if pool else 1)
+    finally:
+        if pool is not None:
+            pool.close()
+        writer.close()
+    return writer.rows_written, selector_stats
+
+
+def _timestamp(day):
+    return datetime.strptime(day, "%Y-%m-%d").timestamp()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Reextrai os dados das páginas arquivadas (html_archive), "
+                                                 "com os seletores atuais e sem acessar a rede.")
+    parser.add_argument("--archive", default=DEFAULT_ARCHIVE_PATH, help="Arquivo de HTML")
+    parser.add_argument("--kind", choices=["product", "search"], default="product",
+                        help="Páginas de produto (link_scraper) ou de busca (new_main)")
+    parser.add_argument("--output", default="data/reextracted.csv", help="CSV de saída")
+    parser.add_argument("--since", type=_timestamp, help="Só páginas baixadas a partir deste dia (AAAA-MM-DD)")
+    parser.add_argument("--until", type=_timestamp, help="Só páginas baixadas antes deste dia (AAAA-MM-DD)")
+    parser.add_argument("--all", action="store_true",
+                        help="Todos os downloads de cada URL (padrão: só o mais recente)")
+    parser.add_argument("--workers", type=int, help="Processos de parsing (padrão: número de núcleos; 0: nenhum)")
+    add_parsing_arguments(parser)
+    add_format_arguments(parser)
+    args = parser.parse_args()
+
+    start = time.perf_counter()
+    with HtmlArchive(args.archive) as archive:
+        pages, contents, size, stored = archive.totals()
+        print(f"Arquivo: {pages} páginas | {contents} conteúdos distintos | "
+              f"{size / 1024 ** 2:.1f} MB -> {stored / 1024 ** 2:.1f} MB")
+        rows, selector_stats = reextract(archive, args.kind, args.output, args.since, args.until, not args.all,
+                                         args.workers, args.parser, args.extraction, args.numeric_prices,
+                                         args.parquet)
+    print(f"{rows} linhas exportadas para {args.output} em {time.perf_counter() - start:.1f} s")
+    misses = [f"{field} {values['hit_rate']:.0%}" for field, values in field_rates(selector_stats).items()
+              if values["misses"]]
+    if misses:
+        print(f"Campos com falhas (taxa de acerto): {', '.join(misses)}")
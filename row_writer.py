@@ -0,0 +1,110 @@
+import csv
+import os
+import threading
+from prices import NUMERIC_COLUMNS, format_prices, normalize_prices, numeric_fieldnames
+
+
+class RowWriter:
+    """Grava as linhas em disco em lotes, à medida que são extraídas.
+
+    O CSV sai no mesmo formato de sempre (separador ";" e utf-8-sig) e,
+    opcionalmente, também em Parquet (requer pyarrow). Só o lote atual fica
+    em memória, então o consumo não cresce com a quantidade de linhas.
+    Campos ausentes numa linha saem vazios; a ordem das colunas é `fieldnames`.
+    `transform`, se informado, recebe cada lote antes da gravação (ex.:
+    prices.normalize_prices) e `int_fields` são gravados como inteiros no
+    Parquet.
+    """
+
+    def __init__(self, csv_path, fieldnames, batch_size=500, parquet_path=None, transform=None, int_fields=()):
+        self.csv_path = csv_path
+        self.fieldnames = list(fieldnames)
+        self.batch_size = batch_size
+        self.parquet_path = parquet_path
+        self.transform = transform
+        self.int_fields = set(int_fields)
+        self.rows_written = 0
+        self._batch = []
+        self._lock = threading.Lock()
+
+        directory = os.path.dirname(csv_path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+        self._file = open(csv_path, "w", newline="", encoding="utf-8-sig")
+        # Fim de linha do sistema, como no DataFrame.to_csv usado antes pela exportação
+        self._csv = csv.DictWriter(self._file, fieldnames=self.fieldnames, delimiter=";",
+                                   restval="", extrasaction="ignore", lineterminator=os.linesep)
+        self._csv.writeheader()
+        self._parquet = self._open_parquet() if parquet_path else None
+
+    def _open_parquet(self):
+        try:
+            import pyarrow as pa
+            import pyarrow.parquet as pq
+        except ImportError:
+            raise ImportError("A saída Parquet requer o pacote pyarrow (pip install pyarrow).")
+        self._pa = pa
+        self._schema = pa.schema([(name, pa.int64() if name in self.int_fields else pa.string())
+                                  for name in self.fieldnames])
+        return pq.ParquetWriter(self.parquet_path, self._schema)
+
+    def write(self, row):
+        """Adiciona uma linha; o lote é gravado quando enche."""
+        with self._lock:
+            self._batch.append(row)
+            if len(self._batch) >= self.batch_size:
+                self._flush()
+
+    def write_many(self, rows):
+        for row in rows:
+            self.write(row)
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._batch:
+            return
+        batch, self._batch = self._batch, []
+        if self.transform is not None:
+            batch = self.transform(batch)
+        self._csv.writerows(batch)
+        self._file.flush()
+        if self._parquet is not None:
+            columns = {}
+            for name in self.fieldnames:
+                values = [row.get(name) for row in batch]
+                if name not in self.int_fields:
+                    values = [None if value is None else str(value) for value in values]
+                columns[name] = values
+            self._parquet.write_table(self._pa.table(columns, schema=self._schema))
+        self.rows_written += len(batch)
+
+    def close(self):
+        """Grava o lote pendente e fecha os arquivos."""
+        with self._lock:
+            self._flush()
+            self._file.close()
+            if self._parquet is not None:
+                self._parquet.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+def open_row_writer(file_name, fieldnames, numeric_prices=False, parquet=False):
+    """RowWriter no formato de saída dos scrapers.
+
+    Preços em texto "R$ 1.295,50" (prices.format_prices) ou, com
+    `numeric_prices`, em centavos (prices.normalize_prices). Com `parquet`,
+    grava também um .parquet ao lado do CSV.
+    """
+    parquet_path = os.path.splitext(file_name)[0] + ".parquet" if parquet else None
+    if numeric_prices:
+        return RowWriter(file_name, numeric_fieldnames(fieldnames), parquet_path=parquet_path,
+                         transform=normalize_prices, int_fields=NUMERIC_COLUMNS.values())
+    return RowWriter(file_name, fieldnames, parquet_path=parquet_path, transform=format_prices)
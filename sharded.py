@@ -0,0 +1,183 @@
+import argparse
+import csv
+import glob
+import os
+import socket
+import threading
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime
+import requests
+from cli import add_format_arguments, add_parsing_arguments
+from lease_queue import DEFAULT_QUEUE_PATH, LeaseQueue
+from link_scraper import LinkScraper
+from listing import ROW_DATE
+from row_writer import RowWriter
+
+DEFAULT_SHARD_DIR = "data/shards"
+
+
+def worker_id():
+    """Identificação do worker: máquina e processo."""
+    return f"{socket.gethostname()}-{os.getpid()}"
+
+
+class ShardWorker:
+    """Worker que processa lotes de links da fila (lease_queue.LeaseQueue).
+
+    Cada worker grava as linhas no seu próprio arquivo em `shard_dir`
+    (shard-<máquina>-<pid>-<início>.csv, nunca reaproveitado), então vários
+    processos, em uma ou mais máquinas, trabalham sem disputar a saída. O
+    lote só é marcado como concluído depois que as linhas foram gravadas no
+    shard; uma thread renova as reservas enquanto o worker está vivo (se a
+    renovação falhar, o worker para depois do lote atual). Se ele morrer, as
+    reservas vencem e os links voltam para a fila; o que chegou a ir para o
+    shard aparece em dobro e é descartado por `merge_shards`.
+    """
+
+    def __init__(self, queue, scraper_kwargs=None, shard_dir=DEFAULT_SHARD_DIR, batch_size=50,
+                 lease_seconds=300.0, worker=None):
+        self.queue = queue
+        self.batch_size = batch_size
+        self.lease_seconds = lease_seconds
+        self.worker = worker or worker_id()
+        shard = os.path.join(shard_dir, f"shard-{self.worker}-{time.strftime('%Y%m%d%H%M%S')}.csv")
+        self.scraper = LinkScraper(None, shard, stream=True, **(scraper_kwargs or {}))
+        self.done = 0
+        self.failed = 0
+
+    def process(self, task):
+        """Baixa e extrai um link; devolve (id, sucesso). Na última tentativa, a falha vira uma linha "N/A"."""
+        task_id, url, attempt = task
+        scraper = self.scraper
+        try:
+            row = scraper.parse_link(scraper.fetch(url), url)
+        except Exception as e:
+            # Falha de rede ou de extração: o link volta para a fila (ou falha de vez na última tentativa)
+            # sem derrubar o lote inteiro
+            action = "acessar" if isinstance(e, requests.exceptions.RequestException) else "processar"
+            print(f"Erro ao {action} {url} (tentativa {attempt}): {e}")
+            if attempt >= self.queue.max_attempts:
+                scraper.checkpoint(url, scraper.failed_row(url), ok=False)
+            return task_id, False
+        scraper.checkpoint(url, row)
+        return task_id, True
+
+    def run(self):
+        """Processa lotes até a fila esvaziar; devolve quantos links foram concluídos."""
+        stop = threading.Event()
+
+        def heartbeat():
+            while not stop.wait(self.lease_seconds / 3):
+                try:
+                    self.queue.renew(self.worker, self.lease_seconds)
+                except Exception as e:
+                    # Sem renovação as reservas vencem e os links vão para outros workers:
+                    # termina o lote atual e não pega outro
+                    print(f"[{self.worker}] Erro ao renovar as reservas, parando o worker: {e}")
+                    stop.set()
+
+        threading.Thread(target=heartbeat, daemon=True).start()
+        try:
+            with ThreadPoolExecutor(max_workers=self.scraper.controller.max_limit) as executor:
+                while not stop.is_set() and (tasks := self.queue.lease(self.worker, self.batch_size,
+                                                                         self.lease_seconds)):
+                    results = list(executor.map(self.process, tasks))
+                    # As linhas vão para o disco antes de o lote ser dado como concluído
+                    self.scraper.writer.flush()
+                    done = [task_id for task_id, ok in results if ok]
+                    failed = [task_id for task_id, ok in results if not ok]
+                    self.queue.complete(self.worker, done, failed)
+                    self.done += len(done)
+                    self.failed += len(failed)
+                    print(f"[{self.worker}] lote de {len(tasks)}: {len(done)} concluídos | fila: {self.queue.report()}")
+        finally:
+            stop.set()
+            self.scraper.writer.close()
+        print(f"[{self.worker}] {self.done} links concluídos, {self.failed} falhas -> {self.scraper.output_file}")
+        print(self.scraper.controller.report())
+        return self.done
+
+
+def _row_time(row):
+    try:
+        return datetime.strptime(row.get("scraped_at") or "", ROW_DATE)
+    except ValueError:
+        return datetime.min
+
+
+def merge_shards(shard_dir, output_file, parquet=False):
+    """Junta os shards num único CSV, uma linha por link (a extração mais recente).
+
+    Linhas "N/A" de falhas só ficam quando o link não tem nenhuma extração
+    bem-sucedida. Devolve a quantidade de linhas gravadas.
+    """
+    shards = sorted(glob.glob(os.path.join(shard_dir, "shard-*.csv")))
+    fieldnames, rows = None, {}
+    for shard in shards:
+        with open(shard, newline="", encoding="utf-8-sig") as f:
+            reader = csv.DictReader(f, delimiter=";")
+            fieldnames = fieldnames or reader.fieldnames
+            for row in reader:
+                previous = rows.get(row["url"])
+                failed = row["title"] == "N/A"
+                if previous is not None:
+                    previous_failed = previous["title"] == "N/A"
+                    if failed and not previous_failed:
+                        continue
+                    if failed == previous_failed and _row_time(row) < _row_time(previous):
+                        continue
+                rows[row["url"]] = row
+    if fieldnames is None:
+        print(f"Nenhum shard em {shard_dir}.")
+        return 0
+    parquet_path = os.path.splitext(output_file)[0] + ".parquet" if parquet else None
+    int_fields = [name for name in fieldnames if name.endswith(("_cents", "_pct"))]
+    with RowWriter(output_file, fieldnames, parquet_path=parquet_path, int_fields=int_fields) as writer:
+        if int_fields and parquet:
+            for row in rows.values():
+                for name in int_fields:
+                    row[name] = int(row[name]) if row[name] else None
+        writer.write_many(rows.values())
+    print(f"{len(shards)} shards | {len(rows)} links exportados para {output_file}")
+    return len(rows)
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Processa os links em vários workers com uma fila compartilhada.")
+    parser.add_argument("--queue", default=DEFAULT_QUEUE_PATH, help="Banco SQLite da fila")
+    parser.add_argument("--max-attempts", type=int, default=3, help="Tentativas por link antes de desistir")
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    enqueue_parser = commands.add_parser("enqueue", help="Coloca os links do CSV na fila")
+    enqueue_parser.add_argument("--input", default="data/ml_links.csv", help="Arquivo CSV de entrada")
+
+    work_parser = commands.add_parser("work", help="Processa lotes da fila até ela esvaziar")
+    work_parser.add_argument("--shard-dir", default=DEFAULT_SHARD_DIR, help="Diretório dos shards de saída")
+    work_parser.add_argument("--batch", type=int, default=50, help="Links por lote")
+    work_parser.add_argument("--lease", type=float, default=300.0, help="Validade da reserva de um lote (segundos)")
+    work_parser.add_argument("--worker-id", help="Nome do worker (padrão: máquina-pid)")
+    add_parsing_arguments(work_parser)
+    add_format_arguments(work_parser, parquet=False)
+
+    merge_parser = commands.add_parser("merge", help="Junta os shards num único CSV")
+    merge_parser.add_argument("--shard-dir", default=DEFAULT_SHARD_DIR, help="Diretório dos shards")
+    merge_parser.add_argument("--output", default="data/extracted_data.csv", help="Arquivo CSV de saída")
+    add_format_arguments(merge_parser, numeric_prices=False)
+
+    commands.add_parser("status", help="Mostra a situação da fila")
+    args = parser.parse_args()
+
+    if args.command == "merge":
+        merge_shards(args.shard_dir, args.output, args.parquet)
+    else:
+        with LeaseQueue(args.queue, args.max_attempts) as queue:
+            if args.command == "enqueue":
+                reader = LinkScraper(args.input, None)
+                reader.read_csv()
+                print(f"{queue.enqueue(reader.links)} links novos na fila")
+            elif args.command == "work":
+                ShardWorker(queue, {"parser": args.parser, "extraction": args.extraction,
+                                    "numeric_prices": args.numeric_prices},
+                            args.shard_dir, args.batch, args.lease, args.worker_id).run()
+            print(f"Fila: {queue.report()}")
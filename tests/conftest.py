@@ -0,0 +1,52 @@
+import csv
+import os
+import socket
+import sys
+
+import pytest
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path[:0] = [ROOT, os.path.join(ROOT, "benchmarks")]
+
+from stand_in_server import StandInServer  # noqa: E402
+from throttle import AdaptiveController  # noqa: E402
+
+
+@pytest.fixture(scope="session")
+def server():
+    """Servidor local com as páginas de benchmarks/fixtures, sem latência nem falhas injetadas."""
+    server = StandInServer().start()
+    yield server
+    server.shutdown()
+    server.server_close()
+
+
+@pytest.fixture
+def refused_url():
+    """URL de uma porta local sem ninguém escutando (conexão recusada)."""
+    with socket.socket() as sock:
+        sock.bind(("127.0.0.1", 0))
+        port = sock.getsockname()[1]
+    return f"http://127.0.0.1:{port}/MLB-1000000001-fora-do-ar-_JM"
+
+
+def fast_controller(**kwargs):
+    """Controlador com esperas curtas, para os testes de falha não demorarem."""
+    kwargs.setdefault("base_delay", 0.01)
+    kwargs.setdefault("max_delay", 0.05)
+    kwargs.setdefault("max_retries", 1)
+    return AdaptiveController(**kwargs)
+
+
+def write_links(path, links):
+    """CSV de entrada do LinkScraper (coluna "post link")."""
+    with open(path, "w", newline="", encoding="utf-8-sig") as f:
+        writer = csv.writer(f, delimiter=";")
+        writer.writerow(["post link"])
+        writer.writerows([link] for link in links)
+    return str(path)
+
+
+def read_rows(path):
+    with open(path, newline="", encoding="utf-8-sig") as f:
+        return list(csv.DictReader(f, delimiter=";"))
@@ -0,0 +1,63 @@
+import os
+
+from batch import BatchScraper
+from checkpoint import CheckpointJournal
+from conftest import fast_controller, read_rows
+from new_main import Scraper
+
+
+def batch_run(tmp_path, base_url, queries, combined=None, fetch_page=None):
+    scraper = Scraper(controller=fast_controller())
+    if fetch_page is not None:
+        scraper.fetch_page = fetch_page(scraper.fetch_page)
+    journal = CheckpointJournal(str(tmp_path / "batch.journal.jsonl"))
+    batch = BatchScraper(scraper, str(tmp_path), combined, journal=journal)
+    try:
+        batch.run(queries, base_url)
+    finally:
+        journal.close()
+    return batch
+
+
+def test_completed_queries_are_skipped_on_resume(server, tmp_path):
+    base_url = server.base_url + "/lista/"
+    combined = str(tmp_path / "lote.csv")
+    first = batch_run(tmp_path, base_url, ["rtx 3050", "ssd"], combined)
+    assert first.incomplete == {} and all(first.results.values())
+    rows = read_rows(combined)
+    assert {row["query"] for row in rows} == {"rtx 3050", "ssd"}
+
+    second = batch_run(tmp_path, base_url, ["rtx 3050", "ssd"], combined)
+    assert second.results == {}
+    assert len(read_rows(combined)) == len(rows)
+
+
+def test_refused_first_page_is_not_journaled_as_done(tmp_path, refused_url):
+    base_url = refused_url.rsplit("/", 1)[0] + "/lista/"
+    output = tmp_path / "ml_rtx-3050.csv"
+    output.write_text("execução anterior\n", encoding="utf-8")
+
+    batch = batch_run(tmp_path, base_url, ["rtx 3050"])
+    assert batch.incomplete == {"rtx 3050": 1}
+    # O CSV da execução anterior não é substituído por um vazio
+    assert output.read_text(encoding="utf-8") == "execução anterior\n"
+    journal = CheckpointJournal(str(tmp_path / "batch.journal.jsonl"))
+    assert "query:rtx-3050" not in journal
+    journal.close()
+
+
+def test_failed_later_pages_leave_the_query_incomplete(server, tmp_path):
+    def failing_pages(fetch_page):
+        return lambda url: None if "_Desde_" in url else fetch_page(url)
+
+    base_url = server.base_url + "/lista/"
+    combined = str(tmp_path / "lote.csv")
+    batch = batch_run(tmp_path, base_url, ["rtx 3050"], combined, fetch_page=failing_pages)
+    assert batch.incomplete and batch.results["rtx 3050"]
+
+    # Na retomada a busca é refeita, e as linhas da tentativa incompleta não se repetem
+    retry = batch_run(tmp_path, base_url, ["rtx 3050"], combined)
+    assert retry.incomplete == {}
+    rows = read_rows(combined)
+    assert len(rows) == retry.results["rtx 3050"]
+    assert not os.path.exists(tmp_path / "ml_rtx-3050.csv")
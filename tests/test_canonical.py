@@ -0,0 +1,38 @@
+from canonical import Deduplicator, canonicalize_url, dedup_key, listing_id
+
+
+def test_tracking_parameters_are_dropped():
+    url = ("https://produto.mercadolivre.com.br/MLB-4631052614-placa-_JM"
+           "?polycard_client=search&position=3&utm_source=x&color=preto#reco_id=1")
+    assert canonicalize_url(url) == "https://produto.mercadolivre.com.br/MLB-4631052614-placa-_JM?color=preto"
+
+
+def test_catalog_link_and_direct_link_share_a_key():
+    catalog = "https://www.mercadolivre.com.br/placa/p/MLB33477029?tracking_id=1#wid=MLB3804569029&sid=search"
+    direct = "https://produto.mercadolivre.com.br/MLB-3804569029-placa-_JM"
+    assert listing_id(catalog) == listing_id(direct) == "MLB3804569029"
+    assert dedup_key(catalog) == dedup_key(direct)
+    assert canonicalize_url(catalog).endswith("#wid=MLB3804569029")
+
+
+def test_duplicates_are_filtered_in_memory():
+    dedup = Deduplicator()
+    links = ["https://a.com/MLB-1-x", "https://a.com/MLB-1-x?position=2", "https://a.com/MLB-2-y"]
+    assert dedup.filter(links) == ["https://a.com/MLB-1-x", "https://a.com/MLB-2-y"]
+    assert dedup.duplicates == 1
+
+
+def test_seen_index_only_keeps_remembered_links(tmp_path):
+    path = str(tmp_path / "seen.txt")
+    dedup = Deduplicator(path)
+    assert dedup.filter(["https://a.com/MLB-1-x", "https://a.com/MLB-2-y"]) == [
+        "https://a.com/MLB-1-x", "https://a.com/MLB-2-y"]
+    dedup.remember("https://a.com/MLB-1-x")
+    dedup.remember("https://a.com/MLB-1-x")
+    dedup.close()
+
+    with open(path, encoding="utf-8") as f:
+        assert f.read() == "MLB1\n"
+    dedup = Deduplicator(path)
+    assert dedup.filter(["https://a.com/MLB-1-x", "https://a.com/MLB-2-y"]) == ["https://a.com/MLB-2-y"]
+    dedup.close()
@@ -0,0 +1,51 @@
+import os
+
+from checkpoint import CheckpointJournal
+
+
+def test_reopen_skips_done_keys_and_retries_failures(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = CheckpointJournal(path)
+    journal.append("a", [{"url": "a", "title": "A"}])
+    journal.append("b", [{"url": "b", "title": "N/A"}], ok=False)
+    journal.close()
+
+    journal = CheckpointJournal(path)
+    assert "a" in journal
+    assert "b" not in journal
+    assert len(journal) == 1
+    assert [row["url"] for row in journal.rows()] == ["a", "b"]
+    assert [row["url"] for row in journal.rows(done_only=True)] == ["a"]
+    journal.close()
+
+
+def test_retry_replaces_the_failed_record(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = CheckpointJournal(path)
+    journal.append("b", [{"url": "b", "title": "N/A"}], ok=False)
+    journal.append("b", [{"url": "b", "title": "B"}])
+    assert "b" in journal
+    assert [row["title"] for row in journal.rows()] == ["B"]
+    journal.close()
+
+
+def test_torn_last_line_is_truncated(tmp_path):
+    path = str(tmp_path / "journal.jsonl")
+    journal = CheckpointJournal(path)
+    journal.append("a", [{"url": "a"}])
+    journal.close()
+    intact = os.path.getsize(path)
+    # Interrupção no meio da escrita da segunda linha
+    with open(path, "ab") as f:
+        f.write(b'{"key": "b", "ok": true, "rows": [{"url"')
+
+    journal = CheckpointJournal(path)
+    assert "a" in journal
+    assert "b" not in journal
+    assert os.path.getsize(path) == intact
+    journal.append("b", [{"url": "b"}])
+    journal.close()
+
+    journal = CheckpointJournal(path)
+    assert [row["url"] for row in journal.rows()] == ["a", "b"]
+    journal.close()
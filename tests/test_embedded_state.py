@@ -0,0 +1,37 @@
+import os
+
+from bench_parsers import FIXTURES_DIR
+from embedded_state import dig, load_state, product_fields, render, search_items, total_results
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_search_state_has_every_post():
+    html = fixture("search_rtx3050.html")
+    items = search_items(load_state(html))
+    assert items and all(item["post_link"].startswith("https://") for item in items)
+    assert total_results(html) > len(items)
+
+
+def test_product_state_fields():
+    fields = product_fields(load_state(fixture("product_rtx3050.html")))
+    assert fields["title"] and fields["price_current"] is not None
+    assert fields["paused"] is False
+
+
+def test_missing_or_broken_state_falls_back():
+    assert load_state("<html><body>sem estado</body></html>") is None
+    assert load_state('<script id="__PRELOADED_STATE__">{"quebrado": </script>') is None
+    assert search_items({"pageState": {}}) is None
+    assert product_fields({}) is None
+
+
+def test_dig_and_render():
+    assert dig({"a": [{"b": 1}]}, "a", 0, "b") == 1
+    assert dig({"a": []}, "a", 0, "b") is None
+    component = {"text": "Por {seller}", "values": [{"key": "seller", "label": {"text": "Loja"}}]}
+    assert render(component) == "Por Loja"
+    assert render("texto") == "texto"
@@ -0,0 +1,44 @@
+from collections import Counter
+
+import pytest
+
+from extractors import MISS, FieldExtractor, Selector, has_text, selector_report
+from parsers import available_parsers, make_soup
+
+HTML = """
+<div class="item">
+  <h1 class="ui-pdp-title">Placa de vídeo</h1>
+  <span class="qtd">  </span>
+  <div class="qtd andes">12 disponíveis</div>
+  <span class="price">R$ 10</span>
+</div>
+"""
+
+FIELDS = {
+    "title": [Selector("h1", "ui-pdp-title")],
+    # A primeira variante existe mas está vazia: vale a segunda
+    "qtd": [Selector("span", "qtd", has_text), Selector("div", "qtd")],
+    "seller": [Selector("a", "seller"), Selector("span", "seller")],
+}
+
+
+@pytest.mark.parametrize("parser", available_parsers())
+def test_first_accepted_variant_wins(parser):
+    extractor = FieldExtractor(FIELDS)
+    matches = extractor.extract(make_soup(HTML, parser))
+    element, index = matches["title"]
+    assert (element.get_text().strip(), index) == ("Placa de vídeo", 0)
+    element, index = matches["qtd"]
+    assert (element.get_text().strip(), index) == ("12 disponíveis", 1)
+    assert matches["seller"] == (None, None)
+
+
+def test_selector_stats_count_hits_and_misses():
+    extractor = FieldExtractor(FIELDS)
+    stats = Counter()
+    for _ in range(2):
+        extractor.record(stats, extractor.extract(make_soup(HTML)))
+    assert stats[("title", "h1.ui-pdp-title")] == 2
+    assert stats[("qtd", "div.qtd")] == 2
+    assert stats[("seller", MISS)] == 2
+    assert "seller           miss" in selector_report(stats)
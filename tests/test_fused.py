@@ -0,0 +1,34 @@
+from urllib.parse import urlsplit
+
+from conftest import fast_controller, read_rows
+from fused import DETAIL_PREFIX, FusedScraper
+from new_main import Scraper
+
+
+def test_detail_errors_are_counted_and_the_rest_is_written(server, tmp_path):
+    scraper = Scraper(controller=fast_controller())
+    search_page = scraper.fetch_page
+    # Só a primeira página da busca, para o teste baixar poucos produtos
+    scraper.fetch_page = lambda url: None if "_Desde_" in url else search_page(url)
+    fused = FusedScraper(scraper)
+
+    scrape_link = fused.link_scraper.scrape_link
+    calls = []
+
+    def flaky(url):
+        # Os links da página salva apontam para o site real: o detalhe vem do servidor local
+        calls.append(url)
+        if len(calls) % 4 == 0:
+            raise RuntimeError("falha inesperada")
+        return scrape_link(server.base_url + urlsplit(url).path)
+
+    fused.link_scraper.scrape_link = flaky
+    output = str(tmp_path / "fused.csv")
+    records = fused.run("rtx 3050", output, server.base_url + "/lista/")
+
+    errors = len(calls) // 4
+    assert calls and fused.errors == errors
+    assert records == len(calls) - errors
+    rows = read_rows(output)
+    assert len(rows) == records
+    assert all(row[DETAIL_PREFIX + "title"] not in ("", "N/A") for row in rows)
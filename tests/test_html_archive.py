@@ -0,0 +1,73 @@
+import os
+from datetime import datetime
+
+import pytest
+
+from bench_parsers import FIXTURES_DIR
+from conftest import fast_controller, read_rows
+from html_archive import HtmlArchive
+from http_cache import HttpCache
+from link_scraper import LinkScraper
+from listing import ROW_DATE
+from reextract import reextract
+
+
+def fixture(name):
+    with open(os.path.join(FIXTURES_DIR, name), encoding="utf-8") as f:
+        return f.read()
+
+
+def test_identical_pages_are_stored_once(tmp_path):
+    with HtmlArchive(str(tmp_path / "archive.sqlite"), codec="gzip") as archive:
+        html = fixture("product_rtx3050.html")
+        archive.add("https://a.com/MLB-1-x?position=1", html, fetched_at=100)
+        archive.add("https://a.com/MLB-1-x", html, fetched_at=200)
+        archive.add("https://a.com/MLB-2-x", "<html>outro</html>", fetched_at=300)
+        archive.add("https://a.com/lista/placa", "<html>busca</html>", "search", fetched_at=300)
+
+        pages, contents, size, stored = archive.totals()
+        assert (pages, contents) == (4, 3)
+        assert stored < size
+
+        latest = archive.select("product")
+        assert [(url, fetched_at) for url, fetched_at, _ in latest] == [
+            ("https://a.com/MLB-1-x", 200), ("https://a.com/MLB-2-x", 300)]
+        assert archive.read(latest[0][2]) == html
+        assert len(archive.select("product", latest=False)) == 3
+        assert len(archive.select("product", since=150, until=250, latest=False)) == 1
+
+
+def test_reextract_uses_the_archived_date(tmp_path):
+    fetched_at = datetime(2024, 5, 1, 10, 0).timestamp()
+    with HtmlArchive(str(tmp_path / "archive.sqlite")) as archive:
+        archive.add("https://a.com/MLB-1-x", fixture("product_rtx3050.html"), fetched_at=fetched_at)
+        archive.add("https://a.com/lista/placa", fixture("search_rtx3050.html"), "search", fetched_at=fetched_at)
+
+        rows_written, _ = reextract(archive, "product", str(tmp_path / "product.csv"), workers=0)
+        assert rows_written == 1
+        row, = read_rows(tmp_path / "product.csv")
+        assert row["url"] == "https://a.com/MLB-1-x" and row["title"] != "N/A"
+        assert row["scraped_at"] == datetime(2024, 5, 1, 10, 0).strftime(ROW_DATE)
+
+        rows_written, _ = reextract(archive, "search", str(tmp_path / "search.csv"), workers=0)
+        rows = read_rows(tmp_path / "search.csv")
+        assert rows_written == len(rows) > 1
+        assert {row["date"] for row in rows} == {"01/05/2024 10:00:00"}
+
+
+@pytest.mark.parametrize("mode", ["threads", "async"])
+def test_cache_hits_are_not_archived_again(server, tmp_path, mode):
+    urls = server.product_urls(2)
+    cache = HttpCache(str(tmp_path / "cache"))
+    with HtmlArchive(str(tmp_path / "archive.sqlite")) as archive:
+        # A segunda execução é servida pelo cache: nada de novo para arquivar
+        for _ in range(2):
+            link_scraper = LinkScraper(None, None, controller=fast_controller(), cache=cache, archive=archive)
+            link_scraper.links = list(urls)
+            if mode == "async":
+                link_scraper.scrape_links_async(concurrency=2)
+            else:
+                link_scraper.scrape_links()
+            assert all(row["title"] != "N/A" for row in link_scraper.data)
+        assert archive.totals()[0] == len(urls)
+    cache.close()
@@ -0,0 +1,76 @@
+import os
+
+import requests
+
+from conftest import fast_controller
+from http_cache import HttpCache, fetch_cached
+
+
+def blob_bytes(directory):
+    """Bytes dos corpos realmente gravados em disco."""
+    return sum(os.path.getsize(os.path.join(root, name))
+               for root, _, names in os.walk(os.path.join(directory, "blobs")) for name in names)
+
+
+def test_second_fetch_is_served_from_cache(server, tmp_path):
+    server.reset()
+    cache = HttpCache(str(tmp_path / "cache"))
+    controller, session = fast_controller(), requests.Session()
+    url = server.product_urls(1)[0]
+    first = fetch_cached(cache, controller, session, url)
+    second = fetch_cached(cache, controller, session, url + "?tracking_id=abc")
+    assert first == second
+    assert server.stats["200"] == 1
+    assert cache.hits == 1 and cache.misses == 1
+    cache.close()
+
+
+def test_expired_entry_is_revalidated_with_304(tmp_path):
+    cache = HttpCache(str(tmp_path / "cache"), ttl=0)
+    cache.store("https://a.com/MLB-1-x", "<html>1</html>", etag='"v1"')
+    entry = cache.lookup("https://a.com/MLB-1-x")
+    assert not entry.fresh
+    assert HttpCache.request_headers(entry) == {"If-None-Match": '"v1"'}
+
+    status, text = cache.resolve("https://a.com/MLB-1-x", entry, 304, "", {}, ttl=60)
+    assert (status, text) == (200, "<html>1</html>")
+    assert cache.lookup("https://a.com/MLB-1-x").fresh
+    assert cache.revalidated == 1
+    cache.close()
+
+
+def test_eviction_keeps_size_in_step_with_disk(tmp_path):
+    directory = str(tmp_path / "cache")
+    cache = HttpCache(directory, max_bytes=20_000)
+    for i in range(60):
+        # Conteúdos repetidos contam uma vez só
+        cache.store(f"https://a.com/MLB-{i}-x", f"{i % 40}" + "x" * 1000)
+        cache.lookup("https://a.com/MLB-0-x")
+    assert cache.size == blob_bytes(directory) <= 20_000
+    assert cache.lookup("https://a.com/MLB-0-x") is not None
+    assert cache.lookup("https://a.com/MLB-1-x") is None
+
+    # A URL muda de conteúdo: o anterior deixa de contar
+    cache.store("https://a.com/MLB-59-x", "novo")
+    assert cache.size == blob_bytes(directory)
+    cache.close()
+
+    reopened = HttpCache(directory, max_bytes=20_000)
+    assert reopened.size == blob_bytes(directory)
+    reopened.close()
+
+
+def test_batched_lookups_still_count_for_eviction_after_reopen(tmp_path):
+    directory = str(tmp_path / "cache")
+    cache = HttpCache(directory)
+    cache.store("https://a.com/MLB-1-x", "a" * 1000)
+    cache.store("https://a.com/MLB-2-x", "b" * 1000)
+    # Só uma leitura, sem outra escrita depois: o acesso é gravado no close
+    assert cache.lookup("https://a.com/MLB-1-x") is not None
+    cache.close()
+
+    cache = HttpCache(directory, max_bytes=2000)
+    cache.store("https://a.com/MLB-3-x", "c" * 1000)
+    assert cache.lookup("https://a.com/MLB-1-x") is not None
+    assert cache.lookup("https://a.com/MLB-2-x") is None
+    cache.close()
@@ -0,0 +1,72 @@
+import json
+
+import pytest
+import requests
+
+import instrumentation
+from conftest import fast_controller
+from http_cache import fetch_cached
+from instrumentation import RunStats, urls_path
+
+
+def read_jsonl(path):
+    with open(path, encoding="utf-8") as f:
+        return [json.loads(line) for line in f]
+
+
+def test_url_records_are_streamed_once_complete(tmp_path):
+    stats_file = str(tmp_path / "run_stats.json")
+    stats = RunStats(urls_path(stats_file))
+    stats.record_fetch("https://a.com/1", 200, size=10, fetch=0.1)
+    stats.record_fetch("https://a.com/2", None, retries=2, fetch=0.2)
+    stats.record_parse("https://a.com/1", 0.01, 0.002)
+    stats.record_parse(None, 0.01, 0.002)
+    stats.flush()
+
+    records = read_jsonl(stats.urls_path)
+    assert [record["url"] for record in records] == ["https://a.com/2", "https://a.com/1"]
+    assert records[1]["status"] == 200 and records[1]["parse"] == 0.01
+
+    stats.write(stats_file)
+    stats.close()
+    with open(stats_file, encoding="utf-8") as f:
+        summary = json.load(f)
+    assert summary["per_url_file"] == str(tmp_path / "run_stats.urls.jsonl")
+    assert stats.url_count == 2
+
+
+def test_pending_records_are_bounded(monkeypatch):
+    monkeypatch.setattr(instrumentation, "MAX_PENDING", 3)
+    stats = RunStats(relay=True)
+    for i in range(10):
+        stats.record_fetch(f"https://a.com/{i}", 200)
+    # Acima do limite, os mais antigos saem sem esperar o parsing
+    assert [record["url"] for record in stats.drain()["urls"]] == [f"https://a.com/{i}" for i in range(7)]
+
+
+def test_worker_records_are_relayed_to_the_main_process(tmp_path):
+    main = RunStats(str(tmp_path / "urls.jsonl"))
+    worker = RunStats(relay=True)
+    main.record_fetch("https://a.com/1", 200, fetch=0.1)
+    worker.record_parse("https://a.com/1", 0.01, 0.002)
+
+    main.merge(worker.drain())
+    assert worker.drain()["urls"] == []
+    main.close()
+    records = read_jsonl(tmp_path / "urls.jsonl")
+    assert records == [{"url": "https://a.com/1", "status": 200, "retries": 0, "bytes": 0,
+                        "source": "network", "fetch": 0.1, "parse": 0.01, "extract": 0.002}]
+    assert main.histograms["parse"].count == 1
+
+
+def test_failed_fetches_record_the_retries_actually_made(tmp_path, refused_url):
+    stats = RunStats(urls_path(str(tmp_path / "run_stats.json")))
+    session = requests.Session()
+    for url in ("N/A", refused_url):
+        with pytest.raises(requests.exceptions.RequestException):
+            fetch_cached(None, fast_controller(max_retries=2), session, url, stats=stats)
+    stats.flush()
+    stats.close()
+
+    records = read_jsonl(stats.urls_path)
+    assert [(record["url"], record["retries"]) for record in records] == [("N/A", 0), (refused_url, 2)]
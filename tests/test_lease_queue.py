@@ -0,0 +1,113 @@
+import sqlite3
+import time
+
+from conftest import fast_controller, read_rows
+from lease_queue import LeaseQueue
+from sharded import ShardWorker, merge_shards
+
+
+def test_lease_complete_and_requeue(tmp_path):
+    with LeaseQueue(str(tmp_path / "queue.sqlite"), max_attempts=2) as queue:
+        assert queue.enqueue(["a", "b", "c"]) == 3
+        assert queue.enqueue(["a"]) == 0
+
+        tasks = queue.lease("w1", size=2)
+        assert [(url, attempt) for _, url, attempt in tasks] == [("a", 1), ("b", 1)]
+        # Reservados não são entregues a outro worker
+        assert [url for _, url, _ in queue.lease("w2", size=5)] == ["c"]
+
+        queue.complete("w1", done=[tasks[0][0]], failed=[tasks[1][0]])
+        assert queue.counts() == {"done": 1, "pending": 1, "leased": 1}
+        assert [(url, attempt) for _, url, attempt in queue.lease("w1")] == [("b", 2)]
+
+
+def test_expired_lease_returns_to_queue_until_max_attempts(tmp_path):
+    with LeaseQueue(str(tmp_path / "queue.sqlite"), max_attempts=2) as queue:
+        queue.enqueue(["a"])
+        (task_id, _, _), = queue.lease("morto", lease_seconds=-1)
+        assert queue.renew("morto") == 0
+
+        # Reserva vencida: outro worker pega o link, e o resultado atrasado do primeiro é ignorado
+        assert queue.lease("vivo", lease_seconds=-1) == [(task_id, "a", 2)]
+        queue.complete("morto", done=[task_id])
+        assert queue.counts() == {"leased": 1}
+
+        # Segunda reserva vencida esgota as tentativas
+        assert queue.lease("outro") == []
+        assert queue.counts() == {"failed": 1}
+
+
+def test_failed_on_last_attempt_is_not_requeued(tmp_path):
+    with LeaseQueue(str(tmp_path / "queue.sqlite"), max_attempts=1) as queue:
+        queue.enqueue(["a"])
+        (task_id, _, _), = queue.lease("w1")
+        queue.complete("w1", failed=[task_id])
+        assert queue.counts() == {"failed": 1}
+        assert queue.lease("w1") == []
+
+
+def test_workers_and_merge_recover_a_dead_worker(server, tmp_path, refused_url):
+    urls = server.product_urls(6)
+    shard_dir = str(tmp_path / "shards")
+    with LeaseQueue(str(tmp_path / "queue.sqlite"), max_attempts=2) as queue:
+        queue.enqueue(urls + [refused_url])
+        # Um worker que reservou um lote e morreu sem concluir
+        queue.lease("morto", size=3, lease_seconds=-1)
+
+        worker = ShardWorker(queue, {"controller": fast_controller()}, shard_dir=shard_dir,
+                             batch_size=4, worker="w1")
+        assert worker.run() == len(urls)
+        assert queue.counts() == {"done": len(urls), "failed": 1}
+
+    output = str(tmp_path / "merged.csv")
+    assert merge_shards(shard_dir, output) == len(urls) + 1
+    rows = {row["url"]: row for row in read_rows(output)}
+    assert all(rows[url]["title"] != "N/A" for url in urls)
+    assert rows[refused_url]["title"] == "N/A"
+
+
+def test_extraction_error_fails_only_that_link(server, tmp_path):
+    urls = server.product_urls(4)
+    with LeaseQueue(str(tmp_path / "queue.sqlite"), max_attempts=2) as queue:
+        queue.enqueue(urls)
+        worker = ShardWorker(queue, {"controller": fast_controller()}, shard_dir=str(tmp_path / "shards"),
+                             batch_size=4, worker="w1")
+        parse_link = worker.scraper.parse_link
+
+        def broken_parse(html, url):
+            if url == urls[0]:
+                raise ValueError("layout novo")
+            return parse_link(html, url)
+
+        worker.scraper.parse_link = broken_parse
+        assert worker.run() == 3
+        # Tentado de novo no lote seguinte e, na última tentativa, registrado como falha
+        assert worker.failed == 2
+        assert queue.counts() == {"done": 3, "failed": 1}
+
+    rows = read_rows(worker.scraper.output_file)
+    assert [row["title"] for row in rows if row["url"] == urls[0]] == ["N/A"]
+
+
+def test_heartbeat_failure_stops_the_worker(server, tmp_path):
+    urls = server.product_urls(6)
+    with LeaseQueue(str(tmp_path / "queue.sqlite")) as queue:
+        queue.enqueue(urls)
+        worker = ShardWorker(queue, {"controller": fast_controller()}, shard_dir=str(tmp_path / "shards"),
+                             batch_size=1, lease_seconds=0.3, worker="w1")
+
+        def broken_renew(worker, lease_seconds):
+            raise sqlite3.OperationalError("database is locked")
+
+        parse_link = worker.scraper.parse_link
+
+        def slow_parse(html, url):
+            time.sleep(0.2)
+            return parse_link(html, url)
+
+        queue.renew = broken_renew
+        worker.scraper.parse_link = slow_parse
+        done = worker.run()
+        assert 1 <= done < len(urls)
+        # O lote em andamento ainda é concluído
+        assert queue.counts()["done"] == done
@@ -0,0 +1,106 @@
+import threading
+
+import pytest
+
+from canonical import Deduplicator
+from checkpoint import CheckpointJournal
+from conftest import fast_controller, read_rows, write_links
+from link_scraper import LINK_FIELDS, LinkScraper
+
+
+def scraper(input_file, output_file, **kwargs):
+    return LinkScraper(input_file, output_file, controller=fast_controller(), **kwargs)
+
+
+@pytest.mark.parametrize("mode", ["threads", "async", "pipeline"])
+def test_modes_extract_every_link(server, tmp_path, mode):
+    links = server.product_urls(4)
+    link_scraper = scraper(write_links(tmp_path / "links.csv", links), str(tmp_path / "out.csv"))
+    link_scraper.read_csv()
+    if mode == "async":
+        link_scraper.scrape_links_async(concurrency=4)
+    elif mode == "pipeline":
+        link_scraper.scrape_links_pipeline(parse_workers=1)
+    else:
+        link_scraper.scrape_links()
+    link_scraper.export_to_csv()
+
+    rows = read_rows(tmp_path / "out.csv")
+    assert list(rows[0]) == LINK_FIELDS
+    assert sorted(row["url"] for row in rows) == sorted(links)
+    assert all(row["title"] != "N/A" and row["price_current"].startswith("R$") for row in rows)
+
+
+def test_async_mode_parses_off_the_event_loop(server, tmp_path):
+    link_scraper = scraper(write_links(tmp_path / "links.csv", server.product_urls(3)), None)
+    link_scraper.read_csv()
+    parse_link = link_scraper.parse_link
+    threads = []
+
+    def recording_parse(html, url):
+        threads.append(threading.current_thread())
+        return parse_link(html, url)
+
+    link_scraper.parse_link = recording_parse
+    link_scraper.scrape_links_async(concurrency=3)
+    assert len(threads) == 3
+    assert threading.main_thread() not in threads
+    assert all(row["title"] != "N/A" for row in link_scraper.data)
+
+
+def test_invalid_link_becomes_failed_row_without_retries(tmp_path):
+    link_scraper = scraper(None, None)
+    row = link_scraper.scrape_link("N/A")
+    assert row["title"] == "N/A"
+    assert link_scraper.controller.retries == 0
+
+
+def test_stream_resume_does_not_duplicate_failed_links(server, tmp_path, refused_url):
+    links = write_links(tmp_path / "links.csv", server.product_urls(3) + [refused_url])
+    output = str(tmp_path / "out.csv")
+    for _ in range(2):
+        journal = CheckpointJournal(str(tmp_path / "journal.jsonl"))
+        link_scraper = scraper(links, output, journal=journal, stream=True)
+        link_scraper.read_csv()
+        link_scraper.scrape_links()
+        link_scraper.export_to_csv()
+        journal.close()
+
+        rows = read_rows(output)
+        assert len(rows) == 4
+        assert [row["url"] for row in rows].count(refused_url) == 1
+
+
+def test_seen_index_survives_an_interrupted_run(server, tmp_path, refused_url):
+    links = write_links(tmp_path / "links.csv", server.product_urls(3) + [refused_url])
+    seen = str(tmp_path / "seen.txt")
+
+    # Execução interrompida logo depois de ler o CSV
+    dedup = Deduplicator(seen)
+    scraper(links, None, dedup=dedup).read_csv()
+    dedup.close()
+
+    dedup = Deduplicator(seen)
+    link_scraper = scraper(links, str(tmp_path / "out.csv"), dedup=dedup)
+    link_scraper.read_csv()
+    assert len(link_scraper.links) == 4
+    link_scraper.scrape_links()
+    dedup.close()
+
+    # Só o link que falhou continua pendente
+    dedup = Deduplicator(seen)
+    link_scraper = scraper(links, None, dedup=dedup)
+    link_scraper.read_csv()
+    assert link_scraper.links == [refused_url]
+    dedup.close()
+
+
+def test_numeric_prices_export_cents(server, tmp_path):
+    link_scraper = scraper(write_links(tmp_path / "links.csv", server.product_urls(2)), str(tmp_path / "out.csv"),
+                           numeric_prices=True, stream=True)
+    link_scraper.read_csv()
+    link_scraper.scrape_links()
+    link_scraper.export_to_csv()
+
+    rows = read_rows(tmp_path / "out.csv")
+    assert [(row["price_previous_cents"], row["price_current_cents"]) for row in rows] == [("159990", "129550")] * 2
@@ -0,0 +1,46 @@
+import pickle
+import re
+
+import pytest
+
+from listing import ROW_DATE, ProductListing, SearchListing, batch_timestamp
+
+
+def search_listing(**overrides):
+    values = dict(mlb="MLB1", title="Placa", seller="Loja", ad_type="Clássico", price_previous="R$ 2.000,00",
+                  price_current="R$ 1.800,00", discount="10% OFF", installments="10x", date="01/05/2024 10:00:00",
+                  post_link="https://a.com/MLB-1-x", image_link="N/A")
+    values.update(overrides)
+    return SearchListing(**values)
+
+
+def test_rows_behave_like_dicts_in_column_order():
+    row = search_listing()
+    assert list(row)[-2:] == ["post link", "image link"]
+    assert row["post link"] == "https://a.com/MLB-1-x"
+    assert dict(row)["image link"] == "N/A"
+    assert row.get("url") is None
+    assert len(row) == len(SearchListing.COLUMNS)
+
+
+def test_only_existing_columns_can_be_set():
+    row = search_listing()
+    row["price_current"] = 1800.0
+    assert row["price_current"] == 1800.0
+    with pytest.raises(KeyError):
+        row["query"] = "placa"
+    with pytest.raises(AttributeError):
+        row.extra = 1
+
+
+def test_rows_survive_pickling_with_interned_text():
+    row = ProductListing("Placa", "".join(["Loja ", "Oficial"]), "+100 vendas", "Clássico", None, 1800.0, "N/A", "N/A",
+                         "12 disponíveis", "https://a.com/MLB-1-x", "01/05/2024 10:00:00")
+    copy = pickle.loads(pickle.dumps(row))
+    assert dict(copy) == dict(row)
+    assert copy["seller"] is row["seller"]
+
+
+def test_batch_timestamp_uses_the_row_date_format():
+    assert re.fullmatch(r"\d\d/\d\d/\d{4} \d\d:\d\d:\d\d", batch_timestamp())
+    assert ROW_DATE == "%d/%m/%Y %H:%M:%S"
@@ -0,0 +1,41 @@
+import pytest
+
+from pagination import SearchUnavailable, iter_search_pages, page_urls
+
+
+def run(fetch, **kwargs):
+    # A "página" é o próprio HTML; a primeira traz o total (ou None)
+    return [(i, page) for i, url, page in iter_search_pages(fetch, "https://x.com/", "busca", window=2,
+                                                             parse=lambda html: html, **kwargs)]
+
+
+def test_failed_first_page_raises():
+    with pytest.raises(SearchUnavailable) as error:
+        run(lambda url: None)
+    assert error.value.url == page_urls("https://x.com/", "busca")[0]
+
+
+def test_counted_search_keeps_page_order_and_skips_failures():
+    urls = page_urls("https://x.com/", "busca")
+
+    def fetch(url):
+        index = urls.index(url)
+        if index == 2:
+            return None
+        return (120 if index == 0 else None, index)
+
+    assert run(fetch) == [(1, 0), (2, 1)]  # 120 resultados = 3 páginas, a terceira falhou
+
+
+def test_uncounted_walk_stops_after_consecutive_failures():
+    urls = page_urls("https://x.com/", "busca")
+    fetched = []
+
+    def fetch(url):
+        index = urls.index(url)
+        fetched.append(index)
+        # Páginas 1 e 2 falham, a 3 volta (zera a sequência) e dali em diante tudo falha
+        return (None, index) if index in (0, 3) else None
+
+    assert run(fetch, max_failures=3) == [(1, 0), (4, 3)]
+    assert fetched == [0, 1, 2, 3, 4, 5, 6]
@@ -0,0 +1,39 @@
+import glob
+import os
+
+import pytest
+
+from bench_parsers import FIXTURES_DIR, extract
+from parsers import DEFAULT_PARSER, available_parsers
+
+FIXTURES = sorted(glob.glob(os.path.join(FIXTURES_DIR, "*.html")))
+PRODUCT = os.path.join(FIXTURES_DIR, "product_rtx3050.html")
+SEARCH = os.path.join(FIXTURES_DIR, "search_rtx3050.html")
+
+
+def read(path):
+    with open(path, encoding="utf-8") as f:
+        return f.read()
+
+
+@pytest.mark.parametrize("numeric_prices", [False, True], ids=["texto", "centavos"])
+@pytest.mark.parametrize("path", FIXTURES, ids=os.path.basename)
+@pytest.mark.parametrize("parser", [name for name in available_parsers() if name != DEFAULT_PARSER] + ["state"])
+def test_backends_and_state_extract_the_same_rows(path, parser, numeric_prices):
+    html = read(path)
+    expected = extract(path, html, DEFAULT_PARSER, numeric_prices)
+    assert expected and expected[0]["title"] != "N/A"
+    assert extract(path, html, parser, numeric_prices) == expected
+
+
+@pytest.mark.parametrize("parser", available_parsers() + ["state"])
+def test_cents_are_read_apart_from_the_fraction(parser):
+    html = read(PRODUCT)
+    row, = extract(PRODUCT, html, parser)
+    assert (row["price_previous"], row["price_current"]) == ("R$ 1.599,90", "R$ 1.295,50")
+    row, = extract(PRODUCT, html, parser, numeric_prices=True)
+    assert (row["price_previous_cents"], row["price_current_cents"]) == (159990, 129550)
+
+    rows = extract(SEARCH, read(SEARCH), parser, numeric_prices=True)
+    assert {row["price_current_cents"] % 100 for row in rows} == {0, 50}
+    assert {row["price_previous_cents"] % 100 for row in rows} == {0, 50, 90}
@@ -0,0 +1,60 @@
+import threading
+import time
+
+from pipeline import run_pipeline
+
+
+def run_in_thread(**kwargs):
+    """Roda o pipeline numa thread; devolve (terminou, exceção lançada)."""
+    outcome = {}
+
+    def target():
+        try:
+            run_pipeline(**kwargs)
+        except Exception as e:
+            outcome["error"] = e
+
+    thread = threading.Thread(target=target, daemon=True)
+    thread.start()
+    thread.join(timeout=10)
+    return not thread.is_alive(), outcome.get("error")
+
+
+def test_every_item_is_handled():
+    handled = []
+    finished, error = run_in_thread(items=range(40), fetch=lambda i: i * 2,
+                                    handle=lambda i, page: handled.append((i, page)),
+                                    fetch_workers=4, handle_workers=2, queue_size=2)
+    assert finished and error is None
+    assert sorted(handled) == [(i, i * 2) for i in range(40)]
+
+
+def test_failing_fetch_cancels_without_deadlock():
+    fetched = []
+
+    def fetch(i):
+        fetched.append(i)
+        if i == 5:
+            raise ValueError("falhou")
+        return i
+
+    # Processamento lento e fila de uma vaga: os outros downloads estão presos no put
+    finished, error = run_in_thread(items=range(200), fetch=fetch, handle=lambda i, page: time.sleep(0.01),
+                                    fetch_workers=4, handle_workers=1, queue_size=1)
+    assert finished
+    assert isinstance(error, ValueError)
+    # Os demais downloads param no próximo item em vez de percorrer a lista toda
+    assert len(fetched) < 20
+
+
+def test_handler_errors_do_not_stop_the_stage(capsys):
+    handled = []
+
+    def handle(i, page):
+        if i == 0:
+            raise ValueError("página ruim")
+        handled.append(i)
+
+    run_pipeline(range(5), lambda i: i, handle, fetch_workers=2, handle_workers=1, queue_size=1)
+    assert sorted(handled) == [1, 2, 3, 4]
+    assert "Erro ao processar 0" in capsys.readouterr().out
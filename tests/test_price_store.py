@@ -0,0 +1,22 @@
+from price_store import PriceStore
+
+
+def row(price, stock="10", date="01/05/2024 10:00:00"):
+    return {"url": "https://produto.mercadolivre.com.br/MLB-1234567890-placa-_JM", "title": "Placa",
+            "price_current": price, "price_previous": "R$ 2.000", "discount": "10% OFF",
+            "qtd_available": stock, "seller": "loja", "scraped_at": date}
+
+
+def test_only_changes_become_observations(tmp_path):
+    with PriceStore(str(tmp_path / "prices.sqlite"), batch_size=2) as store:
+        store.add(row("R$ 1.800", date="01/05/2024 10:00:00"))
+        store.add(row("R$ 1.800", date="02/05/2024 10:00:00"))
+        store.add(row("R$ 1.700", stock=None, date="03/05/2024 10:00:00"))
+        store.flush()
+
+        history = store.history("MLB-1234567890")
+        assert [(obs["scraped_at"][:10], obs["price_cents"]) for obs in history] == [
+            ("2024-05-01", 180000), ("2024-05-03", 170000)]
+        # Estoque ausente mantém o último valor conhecido
+        assert history[-1]["qtd_available"] == "10"
+        assert (store.rows_seen, store.observations) == (3, 2)
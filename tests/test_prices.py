@@ -0,0 +1,69 @@
+import pytest
+
+from conftest import read_rows
+from listing import ProductListing
+from prices import (NUMERIC_COLUMNS, format_brl, format_prices, normalize_prices, numeric_fieldnames, parse_cents,
+                    parse_percent)
+from row_writer import RowWriter
+
+
+def listing(price_previous, price_current, discount="10% OFF"):
+    return ProductListing("Placa", "Loja", "N/A", "Classic", price_previous, price_current, discount, "N/A",
+                          "N/A", "https://a.com/MLB-1-x", "01/05/2024 10:00:00")
+
+
+def test_parse_cents():
+    assert parse_cents(["R$ 1.295,50", "R$1.295", "R$ 0,99", "12,5"]) == [129550, 129500, 99, 1250]
+    # Números do JSON embutido e do HTML lido por extractors.money_amount
+    assert parse_cents([1295.5, 1300, 0.1 + 0.2]) == [129550, 130000, 30]
+    assert parse_cents([None, "", "N/A", "NA"]) == [None, None, None, None]
+
+
+def test_parse_percent():
+    assert parse_percent(["15% OFF", "0%", "  7 %", None, "N/A", 12]) == [15, 0, 7, None, None, None]
+
+
+def test_normalize_prices_swaps_text_for_numeric_columns():
+    rows = normalize_prices([listing(1599.9, 1295.5), {"price_previous": "N/A", "price_current": "R$ 10,00"}])
+    assert rows[0]["price_previous_cents"] == 159990
+    assert rows[0]["price_current_cents"] == 129550
+    assert rows[0]["discount_pct"] == 10
+    assert "price_current" not in rows[0] and rows[0]["title"] == "Placa"
+    assert (rows[1]["price_previous_cents"], rows[1]["price_current_cents"], rows[1]["discount_pct"]) == (None, 1000,
+                                                                                                          None)
+    assert numeric_fieldnames(["title", "price_current", "discount"]) == ["title", "price_current_cents",
+                                                                          "discount_pct"]
+
+
+def test_format_prices_is_presentation_only():
+    row = listing(None, 1295.5)
+    formatted, = format_prices([row])
+    assert (formatted["price_previous"], formatted["price_current"]) == ("N/A", "R$ 1.295,50")
+    assert row["price_current"] == 1295.5
+    # Texto já formatado passa igual
+    assert format_prices([formatted]) == [formatted]
+    assert format_brl(123456789) == "R$ 1.234.567,89"
+    assert format_brl(None) == ""
+
+
+def test_numeric_csv_and_parquet_columns(tmp_path):
+    pq = pytest.importorskip("pyarrow.parquet")
+    fields = numeric_fieldnames(ProductListing.COLUMNS)
+    with RowWriter(str(tmp_path / "out.csv"), fields, batch_size=1, parquet_path=str(tmp_path / "out.parquet"),
+                   transform=normalize_prices, int_fields=NUMERIC_COLUMNS.values()) as writer:
+        writer.write_many([listing(1599.9, 1295.5), listing("N/A", "N/A", "N/A")])
+
+    rows = read_rows(tmp_path / "out.csv")
+    assert list(rows[0]) == fields
+    assert [(row["price_current_cents"], row["discount_pct"]) for row in rows] == [("129550", "10"), ("", "")]
+    table = pq.read_table(tmp_path / "out.parquet")
+    assert str(table.schema.field("price_current_cents").type) == "int64"
+    assert table.column("price_previous_cents").to_pylist() == [159990, None]
+
+
+def test_text_csv_formats_prices_on_write(tmp_path):
+    with RowWriter(str(tmp_path / "out.csv"), ProductListing.COLUMNS, transform=format_prices) as writer:
+        writer.write(listing(1599.9, 1295.5))
+    row, = read_rows(tmp_path / "out.csv")
+    assert (row["price_previous"], row["price_current"], row["discount"]) == ("R$ 1.599,90", "R$ 1.295,50",
+                                                                              "10% OFF")
@@ -0,0 +1,82 @@
+import time
+
+import pytest
+import requests
+
+from conftest import fast_controller
+from stand_in_server import StandInServer
+from throttle import parse_retry_after
+
+
+def test_invalid_url_fails_without_retry_or_backoff():
+    controller = fast_controller(max_retries=4, base_delay=1.0)
+    start = time.monotonic()
+    with pytest.raises(requests.exceptions.MissingSchema):
+        controller.get(requests.Session(), "N/A")
+    assert time.monotonic() - start < 0.5
+    assert controller.requests == 1
+    assert controller.retries == 0
+    assert controller.failed == 1
+    assert controller.limit == 2
+
+
+def test_connection_refused_is_retried_and_shrinks_window(refused_url):
+    controller = fast_controller(max_retries=2, initial_limit=8, latency_target=0.0)
+    with pytest.raises(requests.exceptions.ConnectionError):
+        controller.get(requests.Session(), refused_url)
+    assert controller.requests == 3
+    assert controller.retries == 2
+    assert controller.failed == 1
+    assert controller.limit < 8
+
+
+def test_429_is_retried_until_it_recovers():
+    server = StandInServer(rate_429=0.5, retry_after=0, seed=3).start()
+    try:
+        controller = fast_controller(max_retries=8)
+        session = requests.Session()
+        for url in server.product_urls(10):
+            assert controller.get(session, url).status_code == 200
+        assert server.stats["429"] > 0
+        assert controller.recovered > 0
+        assert controller.failed == 0
+    finally:
+        server.shutdown()
+        server.server_close()
+
+
+def test_parse_retry_after():
+    assert parse_retry_after("7") == 7.0
+    assert parse_retry_after(None) is None
+    assert parse_retry_after("Wed, 21 Oct 2015 07:28:00 GMT") == 0.0
+
+
+class _StatusSession:
+    def __init__(self, status):
+        self.status = status
+
+    def get(self, url, **kwargs):
+        response = requests.Response()
+        response.status_code = self.status
+        response.url = url
+        return response
+
+
+@pytest.mark.parametrize("status, grows", [(200, True), (304, True), (403, False), (404, False)])
+def test_only_2xx_and_304_grow_the_window(status, grows):
+    controller = fast_controller(initial_limit=2)
+    for _ in range(5):
+        assert controller.get(_StatusSession(status), "http://example.invalid/").status_code == status
+    assert (controller.limit > 2) is grows
+    assert controller.requests == 5
+    assert controller.failed == 0
+
+
+def test_errors_carry_the_retries_made():
+    controller = fast_controller(max_retries=2)
+    with pytest.raises(requests.exceptions.HTTPError) as error:
+        controller.get(_StatusSession(503), "http://example.invalid/")
+    assert error.value.retries == 2
+    with pytest.raises(requests.exceptions.MissingSchema) as error:
+        controller.get(requests.Session(), "N/A")
+    assert error.value.retries == 0
@@ -0,0 +1,52 @@
+import pytest
+
+from watchlist import PAUSED, PRIOR_RATE, Watchlist, change_rate
+
+DAY = 86400
+
+
+def test_change_rate_estimator():
+    assert change_rate(0, 0, 0) == PRIOR_RATE
+    assert change_rate(10, 0, 10) == 0.0
+    # Mudança em toda checagem: a taxa passa de uma por dia (há mudanças não vistas)
+    assert change_rate(10, 10, 10) > 1.0
+    assert change_rate(10, 2, 10) < change_rate(10, 5, 10) < change_rate(10, 10, 10)
+    # Mesmas mudanças em mais tempo: taxa menor
+    assert change_rate(10, 5, 20) == pytest.approx(change_rate(10, 5, 10) / 2)
+
+
+def row(key, price, stock="12 disponíveis"):
+    return {"url": f"https://produto.mercadolivre.com.br/MLB-{key}-x-_JM", "price_current": price,
+            "qtd_available": stock}
+
+
+def test_plan_prefers_new_and_volatile_items(tmp_path):
+    start = 1_700_000_000
+    with Watchlist(str(tmp_path / "watch.sqlite")) as watchlist:
+        for day in range(6):
+            now = start + day * DAY
+            watchlist.record(row(1, f"R$ {100 + day}"), now=now)  # muda todo dia
+            watchlist.record(row(2, "R$ 100"), now=now)  # nunca muda
+            watchlist.record(row(3, f"R$ {100 + day}", PAUSED), now=now)  # muda, mas está pausado
+        assert watchlist.changed == 10
+
+        links = [row(key, None)["url"] for key in (2, 3, 1, 4)]
+        now = start + 6 * DAY
+        assert watchlist.plan(links, now=now) == [links[3], links[2], links[1], links[0]]
+        assert watchlist.plan(links, budget=2, now=now) == [links[3], links[2]]
+        assert (watchlist.planned, watchlist.skipped) == (2, 2)
+        # Item estável não entra com probabilidade mínima
+        assert links[0] not in watchlist.plan(links, min_probability=0.01, now=now)
+        # Sem consulta há mais de max_age_days, até o estável volta
+        assert sorted(watchlist.plan(links, min_probability=0.99, now=start + 20 * DAY)) == sorted(links)
+
+
+def test_history_is_persisted(tmp_path):
+    path = str(tmp_path / "watch.sqlite")
+    with Watchlist(path) as watchlist:
+        watchlist.record(row(1, "R$ 100"), now=1_700_000_000)
+        watchlist.record(row(1, "R$ 90"), now=1_700_000_000 + DAY)
+    with Watchlist(path) as watchlist:
+        (probability, rate, entry), = watchlist.top()
+        assert (entry["fetches"], entry["changes"]) == (2, 1)
+        assert rate > 0
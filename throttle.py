@@ -0,0 +1,229 @@
+import asyncio
+import random
+import threading
+import time
+from contextlib import asynccontextmanager, contextmanager
+from datetime import datetime, timezone
+from email.utils import parsedate_to_datetime
+
+import requests
+
+# Status que indicam sobrecarga/bloqueio temporário e merecem nova tentativa
+RETRY_STATUS = {429, 500, 502, 503, 504}
+# Erros de rede passageiros, tratados como congestionamento
+RETRY_ERRORS = (requests.exceptions.Timeout, requests.exceptions.ConnectionError)
+
+
+def is_transient(error):
+    """Timeout ou falha de conexão; erros de URL, SSL ou redirecionamento não melhoram com nova tentativa."""
+    return isinstance(error, RETRY_ERRORS) and not isinstance(error, requests.exceptions.SSLError)
+
+
+def is_success(status):
+    """2xx ou 304 (revalidação): só essas respostas indicam que o servidor aguenta a janela atual."""
+    return 200 <= status < 300 or status == 304
+
+
+def parse_retry_after(value):
+    """Converte o cabeçalho Retry-After (segundos ou data HTTP) em segundos de espera."""
+    if not value:
+        return None
+    value = value.strip()
+    if value.isdigit():
+        return float(value)
+    try:
+        retry_at = parsedate_to_datetime(value)
+    except (TypeError, ValueError):
+        return None
+    if retry_at.tzinfo is None:
+        retry_at = retry_at.replace(tzinfo=timezone.utc)
+    return max(0.0, (retry_at - datetime.now(timezone.utc)).total_seconds())
+
+
+class AdaptiveController:
+    """Controla a concurrência (AIMD) e as retentativas das requisições.
+
+    A janela de requisições simultâneas cresce de forma aditiva enquanto as
+    respostas chegam rápidas e sem erro, e cai pela metade quando aparecem
+    429/5xx, timeouts ou latência acima do alvo. Requisições com falha
+    temporária são repetidas com backoff exponencial e jitter, respeitando o
+    cabeçalho Retry-After. O mesmo controlador serve para código síncrono
+    (threads + requests) e assíncrono (asyncio + aiohttp).
+    """
+
+    def __init__(self, initial_limit=2, min_limit=1, max_limit=16, max_retries=4,
+                 base_delay=1.0, max_delay=60.0, latency_target=3.0):
+        self.limit = float(initial_limit)
+        self.min_limit = min_limit
+        self.max_limit = max_limit
+        self.max_retries = max_retries
+        self.base_delay = base_delay
+        self.max_delay = max_delay
+        self.latency_target = latency_target
+
+        self.in_flight = 0
+        self.cooldown_until = 0.0
+        self._last_decrease = 0.0
+        self._lock = threading.Lock()
+        self._slot_freed = threading.Condition(self._lock)
+        self._async_slot_freed = None
+
+        # Estatísticas da execução
+        self.requests = 0
+        self.retries = 0
+        self.recovered = 0
+        self.failed = 0
+
+    # --- AIMD ---------------------------------------------------------------
+
+    def _has_slot(self):
+        return self.in_flight < int(self.limit)
+
+    def count(self, name, n=1):
+        """Soma `n` a uma estatística (requests, retries, recovered, failed) sob a trava."""
+        with self._lock:
+            setattr(self, name, getattr(self, name) + n)
+
+    def on_response(self, status, latency):
+        """Ajusta a janela para uma resposta fora de RETRY_STATUS.
+
+        2xx/304 contam como sucesso; os demais (403, 404...) não dizem nada
+        sobre a carga do servidor e deixam a janela como está.
+        """
+        if is_success(status):
+            self.on_success(latency)
+
+    def on_success(self, latency):
+        """Registra uma resposta bem-sucedida e ajusta a janela."""
+        with self._lock:
+            if latency > self.latency_target:
+                self._decrease()
+            else:
+                self.limit = min(self.max_limit, self.limit + 1.0 / self.limit)
+
+    def on_congestion(self, retry_after=None):
+        """Registra 429/5xx/timeout: reduz a janela e, se pedido, pausa as requisições."""
+        with self._lock:
+            self._decrease()
+            if retry_after:
+                self.cooldown_until = max(self.cooldown_until, time.monotonic() + retry_after)
+
+    def _decrease(self):
+        # No máximo uma redução por intervalo, para uma rajada de erros não zerar a janela
+        now = time.monotonic()
+        if now - self._last_decrease >= self.latency_target:
+            self.limit = max(self.min_limit, self.limit / 2)
+            self._last_decrease = now
+
+    def backoff(self, attempt, retry_after=None):
+        """Tempo de espera antes da tentativa seguinte (backoff exponencial com jitter)."""
+        delay = random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))
+        if retry_after:
+            delay = max(delay, min(retry_after, self.max_delay))
+        return delay
+
+    def _cooldown_left(self):
+        return self.cooldown_until - time.monotonic()
+
+    # --- Vagas síncronas ----------------------------------------------------
+
+    @contextmanager
+    def slot(self):
+        """Ocupa uma vaga da janela (bloqueia enquanto a janela estiver cheia)."""
+        with self._slot_freed:
+            while not self._has_slot():
+                self._slot_freed.wait()
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            with self._slot_freed:
+                self.in_flight -= 1
+                self._slot_freed.notify_all()
+
+    def get(self, session, url, **kwargs):
+        """Faz um GET com retentativas. Lança RequestException se todas falharem.
+
+        Só timeouts, falhas de conexão e os status de RETRY_STATUS são repetidos
+        (e reduzem a janela); os demais erros são lançados na hora. Apenas
+        2xx/304 aumentam a janela. A resposta devolvida traz `retries`
+        (retentativas feitas) e `duration` (segundos da última tentativa, corpo
+        incluído); a exceção lançada também traz `retries`.
+        """
+        kwargs.setdefault("timeout", 10)
+        for attempt in range(self.max_retries + 1):
+            cooldown = self._cooldown_left()
+            if cooldown > 0:
+                time.sleep(cooldown)
+
+            retry_after = None
+            with self.slot():
+                self.count("requests")
+                start = time.monotonic()
+                try:
+                    response = session.get(url, **kwargs)
+                except requests.exceptions.RequestException as e:
+                    e.retries = attempt
+                    if not is_transient(e):
+                        # Erro definitivo: nem retentativa nem redução da janela
+                        self.count("failed")
+                        raise
+                    error = e
+                else:
+                    error = None
+                    if response.status_code not in RETRY_STATUS:
+                        response.duration = time.monotonic() - start
+                        response.retries = attempt
+                        self.on_response(response.status_code, response.duration)
+                        if attempt:
+                            self.count("recovered")
+                        return response
+                    retry_after = parse_retry_after(response.headers.get("Retry-After"))
+
+            self.on_congestion(retry_after)
+            if attempt == self.max_retries:
+                break
+            self.count("retries")
+            time.sleep(self.backoff(attempt, retry_after))
+
+        self.count("failed")
+        if error is not None:
+            raise error
+        response.retries = attempt
+        try:
+            response.raise_for_status()
+        except requests.exceptions.HTTPError as e:
+            e.retries = attempt
+            raise
+        return response
+
+    # --- Vagas assíncronas --------------------------------------------------
+
+    @asynccontextmanager
+    async def async_slot(self):
+        """Versão asyncio de `slot`."""
+        if self._async_slot_freed is None:
+            self._async_slot_freed = asyncio.Condition()
+        async with self._async_slot_freed:
+            await self._async_slot_freed.wait_for(self._has_slot)
+            self.in_flight += 1
+        try:
+            yield
+        finally:
+            async with self._async_slot_freed:
+                self.in_flight -= 1
+                self._async_slot_freed.notify_all()
+
+    async def wait_cooldown(self):
+        """Aguarda o fim de uma pausa pedida via Retry-After."""
+        cooldown = self._cooldown_left()
+        if cooldown > 0:
+            await asyncio.sleep(cooldown)
+
+    # --- Relatório ----------------------------------------------------------
+
+    def report(self):
+        """Resumo das requisições feitas com este controlador."""
+        return (f"Requisições: {self.requests} | Retentativas: {self.retries} | "
+                f"Recuperadas por retentativa: {self.recovered} | Falhas: {self.failed} | "
+                f"Concorrência final: {int(self.limit)}")
@@ -0,0 +1,225 @@
+import argparse
+import json
+import math
+import os
+import sqlite3
+import threading
+import time
+from price_store import item_key
+from prices import parse_cents, parse_percent
+
+DEFAULT_WATCHLIST_PATH = "data/watchlist.sqlite"
+# Taxa de mudança (por dia) assumida para itens vistos uma única vez
+PRIOR_RATE = 0.5
+# Anúncios pausados raramente voltam a mudar: a taxa estimada é reduzida por este fator
+PAUSED_FACTOR = 0.1
+PAUSED = "Anúncio pausado"
+_DAY = 86400
+_COLUMNS = ("key", "url", "fetches", "changes", "observed_days", "last_checked", "last_changed", "state", "paused")
+
+
+def change_rate(checks, changes, observed_days):
+    """Mudanças por dia de um item, supondo mudanças como um processo de Poisson.
+
+    Usa o estimador de Cho e Garcia-Molina para checagens periódicas, que
+    desconta as mudanças que passam despercebidas entre duas checagens:
+    -ln((n - X + 0.5) / (n + 0.5)) / I, com n checagens, X mudanças vistas e
+    intervalo médio I.
+    """
+    if not checks or observed_days <= 0:
+        return PRIOR_RATE
+    interval = observed_days / checks
+    return max(0.0, -math.log((checks - changes + 0.5) / (checks + 0.5)) / interval)
+
+
+def fingerprint(row):
+    """Valores acompanhados de uma linha do LinkScraper (preços, desconto, estoque e vendas)."""
+    return json.dumps([
+        parse_cents([row.get("price_current")])[0],
+        parse_cents([row.get("price_previous")])[0],
+        parse_percent([row.get("discount")])[0],
+        row.get("qtd_available"),
+        row.get("seller_sales"),
+    ], ensure_ascii=False)
+
+
+def watch_key(url):
+    """Código MLB do link (ou o próprio link, se não houver código)."""
+    return item_key({"url": url}) or url
+
+
+class Watchlist:
+    """Agenda de reconsulta dos links monitorados, pela chance de cada item ter mudado.
+
+    Para cada item (código MLB) guarda quantas vezes foi consultado, quantas
+    vezes os valores acompanhados mudaram e o tempo total entre consultas;
+    daí sai a taxa de mudança (`change_rate`) e a probabilidade de o item ter
+    mudado desde a última consulta, 1 - exp(-taxa * dias). `plan` escolhe os
+    links de maior probabilidade dentro do orçamento de requisições: itens
+    voláteis voltam logo, estáveis e pausados raramente. Itens nunca
+    consultados, ou sem consulta há mais de `max_age_days`, vêm primeiro.
+    As linhas extraídas entram por `record` (o LinkScraper chama ao concluir
+    cada link) e são gravadas em lotes.
+    """
+
+    def __init__(self, path=DEFAULT_WATCHLIST_PATH, max_age_days=7.0, batch_size=500):
+        self.path = path
+        self.max_age_days = max_age_days
+        self.batch_size = batch_size
+        directory = os.path.dirname(path)
+        if directory:
+            os.makedirs(directory, exist_ok=True)
+
+        self._lock = threading.Lock()
+        self._db = sqlite3.connect(path, check_same_thread=False)
+        self._db.execute("""
+            CREATE TABLE IF NOT EXISTS watch (
+                key TEXT PRIMARY KEY,
+                url TEXT NOT NULL,
+                fetches INTEGER NOT NULL,
+                changes INTEGER NOT NULL,
+                observed_days REAL NOT NULL,
+                last_checked REAL NOT NULL,
+                last_changed REAL,
+                state TEXT,
+                paused INTEGER NOT NULL
+            )""")
+        self._db.commit()
+        self._entries = {}
+        self._dirty = set()
+
+        self.planned = 0
+        self.skipped = 0
+        self.expected_changes = 0.0
+        self.recorded = 0
+        self.changed = 0
+
+    def _load(self, keys):
+        keys = [key for key in keys if key not in self._entries]
+        for start in range(0, len(keys), 500):
+            chunk = keys[start:start + 500]
+            rows = self._db.execute(
+                f"SELECT {', '.join(_COLUMNS)} FROM watch WHERE key IN ({', '.join('?' * len(chunk))})", chunk)
+            for row in rows:
+                self._entries[row[0]] = dict(zip(_COLUMNS, row))
+
+    def probability(self, entry, now=None):
+        """Chance de o item ter mudado desde a última consulta (1.0 para itens novos ou vencidos)."""
+        if entry is None:
+            return 1.0
+        days = ((now or time.time()) - entry["last_checked"]) / _DAY
+        if days >= self.max_age_days:
+            return 1.0
+        rate = change_rate(entry["fetches"] - 1, entry["changes"], entry["observed_days"])
+        if entry["paused"]:
+            rate *= PAUSED_FACTOR
+        return 1.0 - math.exp(-rate * days)
+
+    def plan(self, links, budget=None, min_probability=0.0, now=None):
+        """Links a consultar nesta execução, do mais para o menos provável de ter mudado.
+
+        No máximo `budget` links (todos, se None); links com probabilidade
+        abaixo de `min_probability` ficam para a próxima execução.
+        """
+        now = now or time.time()
+        keys = [watch_key(link) for link in links]
+        with self._lock:
+            self._load(keys)
+            scored = []
+            for i, key in enumerate(keys):
+                entry = self._entries.get(key)
+                scored.append((self.probability(entry, now), entry["last_checked"] if entry else 0.0, i))
+        # Em empate, o consultado há mais tempo e depois a ordem do arquivo de entrada
+        scored.sort(key=lambda item: (-item[0], item[1], item[2]))
+        chosen = [(p, i) for p, _, i in scored if p >= min_probability][:budget]
+        self.planned = len(chosen)
+        self.skipped = len(links) - len(chosen)
+        self.expected_changes = sum(p for p, _ in chosen)
+        return [links[i] for _, i in chosen]
+
+    def record(self, row, now=None):
+        """Registra a linha extraída de um link: uma consulta e, se os valores mudaram, uma mudança."""
+        url = row.get("url")
+        if not url:
+            return
+        key = watch_key(url)
+        now = now or time.time()
+        state = fingerprint(row)
+        paused = int(row.get("qtd_available") == PAUSED)
+        with self._lock:
+            self._load([key])
+            entry = self._entries.get(key)
+            if entry is None:
+                self._entries[key] = {"key": key, "url": url, "fetches": 1, "changes": 0, "observed_days": 0.0,
+                                      "last_checked": now, "last_changed": None, "state": state, "paused": paused}
+            else:
+                entry["observed_days"] += max(0.0, now - entry["last_checked"]) / _DAY
+                entry["fetches"] += 1
+                if state != entry["state"]:
+                    entry["changes"] += 1
+                    entry["last_changed"] = now
+                    self.changed += 1
+                entry.update(url=url, last_checked=now, state=state, paused=paused)
+            self._dirty.add(key)
+            self.recorded += 1
+            if len(self._dirty) >= self.batch_size:
+                self._flush()
+
+    def flush(self):
+        with self._lock:
+            self._flush()
+
+    def _flush(self):
+        if not self._dirty:
+            return
+        with self._db:
+            self._db.executemany(
+                f"INSERT OR REPLACE INTO watch ({', '.join(_COLUMNS)}) "
+                f"VALUES ({', '.join(':' + column for column in _COLUMNS)})",
+                [self._entries[key] for key in self._dirty])
+        self._dirty.clear()
+
+    def top(self, limit=20):
+        """Itens já consultados com maior chance de mudança agora: (probabilidade, mudanças/dia, entrada)."""
+        now = time.time()
+        with self._lock:
+            self._flush()
+            rows = self._db.execute(f"SELECT {', '.join(_COLUMNS)} FROM watch").fetchall()
+        ranked = []
+        for row in rows:
+            entry = dict(zip(_COLUMNS, row))
+            ranked.append((self.probability(entry, now),
+                           change_rate(entry["fetches"] - 1, entry["changes"], entry["observed_days"]), entry))
+        ranked.sort(key=lambda item: -item[0])
+        return ranked[:limit]
+
+    def report(self):
+        lines = [f"Watchlist: {self.planned} links agendados | {self.skipped} adiados | "
+                 f"~{self.expected_changes:.0f} mudanças esperadas"]
+        if self.recorded:
+            lines.append(f"Watchlist: {self.recorded} itens consultados | {self.changed} mudaram")
+        return "\n".join(lines)
+
+    def close(self):
+        with self._lock:
+            self._flush()
+            self._db.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc):
+        self.close()
+
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Mostra os itens monitorados com maior chance de mudança.")
+    parser.add_argument("--watchlist", default=DEFAULT_WATCHLIST_PATH, help="Banco SQLite da watchlist")
+    parser.add_argument("--top", type=int, default=20, help="Quantidade de itens")
+    args = parser.parse_args()
+
+    with Watchlist(args.watchlist) as watchlist:
+        for probability, rate, entry in watchlist.top(args.top):
+            checked = time.strftime("%d/%m/%Y %H:%M", time.localtime(entry["last_checked"]))
+            print(f"{probability:6.1%}  {rate:6.2f}/dia  {entry['changes']:>3}/{entry['fetches'] - 1:<3} mudanças  "
+                  f"{'pausado ' if entry['paused'] else ''}última consulta {checked}  {entry['key']}")